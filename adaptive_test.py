@@ -0,0 +1,114 @@
+import numpy as np
+
+# Share of a skill's questions a passing candidate is expected to answer correctly (the
+# fixed-length test's 70% pass mark)
+PASS_SCORE = 0.7
+
+# Scaling constant that makes the logistic item curves match the normal ogive
+LOGISTIC_SCALE = 1.7
+
+# Ability grid the posterior is evaluated on (standard normal prior)
+ABILITY_GRID = np.linspace(-4, 4, 161)
+
+# An adaptive test stops once the pass threshold lies outside the ability estimate's
+# one-sided 90% interval (mean -/+ CONFIDENCE_Z posterior sd), or after MAX_QUESTIONS answers
+CONFIDENCE_Z = 1.282
+MIN_QUESTIONS = 3
+MAX_QUESTIONS = 15
+
+
+# Chance of a correct answer at each ability in `theta` (rows) for each item (columns) under
+# the three-parameter logistic model; items is an (n, 3) array of (discrimination,
+# difficulty, guessing)
+def correct_probability(theta, items):
+    a, b, c = items[:, 0], items[:, 1], items[:, 2]
+    return c + (1 - c) / (1 + np.exp(-LOGISTIC_SCALE * a * (np.asarray(theta)[..., None] - b)))
+
+
+# Fisher information of each item at ability theta
+def item_information(theta, items):
+    a, c = items[:, 0], items[:, 2]
+    p = correct_probability(theta, items)
+    return (LOGISTIC_SCALE * a) ** 2 * (1 - p) / p * ((p - c) / (1 - c)) ** 2
+
+
+# Ability at which the expected share of correct answers over `items` is pass_score
+def pass_ability(items, pass_score=PASS_SCORE):
+    expected = correct_probability(ABILITY_GRID, items).mean(axis=1)
+    return float(np.interp(pass_score, expected, ABILITY_GRID))
+
+
+# Computerized adaptive test over one skill's item pool. Each answer updates the posterior of
+# the candidate's ability on ABILITY_GRID; the next question is the unasked one with the most
+# information at the current estimate (ties broken by the seeded generator, so different
+# attempts see different questions). Only ability grid-sized arrays and the list of answers
+# are kept, so an attempt fits in session state.
+class AdaptiveTest:
+    def __init__(self, items, seed, pass_score=PASS_SCORE, max_questions=MAX_QUESTIONS):
+        self.items = np.asarray(items, dtype=np.float64)
+        self.threshold = pass_ability(self.items, pass_score)
+        self.max_questions = min(max_questions, len(self.items))
+        self.rng = np.random.default_rng(seed)
+        self.asked = []
+        self.answers = []
+        self.log_posterior = -ABILITY_GRID ** 2 / 2
+
+    # Posterior mean and standard deviation of the ability
+    def estimate(self):
+        weights = np.exp(self.log_posterior - self.log_posterior.max())
+        weights /= weights.sum()
+        mean = float(weights @ ABILITY_GRID)
+        return mean, float(np.sqrt(weights @ (ABILITY_GRID - mean) ** 2))
+
+    # 'pass' or 'fail' once decided, else None
+    def decision(self):
+        if len(self.answers) < MIN_QUESTIONS:
+            return None
+        mean, sd = self.estimate()
+        if mean - CONFIDENCE_Z * sd >= self.threshold:
+            return 'pass'
+        if mean + CONFIDENCE_Z * sd < self.threshold:
+            return 'fail'
+        if len(self.answers) >= self.max_questions:
+            return 'pass' if mean >= self.threshold else 'fail'
+        return None
+
+    # Pool position of the next question to ask
+    def next_item(self):
+        information = item_information(self.estimate()[0], self.items)
+        information[self.asked] = -np.inf
+        best = np.flatnonzero(information >= information.max() - 1e-9)
+        return int(self.rng.choice(best))
+
+    def record(self, item, correct):
+        p = correct_probability(ABILITY_GRID, self.items[[item]])[:, 0]
+        self.log_posterior = self.log_posterior + np.log(p if correct else 1 - p)
+        self.asked.append(item)
+        self.answers.append(bool(correct))
+
+
+# Offline simulation of n_examinees candidates with standard normal abilities taking both the
+# adaptive test and a fixed test of fixed_questions random items passed at pass_score.
+# Returns per-examinee questions asked and whether each test's decision matched the truth
+# (ability at or above the pass threshold).
+def simulate(items, n_examinees=5000, fixed_questions=10, pass_score=PASS_SCORE, max_questions=MAX_QUESTIONS, seed=0):
+    items = np.asarray(items, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    abilities = rng.standard_normal(n_examinees)
+    threshold = pass_ability(items, pass_score)
+    questions = np.empty(n_examinees, dtype=np.int64)
+    adaptive_correct = np.empty(n_examinees, dtype=bool)
+    fixed_correct = np.empty(n_examinees, dtype=bool)
+    for i, ability in enumerate(abilities):
+        truth = ability >= threshold
+        test = AdaptiveTest(items, seed=[seed, i], pass_score=pass_score, max_questions=max_questions)
+        while test.decision() is None:
+            item = test.next_item()
+            test.record(item, rng.random() < correct_probability(ability, items[[item]])[0])
+        questions[i] = len(test.answers)
+        adaptive_correct[i] = (test.decision() == 'pass') == truth
+
+        fixed = rng.choice(len(items), min(fixed_questions, len(items)), replace=False)
+        score = (rng.random(len(fixed)) < correct_probability(ability, items[fixed])).mean()
+        fixed_correct[i] = (score >= pass_score) == truth
+    return {'questions': questions, 'adaptive_correct': adaptive_correct, 'fixed_correct': fixed_correct}
@@ -0,0 +1,469 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from data_loader import extend_categories
+
+# Skills required by this many postings or fewer are left out of the skill income ranking
+MIN_SKILL_POSTINGS = 10
+
+# Dimensions and measures of the analytics cube
+CUBE_DIMENSIONS = ['occupation', 'education', 'workclass', 'interests']
+CUBE_MEASURES = ['income', 'age', 'hours-per-week']
+
+# Columns the running statistics are also kept per value of (workclass for the income box plots)
+STATS_GROUPS = ['education', 'workclass']
+
+# Relative error bound of medians and percentiles read from the quantile sketches. At 0.5%
+# every whole number below 100 (all ages and weekly hours) gets a bucket of its own.
+SKETCH_ERROR = 0.005
+
+# Histogram resolution of the server-side binned charts
+INCOME_BINS = 50
+HOURS_BINS = 30
+
+
+# Income sum and posting count per skill of the comma-separated `skills` column. Incomes are
+# summed per distinct skills string first (the column is categorical), so only the distinct
+# strings are split and exploded before the per-skill groupby.
+def _skill_totals(df):
+    column = df['skills']
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype('category')
+    per_value = (
+        pd.DataFrame({'value': column.cat.codes.to_numpy(), 'income': df['income'].to_numpy().astype(np.int64)})
+        .query('value >= 0')
+        .groupby('value')['income']
+        .agg(['sum', 'count'])
+    )
+    per_value['skill'] = column.cat.categories[per_value.index].astype(str).str.split(',')
+    return (
+        per_value.explode('skill')
+        .assign(skill=lambda frame: frame['skill'].str.strip())
+        .groupby('skill')[['sum', 'count']]
+        .sum()
+    )
+
+
+# Per-skill income totals of a dataset version. Sums and counts add up, so appended rows are
+# folded in without revisiting earlier ones.
+class SkillIncome:
+    def __init__(self, df, min_count=MIN_SKILL_POSTINGS):
+        self.min_count = min_count
+        self.totals = _skill_totals(df)
+
+    # Totals over these rows followed by the rows of `df`
+    def append(self, df):
+        skill_income = copy.copy(self)
+        skill_income.totals = pd.concat([self.totals, _skill_totals(df)]).groupby(level=0).sum()
+        return skill_income
+
+    # Average income and posting count per skill required by more than min_count postings,
+    # highest paying first
+    def ranking(self):
+        per_skill = self.totals[self.totals['count'] > self.min_count]
+        return (
+            pd.DataFrame({'mean': per_skill['sum'] / per_skill['count'], 'count': per_skill['count']})
+            .sort_values('mean', ascending=False, kind='stable')
+        )
+
+
+# Skill income ranking of one frame
+def skill_income(df, min_count=MIN_SKILL_POSTINGS):
+    return SkillIncome(df, min_count).ranking()
+
+
+# Pre-aggregated cube over the categorical dimensions, built once per dataset version. Every
+# cell (one combination of dimension values, or missing) holds the row count and, per measure, the sum,
+# sum of squares, min and max, so any group-by over a subset of the dimensions is a reduction
+# of a small dense array whose cost does not depend on the number of rows.
+class AggregateCube:
+    def __init__(self, df, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.labels = {dimension: [] for dimension in self.dimensions}
+        self.shape = tuple(1 for _ in self.dimensions)
+        self.count = np.zeros(self.shape, dtype=np.int64)
+        self.sum = {measure: np.zeros(self.shape) for measure in self.measures}
+        self.sumsq = {measure: np.zeros(self.shape) for measure in self.measures}
+        self.min = {measure: np.full(self.shape, np.inf) for measure in self.measures}
+        self.max = {measure: np.full(self.shape, -np.inf) for measure in self.measures}
+        self._add(df)
+
+    # Cube over these rows followed by the rows of `df`; only the appended rows are aggregated
+    def append(self, df):
+        cube = copy.copy(self)
+        cube._add(df)
+        return cube
+
+    # Fold the rows of `df` in. New arrays are assigned rather than updated in place, so a
+    # cube this one was copied from is left as it was.
+    def _add(self, df):
+        codes, slot_maps = [], []
+        for dimension in self.dimensions:
+            labels, column_codes = extend_categories(self.labels[dimension], df[dimension])
+            # Missing values go to a trailing slot so grand totals still count those rows
+            slot_maps.append(np.append(np.arange(len(self.labels[dimension])), len(labels)))
+            codes.append(np.where(column_codes >= 0, column_codes, len(labels)))
+            self.labels = dict(self.labels, **{dimension: labels})
+        shape = tuple(len(self.labels[d]) + 1 for d in self.dimensions)
+        n_cells = int(np.prod(shape, dtype=np.int64))
+
+        def grow(array, fill=0):
+            grown = np.full(shape, fill, dtype=array.dtype)
+            grown[np.ix_(*slot_maps)] = array
+            return grown
+
+        cells = np.ravel_multi_index(codes, shape) if codes else np.zeros(len(df), dtype=np.int64)
+        count = np.bincount(cells, minlength=n_cells)
+        self.count = grow(self.count) + count.reshape(shape)
+        self.sum, self.sumsq, self.min, self.max = dict(self.sum), dict(self.sumsq), dict(self.min), dict(self.max)
+        order = np.argsort(cells, kind='stable')
+        occupied = np.flatnonzero(count)
+        starts = np.searchsorted(cells[order], occupied)
+        for measure in self.measures:
+            values = df[measure].to_numpy().astype(np.float64)
+            self.sum[measure] = grow(self.sum[measure]) + np.bincount(cells, weights=values, minlength=n_cells).reshape(shape)
+            self.sumsq[measure] = grow(self.sumsq[measure]) + np.bincount(cells, weights=values * values, minlength=n_cells).reshape(shape)
+            low = grow(self.min[measure], np.inf).ravel()
+            high = grow(self.max[measure], -np.inf).ravel()
+            if len(occupied):
+                low[occupied] = np.minimum(low[occupied], np.minimum.reduceat(values[order], starts))
+                high[occupied] = np.maximum(high[occupied], np.maximum.reduceat(values[order], starts))
+            self.min[measure] = low.reshape(shape)
+            self.max[measure] = high.reshape(shape)
+        self.shape = shape
+
+    def _reduce(self, array, by, ufunc=np.add):
+        axes = tuple(i for i, d in enumerate(self.dimensions) if d not in by)
+        reduced = ufunc.reduce(array, axis=axes) if axes else array
+        # Reorder the remaining axes to follow `by`
+        kept = [d for d in self.dimensions if d in by]
+        reduced = np.transpose(reduced, [kept.index(d) for d in by])
+        # Drop the missing-value slot of every grouped dimension
+        return reduced[tuple(slice(0, -1) for _ in by)]
+
+    # Group-by over `by` (a subset of the dimensions, in the order wanted): a frame indexed by
+    # the observed label combinations with 'count' and, for `measure`, 'sum', 'mean', 'std'
+    # (sample), 'min' and 'max'. An empty `by` gives the single-row grand total.
+    def rollup(self, by=(), measure=None):
+        by = [by] if isinstance(by, str) else list(by)
+        count = self._reduce(self.count, by)
+        columns = {'count': count}
+        if measure is not None:
+            total = self._reduce(self.sum[measure], by)
+            sumsq = self._reduce(self.sumsq[measure], by)
+            n = np.maximum(count, 1)
+            variance = np.maximum(sumsq - total * total / n, 0) / np.maximum(count - 1, 1)
+            columns.update({
+                'sum': total,
+                'mean': total / n,
+                'std': np.where(count > 1, np.sqrt(variance), np.nan),
+                'min': self._reduce(self.min[measure], by, np.minimum),
+                'max': self._reduce(self.max[measure], by, np.maximum),
+            })
+        observed = count.ravel() > 0
+        if by:
+            index = pd.MultiIndex.from_product([self.labels[d] for d in by], names=by)
+            if len(by) == 1:
+                index = index.get_level_values(0)
+        else:
+            index = pd.Index(['total'])
+        frame = pd.DataFrame({name: np.ravel(values) for name, values in columns.items()}, index=index)
+        return frame[observed]
+
+    # Row counts per value of one dimension, largest first (like value_counts without zeros)
+    def counts(self, dimension):
+        return self.rollup(dimension)['count'].sort_values(ascending=False, kind='stable')
+
+    # Mean of a measure per value of one dimension, largest first
+    def means(self, dimension, measure):
+        return self.rollup(dimension, measure)['mean'].sort_values(ascending=False, kind='stable')
+
+
+# Mergeable quantile sketch of non-negative values, one row of bucket counts per group. Values
+# of at least 1 are counted in logarithmic buckets (gamma**(i-1), gamma**i], smaller ones in a
+# zero bucket, so any quantile read back is within relative_error of the exact value at its
+# rank (DDSketch, Masson et al.). Merging is adding counts: sketches of partitions or of
+# appended batches combine into exactly the sketch of all the values.
+class QuantileSketch:
+    def __init__(self, n_groups=0, relative_error=SKETCH_ERROR):
+        self.relative_error = relative_error
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        # counts[:, 0] is the zero bucket, counts[:, j] bucket offset + j - 1
+        self.offset = 0
+        self.counts = np.zeros((n_groups, 1), dtype=np.int64)
+
+    # Sketch of `values` per group code in [0, n_groups); negative codes are skipped
+    @classmethod
+    def of(cls, values, codes, n_groups, relative_error=SKETCH_ERROR):
+        sketch = cls(n_groups, relative_error)
+        valid = codes >= 0
+        values, codes = values[valid].astype(np.float64), codes[valid]
+        positive = values >= 1
+        buckets = np.ceil(np.log(values[positive]) / np.log(sketch.gamma)).astype(np.int64)
+        if len(buckets):
+            sketch.offset = int(buckets.min())
+        width = int(buckets.max()) - sketch.offset + 2 if len(buckets) else 1
+        columns = np.zeros(len(values), dtype=np.int64)
+        columns[positive] = buckets - sketch.offset + 1
+        sketch.counts = np.bincount(codes * width + columns, minlength=n_groups * width).reshape(n_groups, width)
+        return sketch
+
+    # Sketch of the values of both, group by group
+    def merge(self, other):
+        sketches = [sketch for sketch in (self, other) if sketch.counts.shape[1] > 1]
+        merged = QuantileSketch(max(len(self.counts), len(other.counts)), self.relative_error)
+        if sketches:
+            merged.offset = min(sketch.offset for sketch in sketches)
+            end = max(sketch.offset + sketch.counts.shape[1] - 1 for sketch in sketches)
+            merged.counts = np.zeros((len(merged.counts), end - merged.offset + 1), dtype=np.int64)
+        for sketch in (self, other):
+            start = sketch.offset - merged.offset + 1
+            merged.counts[:len(sketch.counts), 0] += sketch.counts[:, 0]
+            merged.counts[:len(sketch.counts), start:start + sketch.counts.shape[1] - 1] += sketch.counts[:, 1:]
+        return merged
+
+    def _values(self, columns):
+        exponent = self.offset + columns - 1
+        return np.where(columns > 0, 2 * self.gamma ** exponent / (self.gamma + 1), 0.0)
+
+    # Value at quantile q (0-1) of every group, NaN for groups without values. The cost depends
+    # on the number of buckets only, never on the number of values sketched.
+    def quantile(self, q):
+        cumulative = np.cumsum(self.counts, axis=1)
+        n = cumulative[:, -1]
+        rank = np.floor(q * np.maximum(n - 1, 0))
+        columns = (cumulative <= rank[:, None]).sum(axis=1)
+        return np.where(n > 0, self._values(np.minimum(columns, self.counts.shape[1] - 1)), np.nan)
+
+    # Most frequent value of every group: the fullest bucket, which for whole numbers below
+    # 1 / (2 * relative_error) holds a single value
+    def mode(self):
+        n = self.counts.sum(axis=1)
+        return np.where(n > 0, self._values(self.counts.argmax(axis=1)), np.nan)
+
+    # Smallest and largest value of every group within [low[g], high[g]], read from the
+    # non-empty buckets (NaN for groups with none in range)
+    def extremes_within(self, low, high):
+        values = self._values(np.arange(self.counts.shape[1]))
+        inside = (self.counts > 0) & (values >= low[:, None]) & (values <= high[:, None])
+        found = inside.any(axis=1)
+        smallest = values[inside.argmax(axis=1)]
+        largest = values[self.counts.shape[1] - 1 - inside[:, ::-1].argmax(axis=1)]
+        return np.where(found, smallest, np.nan), np.where(found, largest, np.nan)
+
+
+# Running count, mean, variance, min and max of the measures over all rows and per value of
+# each grouping column, with a quantile sketch of each for medians and percentiles. Each batch
+# of rows is summarised on its own (two-pass mean and sum of squared deviations) and merged
+# with Welford's parallel update (Chan et al.), so appending rows never revisits earlier ones
+# and the variance does not lose precision as sums grow.
+class RunningStats:
+    def __init__(self, df, groups=STATS_GROUPS, measures=CUBE_MEASURES):
+        self.groups = list(groups)
+        self.measures = list(measures)
+        self.labels = {group: [] for group in self.groups}
+        # Per key (None for all rows, else a grouping column): counts and, per measure,
+        # arrays of mean, m2 (sum of squared deviations), min and max over the labels
+        self.count = {None: np.zeros(1, dtype=np.int64)}
+        self.count.update({group: np.zeros(0, dtype=np.int64) for group in self.groups})
+        self.stats = {key: {measure: _empty_moments(len(count)) for measure in self.measures}
+                      for key, count in self.count.items()}
+        self.sketches = {key: {measure: QuantileSketch(len(count)) for measure in self.measures}
+                         for key, count in self.count.items()}
+        self._add(df)
+
+    # Statistics over these rows followed by the rows of `df`
+    def append(self, df):
+        stats = copy.copy(self)
+        stats._add(df)
+        return stats
+
+    def _add(self, df):
+        labels, count, stats, sketches = dict(self.labels), dict(self.count), dict(self.stats), dict(self.sketches)
+        for key in [None] + self.groups:
+            if key is None:
+                codes = np.zeros(len(df), dtype=np.int64)
+            else:
+                labels[key], codes = extend_categories(self.labels[key], df[key])
+            n_labels = 1 if key is None else len(labels[key])
+            valid = codes >= 0
+            codes = codes[valid]
+            added = np.bincount(codes, minlength=n_labels)
+            before = np.pad(self.count[key], (0, n_labels - len(self.count[key])))
+            total = before + added
+            stats[key], sketches[key] = {}, {}
+            for measure in self.measures:
+                values = df[measure].to_numpy()[valid].astype(np.float64)
+                old = _empty_moments(n_labels)
+                for name, array in self.stats[key][measure].items():
+                    old[name][:len(array)] = array
+                mean = np.bincount(codes, weights=values, minlength=n_labels) / np.maximum(added, 1)
+                m2 = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=n_labels)
+                delta = mean - old['mean']
+                extremes = pd.Series(values).groupby(codes).agg(['min', 'max'])
+                low, high = old['min'], old['max']
+                low[extremes.index] = np.minimum(low[extremes.index], extremes['min'].to_numpy())
+                high[extremes.index] = np.maximum(high[extremes.index], extremes['max'].to_numpy())
+                stats[key][measure] = {
+                    'mean': np.where(total > 0, old['mean'] + delta * added / np.maximum(total, 1), 0.0),
+                    'm2': old['m2'] + m2 + delta * delta * before * added / np.maximum(total, 1),
+                    'min': low,
+                    'max': high,
+                }
+                batch_sketch = QuantileSketch.of(values, codes, n_labels, self.sketches[key][measure].relative_error)
+                sketches[key][measure] = self.sketches[key][measure].merge(batch_sketch)
+            count[key] = total
+        self.labels, self.count, self.stats, self.sketches = labels, count, stats, sketches
+
+    # Count, mean, std (sample), min and max of `measure`, for all rows (group None: a single
+    # 'total' row) or per observed value of a grouping column
+    def summary(self, group=None, measure=CUBE_MEASURES[0]):
+        count = self.count[group]
+        moments = self.stats[group][measure]
+        index = pd.Index(['total']) if group is None else pd.Index(self.labels[group], name=group)
+        frame = pd.DataFrame({
+            'count': count,
+            'mean': moments['mean'],
+            'std': np.where(count > 1, np.sqrt(moments['m2'] / np.maximum(count - 1, 1)), np.nan),
+            'min': moments['min'],
+            'max': moments['max'],
+        }, index=index)
+        return frame[count > 0]
+
+    # Approximate value of `measure` at quantile q (0-1), like summary() indexed by group
+    def quantile(self, group=None, measure=CUBE_MEASURES[0], q=0.5):
+        return self._by_group(group, self.sketches[group][measure].quantile(q))
+
+    # Approximate most frequent value of `measure`, like summary() indexed by group
+    def mode(self, group=None, measure=CUBE_MEASURES[0]):
+        return self._by_group(group, self.sketches[group][measure].mode())
+
+    def _by_group(self, group, values):
+        index = pd.Index(['total']) if group is None else pd.Index(self.labels[group], name=group)
+        return pd.Series(values, index=index)[self.count[group] > 0]
+
+    # The measures summarised like DataFrame.describe(), with approximate quartiles
+    def describe(self, measures=None):
+        columns = {}
+        for measure in measures or self.measures:
+            total = self.summary(None, measure).iloc[0]
+            columns[measure] = [total['count'], total['mean'], total['std'], total['min'],
+                                *(self.quantile(None, measure, q).iloc[0] for q in (0.25, 0.5, 0.75)),
+                                total['max']]
+        return pd.DataFrame(columns, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+
+
+def _empty_moments(n):
+    return {'mean': np.zeros(n), 'm2': np.zeros(n), 'min': np.full(n, np.inf), 'max': np.full(n, -np.inf)}
+
+
+# Histograms, box-plot statistics and the income x hours density the Income Analysis and
+# Work Distribution charts need, kept per dataset version. Charts are drawn from these
+# fixed-size arrays, so the payload sent to the browser does not grow with the data. The
+# counts add up, so appended rows are binned on their own (bins of the same width are added
+# when they fall outside the edges), and the box plots are read from the running statistics'
+# income sketches per group instead of the rows.
+class DistributionSummary:
+    def __init__(self, df, stats, group='workclass', income_bins=INCOME_BINS, hours_bins=HOURS_BINS):
+        income = df['income'].to_numpy().astype(np.float64)
+        hours = df['hours-per-week'].to_numpy().astype(np.float64)
+        self.group = group
+        self.groups = []
+        self.income_edges = bin_edges(income, income_bins)
+        self.hours_edges = bin_edges(hours, hours_bins)
+        self.income_counts = np.zeros(len(self.income_edges) - 1, dtype=np.int64)
+        self.hours_counts = np.zeros(len(self.hours_edges) - 1, dtype=np.int64)
+        self.density = np.zeros((0, len(self.hours_counts), len(self.income_counts)), dtype=np.int64)
+        self._add(df, stats)
+
+    # Summary over these rows followed by the rows of `df`; `stats` are the running statistics
+    # over all of them
+    def append(self, df, stats):
+        summary = copy.copy(self)
+        summary._add(df, stats)
+        return summary
+
+    def _add(self, df, stats):
+        income = df['income'].to_numpy().astype(np.float64)
+        hours = df['hours-per-week'].to_numpy().astype(np.float64)
+        income_edges, income_before = _extend_edges(self.income_edges, income)
+        hours_edges, hours_before = _extend_edges(self.hours_edges, hours)
+        groups, codes = extend_categories(self.groups, df[self.group])
+        income_pad = (income_before, len(income_edges) - len(self.income_edges) - income_before)
+        hours_pad = (hours_before, len(hours_edges) - len(self.hours_edges) - hours_before)
+        density = np.pad(self.density, ((0, len(groups) - len(self.groups)), hours_pad, income_pad))
+
+        income_bin = _bin(income_edges, income)
+        hours_bin = _bin(hours_edges, hours)
+        self.income_counts = np.pad(self.income_counts, income_pad) + np.bincount(income_bin, minlength=density.shape[2])
+        self.hours_counts = np.pad(self.hours_counts, hours_pad) + np.bincount(hours_bin, minlength=density.shape[1])
+
+        # Row counts per (group, hours bin, income bin)
+        valid = codes >= 0
+        cells = np.ravel_multi_index((codes[valid], hours_bin[valid], income_bin[valid]), density.shape)
+        self.density = density + np.bincount(cells, minlength=density.size).reshape(density.shape)
+        self.income_edges, self.hours_edges, self.groups = income_edges, hours_edges, groups
+        self.box = _income_box(stats, self.group, self.groups)
+
+    # Counts of the income x hours density for one group (or all of them), shape (hours, income)
+    def income_hours(self, group=None):
+        if group is None:
+            return self.density.sum(axis=0)
+        return self.density[self.groups.index(group)]
+
+
+# Income quartiles and whisker ends (furthest values within 1.5 IQR of the quartiles) per
+# value of `group` with rows, in the order of `labels`, read from the running statistics'
+# sketches. A whisker that reaches the group's minimum or maximum ends exactly there.
+def _income_box(stats, group, labels):
+    sketch = stats.sketches[group]['income']
+    moments = stats.stats[group]['income']
+    q1, median, q3 = (sketch.quantile(q) for q in (0.25, 0.5, 0.75))
+    low_limit, high_limit = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    low_end, high_end = sketch.extremes_within(low_limit, high_limit)
+    box = pd.DataFrame({
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': np.where(moments['min'] >= low_limit, moments['min'], low_end),
+        'upperfence': np.where(moments['max'] <= high_limit, moments['max'], high_end),
+    }, index=stats.labels[group])
+    return box.reindex(labels).dropna()
+
+
+# Bins of `values` over histogram edges (the last bin includes its right edge, as np.histogram)
+def _bin(edges, values):
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+
+
+# Equal-width edges extended by bins of the same width until they cover `values`, and the
+# number of bins added below the first edge
+def _extend_edges(edges, values):
+    if len(values) == 0:
+        return edges, 0
+    width = edges[1] - edges[0]
+    before = max(0, int(np.ceil((edges[0] - values.min()) / width)))
+    after = max(0, int(np.ceil((values.max() - edges[-1]) / width)))
+    if not before and not after:
+        return edges, 0
+    return edges[0] + width * np.arange(-before, len(edges) + after), before
+
+
+# At most `bins` equal-width histogram edges over values; whole-number data gets whole-number
+# widths centred on the values, so no bin covers more distinct values than its neighbours
+def bin_edges(values, bins):
+    if len(values) == 0:
+        return np.linspace(0, 1, bins + 1)
+    low, high = float(values.min()), float(values.max())
+    if not np.all(np.mod(values, 1) == 0):
+        return np.linspace(low, high if high > low else low + 1, bins + 1)
+    width = max(1, int(np.ceil((high - low + 1) / bins)))
+    return low - 0.5 + width * np.arange(int(np.ceil((high - low + 1) / width)) + 1)
+
+
+# Midpoints of histogram bins
+def bin_centers(edges):
+    return (edges[:-1] + edges[1:]) / 2
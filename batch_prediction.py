@@ -0,0 +1,119 @@
+import copy
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from income_model import DEFAULT_HOURS
+from skill_matching import SKILLS, OccupationProfiles, multi_hot
+
+# Columns a candidate CSV must provide, as collected by career_path_page
+CANDIDATE_COLUMNS = ['age', 'gender', 'education', 'workclass', 'skills', 'interests']
+
+# Columns appended to every candidate row in the scored file
+RESULT_COLUMNS = ['predicted_occupation', 'confidence', 'expected_income', 'income_low', 'income_high',
+                  'skill_match']
+
+# Optional candidate column; candidates without it are assumed to work DEFAULT_HOURS
+HOURS_COLUMN = 'hours-per-week'
+
+# Candidates scored per vectorised pass (bounds the dense feature / traversal arrays)
+BATCH_ROWS = 20_000
+
+# Largest upload accepted in one batch
+MAX_CANDIDATES = 500_000
+
+
+# Candidate profiles from an uploaded CSV (or path). Column names are matched case-insensitively;
+# hours-per-week is optional; skills / interests cells may list several values separated by ',', ';' or '|'. Raises
+# ValueError with a message fit for the page when the file cannot be scored.
+def read_candidates(file):
+    try:
+        candidates = pd.read_csv(file, dtype=str, keep_default_na=False)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not read the CSV file: {e}")
+    candidates.columns = [str(c).strip().lower() for c in candidates.columns]
+    missing = [c for c in CANDIDATE_COLUMNS if c not in candidates.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    if len(candidates) > MAX_CANDIDATES:
+        raise ValueError(f"At most {MAX_CANDIDATES:,} candidates can be scored at once")
+
+    for column in CANDIDATE_COLUMNS:
+        candidates[column] = candidates[column].str.strip()
+    if HOURS_COLUMN not in candidates.columns:
+        candidates[HOURS_COLUMN] = str(DEFAULT_HOURS)
+    for column in ['age', HOURS_COLUMN]:
+        invalid = np.flatnonzero(pd.to_numeric(candidates[column], errors='coerce').isna().to_numpy())
+        if len(invalid) == 1:
+            raise ValueError(f"Invalid {column} on row {invalid[0] + 2}")
+        if len(invalid):
+            raise ValueError(f"Invalid {column} on row {invalid[0] + 2} (and {len(invalid) - 1} more)")
+    return candidates
+
+
+# Scores many candidate profiles against one dataset version and its occupation and income
+# models. The occupation skill profiles are built once, so scoring is a few array operations
+# per batch of candidates rather than a dataset scan per candidate.
+class BatchScorer:
+    def __init__(self, df, model, skill_matrix, income_model):
+        self.model = model
+        self.income_model = income_model
+        self.profiles = OccupationProfiles(df, skill_matrix)
+        self.occupation_codes = self.profiles.codes(model.occupations.classes_)
+
+    # Scorer over these postings followed by those of `df` (the last rows of skill_matrix),
+    # with the models kept as they are
+    def append(self, df, skill_matrix):
+        scorer = copy.copy(self)
+        scorer.profiles = self.profiles.append(df, skill_matrix)
+        scorer.occupation_codes = scorer.profiles.codes(self.model.occupations.classes_)
+        return scorer
+
+    # Candidate rows with RESULT_COLUMNS appended; skill_match is a percentage. `progress` is
+    # called with the fraction done after every batch.
+    def score(self, candidates, progress=None):
+        parts = []
+        for start in range(0, len(candidates), BATCH_ROWS):
+            batch = candidates.iloc[start:start + BATCH_ROWS]
+            frame = batch.rename(columns={'gender': 'sex'}).assign(
+                age=pd.to_numeric(batch['age']), **{HOURS_COLUMN: pd.to_numeric(batch[HOURS_COLUMN])}
+            )
+            proba = self.model.predict_frame_proba(frame)
+            best = proba.argmax(axis=1)
+            occupation = self.occupation_codes[best]
+            skills = multi_hot(batch['skills'], SKILLS)
+            frame['occupation'] = self.model.occupations.classes_[best]
+            low, typical, high = self.income_model.predict_range(frame).T
+
+            result = batch.copy()
+            result['predicted_occupation'] = frame['occupation'].to_numpy()
+            result['confidence'] = proba[np.arange(len(best)), best].astype(np.float64).round(3)
+            result['expected_income'] = typical
+            result['income_low'] = low
+            result['income_high'] = high
+            result['skill_match'] = (100 * self.profiles.coverage(skills, occupation).astype(np.float64)).round(1)
+            parts.append(result)
+            if progress is not None:
+                progress(min(start + BATCH_ROWS, len(candidates)) / len(candidates))
+        if not parts:
+            return candidates.assign(**{column: [] for column in RESULT_COLUMNS})
+        return pd.concat(parts)
+
+
+# Scored candidates as CSV bytes, one chunk of rows at a time, so a download never formats
+# the whole result as a single string
+def iter_csv(results, chunk_rows=BATCH_ROWS):
+    yield results.iloc[:0].to_csv(index=False).encode()
+    for start in range(0, len(results), chunk_rows):
+        yield results.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode()
+
+
+# Scored candidates as CSV in an anonymous temporary file (deleted once closed), written chunk
+# by chunk through iter_csv and rewound, for st.download_button(data=...)
+def spool_csv(results, chunk_rows=BATCH_ROWS):
+    f = tempfile.TemporaryFile()
+    for chunk in iter_csv(results, chunk_rows):
+        f.write(chunk)
+    f.seek(0)
+    return f
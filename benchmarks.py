@@ -0,0 +1,737 @@
+import gc
+import json
+import os
+import pickle
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from adaptive_test import simulate
+from analytics import (CUBE_MEASURES, SKETCH_ERROR, AggregateCube, DistributionSummary, RunningStats, bin_centers,
+                       skill_income)
+from batch_prediction import BatchScorer, iter_csv, read_candidates
+from career_model import CareerModel
+from certification_store import CertificationStore, new_user_id
+from data_loader import CATEGORICAL_COLUMNS, DATASET_PATH, apply_schema, read_dataset_csv
+from dataset_handle import SharedDataset
+from exports import EXPORT_FORMATS, build_export, export_path
+from facet_index import FacetIndex
+from grading import GradedBatch, grade_paper_results, read_paper_results
+from income_model import IncomeModel
+from pagination import ResultOrder, fetch_page
+from question_bank import TEST_QUESTIONS, QuestionBank, load_index, sample_positions
+from skill_matching import SKILLS, SkillMatrix, top_k
+import startup_profile
+
+# Usage: python benchmarks.py [name ...]   (no names runs everything)
+
+
+# Build an n-row dataset by resampling the bundled CSV
+def synthetic_dataset(n_rows, seed=42):
+    base = pd.read_csv(DATASET_PATH)
+    rng = np.random.default_rng(seed)
+    return base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+
+
+def _timed(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# CSV parse vs memory-mapped columnar cache at 4k / 400k / 4M rows
+def bench_dataset_cache(sizes=(4_000, 400_000, 4_000_000)):
+    print(f"{'rows':>10} {'read_csv':>10} {'cache write':>12} {'cache load':>11} {'speedup':>8}")
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "dataset.csv")
+            synthetic_dataset(n_rows).to_csv(csv_path, index=False)
+
+            csv_time, _ = _timed(lambda: pd.read_csv(csv_path))
+            start = time.perf_counter()
+            read_dataset_csv(csv_path, cache_dir=tmp)
+            write_time = time.perf_counter() - start
+            cache_time, _ = _timed(lambda: read_dataset_csv(csv_path, cache_dir=tmp))
+            print(f"{n_rows:>10,} {csv_time:>9.3f}s {write_time:>11.3f}s {cache_time:>10.3f}s {csv_time / cache_time:>7.1f}x")
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Child-process body for bench_memory: report RSS growth from loading one frame
+def _measure_rss(csv_path, typed):
+    base = _rss_mb()
+    if typed:
+        df = apply_schema(pd.read_csv(csv_path, dtype={c: "category" for c in CATEGORICAL_COLUMNS}))
+    else:
+        df = pd.read_csv(csv_path)
+    gc.collect()
+    print(f"{_rss_mb() - base:.1f}")
+    return df
+
+
+# Frame and process memory of the raw read_csv frame vs the typed dataset schema
+def bench_memory(sizes=(4_000, 400_000, 4_000_000)):
+    print(f"pandas {pd.__version__}")
+    print(f"{'rows':>10} {'raw frame':>10} {'typed frame':>12} {'ratio':>6} {'raw RSS':>9} {'typed RSS':>10} {'ratio':>6}")
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "dataset.csv")
+            synthetic_dataset(n_rows).to_csv(csv_path, index=False)
+
+            raw = pd.read_csv(csv_path)
+            raw_mb = raw.memory_usage(deep=True).sum() / 2**20
+            typed_mb = apply_schema(raw).memory_usage(deep=True).sum() / 2**20
+            del raw
+
+            rss = []
+            for typed in (False, True):
+                code = f"import benchmarks; benchmarks._measure_rss({csv_path!r}, {typed})"
+                out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                     cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+                rss.append(float(out.stdout.strip().splitlines()[-1]))
+            print(f"{n_rows:>10,} {raw_mb:>8.1f}MB {typed_mb:>10.1f}MB {raw_mb / typed_mb:>5.1f}x "
+                  f"{rss[0]:>7.1f}MB {rss[1]:>8.1f}MB {rss[0] / max(rss[1], 0.1):>5.1f}x")
+
+
+# Allocations held by concurrent sessions: st.cache_data hands each call an unpickled
+# copy, the shared handle hands out zero-copy views
+def bench_shared_sessions(n_sessions=50, n_rows=400_000):
+    df = apply_schema(synthetic_dataset(n_rows))
+    payload = pickle.dumps(df)
+    handle = SharedDataset(df, "bench")
+    print(f"{n_sessions} sessions over {n_rows:,} rows ({df.memory_usage(deep=True).sum() / 2**20:.1f}MB frame)")
+    for label, get_frame in (("st.cache_data copies", lambda: pickle.loads(payload)),
+                             ("shared views", handle.view)):
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        sessions = [get_frame() for _ in range(n_sessions)]
+        elapsed = time.perf_counter() - start
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:>22}: {current / 2**20:>8.1f}MB allocated, {elapsed * 1000 / n_sessions:.3f}ms per session")
+        del sessions
+
+
+# Find Job filters: four boolean-mask scans vs facet index lookups, plus live facet counts
+def bench_facet_index(n_rows=4_000_000):
+    df = apply_schema(synthetic_dataset(n_rows))
+    start = time.perf_counter()
+    index = FacetIndex(df)
+    print(f"index build over {n_rows:,} rows: {time.perf_counter() - start:.2f}s")
+
+    selections = [
+        {'education': 'Masters'},
+        {'education': 'Masters', 'workclass': 'Private'},
+        {'occupation': 'Data Scientist', 'education': 'PhD'},
+        {'occupation': 'Data Scientist', 'education': 'PhD', 'workclass': 'Private', 'interests': 'Technology'},
+    ]
+    for selection in selections:
+        def scan():
+            filtered = df
+            for facet, label in selection.items():
+                filtered = filtered[filtered[facet] == label]
+            return filtered
+        scan_time, expected = _timed(scan)
+        search_time, match = _timed(lambda: index.search(selection), repeat=20)
+        page_time, page = _timed(lambda: match.rows(0, 20), repeat=20)
+        counts_time, _ = _timed(lambda: index.facet_counts(selection), repeat=20)
+        assert len(match) == len(expected)
+        assert np.array_equal(page, df.index.get_indexer(expected.index[:20]))
+        rows = match.rows()
+        assert np.array_equal(rows, df.index.get_indexer(expected.index))
+        print(f"{len(selection)} facets ({len(match):>7,} rows): scan {scan_time * 1000:8.2f}ms, "
+              f"index {search_time * 1000:6.3f}ms, first page {page_time * 1000:6.3f}ms, "
+              f"facet counts {counts_time * 1000:6.3f}ms")
+
+
+# Rendering one listing page: mask + sort_values + iterrows vs cursor paging over the index
+def bench_pagination(n_rows=4_000_000, page_size=20, pages=5):
+    df = apply_schema(synthetic_dataset(n_rows))
+    index = FacetIndex(df)
+    by_income = ResultOrder(df, 'income', descending=True)
+    for selection in ({}, {'education': 'Masters'}, {'occupation': 'Data Scientist', 'education': 'PhD'}):
+        def with_iterrows():
+            filtered = df
+            for facet, label in selection.items():
+                filtered = filtered[filtered[facet] == label]
+            ordered = filtered.sort_values('income', ascending=False, kind='stable')
+            return [job for _, job in ordered.iloc[(pages - 1) * page_size:pages * page_size].iterrows()]
+
+        def with_cursor():
+            match = index.search(selection)
+            cursor = 0
+            for _ in range(pages):
+                rows, cursor = fetch_page(match, by_income, cursor, page_size)
+            return df.iloc[rows].to_dict('records')
+
+        old_time, old_jobs = _timed(with_iterrows)
+        new_time, new_jobs = _timed(with_cursor, repeat=10)
+        assert [job['income'] for job in old_jobs] == [job['income'] for job in new_jobs]
+        print(f"{str(selection):>55}: page {pages} sorted by income: iterrows {old_time * 1000:8.2f}ms, "
+              f"cursor {new_time * 1000:6.2f}ms")
+
+
+# prediction_page skill matching: per-row split/apply + sort_values vs sparse product + top-k
+def bench_skill_match(sizes=(400_000, 4_000_000), k=10):
+    user_skills = ['Python', 'SQL', 'Machine Learning']
+    for n_rows in sizes:
+        df = apply_schema(synthetic_dataset(n_rows))
+        start = time.perf_counter()
+        matrix = SkillMatrix(df)
+        build_time = time.perf_counter() - start
+
+        def with_apply():
+            def calculate_skill_match(job_skills):
+                job_skills_list = [s.strip() for s in str(job_skills).split(',')]
+                return sum(1 for skill in user_skills if skill in job_skills_list)
+            scored = df.assign(skill_match=df['skills'].astype(object).apply(calculate_skill_match))
+            return scored.sort_values('skill_match', ascending=False, kind='stable').head(k)
+
+        def with_matrix():
+            scores = matrix.scores(user_skills)
+            return df.iloc[top_k(scores, k)]
+
+        apply_time, expected = _timed(with_apply, repeat=1)
+        matrix_time, got = _timed(with_matrix)
+        assert list(got.index) == list(expected.index)
+        print(f"{n_rows:>10,} rows: matrix build {build_time:.2f}s, apply+sort {apply_time * 1000:8.1f}ms, "
+              f"sparse product+top-{k} {matrix_time * 1000:6.1f}ms")
+
+
+# Occupation model: training time and single-profile inference latency (target < 5ms)
+def bench_career_model(sizes=(4_000, 400_000)):
+    profile = {'age': 30, 'gender': 'Female', 'education': 'Masters', 'workclass': 'Private',
+               'skills': ['Python', 'SQL', 'Machine Learning'], 'interests': ['Technology', 'Research']}
+    for n_rows in sizes:
+        df = apply_schema(synthetic_dataset(n_rows))
+        start = time.perf_counter()
+        model = CareerModel().fit(df)
+        train_time = time.perf_counter() - start
+        model.predict(profile)
+        latencies = []
+        for _ in range(200):
+            start = time.perf_counter()
+            model.predict(profile)
+            latencies.append(time.perf_counter() - start)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        top10, _ = _timed(lambda: model.top_occupations(profile, 10), repeat=50)
+        print(f"{n_rows:>10,} rows: train {train_time:.2f}s, predict p50 {p50:.3f}ms p99 {p99:.3f}ms, "
+              f"top-10 {top10 * 1000:.3f}ms")
+
+
+# Quantile income model: training time, held-out P10 / P90 coverage and per-profile latency
+def bench_income_model(n_rows=400_000):
+    df = apply_schema(synthetic_dataset(n_rows))
+    held_out = df.sample(frac=0.1, random_state=1)
+    start = time.perf_counter()
+    model = IncomeModel().fit(df.drop(held_out.index))
+    train_time = time.perf_counter() - start
+    low, typical, high = model.predict_range(held_out).T
+    income = held_out['income'].to_numpy()
+    latencies = []
+    for _ in range(50):
+        start = time.perf_counter()
+        model.profile_range('Data Scientist', 'Masters', 'Private', ['Python', 'SQL'], 40)
+        latencies.append(time.perf_counter() - start)
+    print(f"train {train_time:.1f}s; held-out below P10 {np.mean(income < low):.1%}, "
+          f"below P50 {np.mean(income < typical):.1%}, below P90 {np.mean(income < high):.1%}")
+    print(f"profile range p50 {np.percentile(latencies, 50) * 1000:.1f}ms (uncached)")
+
+
+# The dashboard's former per-row skill income loop, kept as the baseline for bench_skill_income
+def _skill_income_iterrows(df):
+    skill_income = {}
+    for idx, row in df.iterrows():
+        if pd.notna(row['skills']):
+            for skill in [s.strip() for s in str(row['skills']).split(',')]:
+                skill_income.setdefault(skill, []).append(row['income'])
+    return {skill: np.mean(incomes) for skill, incomes in skill_income.items() if len(incomes) > 10}
+
+
+# "Skills Impact on Income": iterrows loop vs explode / groupby at 400k rows
+def bench_skill_income(n_rows=400_000):
+    df = apply_schema(synthetic_dataset(n_rows))
+    loop_time, expected = _timed(lambda: _skill_income_iterrows(df), repeat=1)
+    vector_time, result = _timed(lambda: skill_income(df))
+    assert set(result.index) == set(expected)
+    assert np.allclose(result['mean'].to_numpy(), [expected[skill] for skill in result.index])
+    print(f"{n_rows:,} rows: iterrows {loop_time:.2f}s, vectorised {vector_time * 1000:.1f}ms "
+          f"({loop_time / vector_time:.0f}x)")
+
+
+# The aggregates the analytics charts need, from full-frame groupbys vs from the cube
+def bench_cube(sizes=(400_000, 4_000_000)):
+    def from_frame(df):
+        for dimension in ['occupation', 'education', 'workclass']:
+            df.groupby(dimension, observed=True)['income'].mean().sort_values(ascending=False)
+        for dimension in ['education', 'workclass', 'interests', 'occupation']:
+            df[dimension].value_counts()
+        df.groupby('workclass', observed=True)['hours-per-week'].mean()
+        df.groupby(['education', 'workclass'], observed=True)['income'].mean().reset_index()
+
+    def from_cube(cube):
+        for dimension in ['occupation', 'education', 'workclass']:
+            cube.means(dimension, 'income')
+        for dimension in ['education', 'workclass', 'interests', 'occupation']:
+            cube.counts(dimension)
+        cube.means('workclass', 'hours-per-week')
+        cube.rollup(['education', 'workclass'], 'income')['mean'].reset_index()
+
+    for n_rows in sizes:
+        df = apply_schema(synthetic_dataset(n_rows))
+        frame_time, _ = _timed(lambda: from_frame(df))
+        build_time, cube = _timed(lambda: AggregateCube(df), repeat=1)
+        cube_time, _ = _timed(lambda: from_cube(cube))
+        print(f"{n_rows:>10,} rows: groupbys {frame_time * 1000:7.1f}ms, cube slices {cube_time * 1000:5.1f}ms "
+              f"(cube build {build_time:.2f}s, once per version)")
+
+
+# Plotly JSON sent to the browser for the Income Analysis distributions: raw-row figures vs
+# figures drawn from DistributionSummary
+def bench_chart_payload(sizes=(4_000, 400_000)):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    for n_rows in sizes:
+        df = apply_schema(synthetic_dataset(n_rows))
+        raw = [
+            px.histogram(df, x='income', nbins=50),
+            px.box(df, x='workclass', y='income', color='workclass'),
+            px.histogram(df, x='hours-per-week', nbins=30),
+        ]
+        build_time, summary = _timed(lambda: DistributionSummary(df, RunningStats(df)), repeat=1)
+        box = summary.box
+        binned = [
+            px.bar(x=bin_centers(summary.income_edges), y=summary.income_counts),
+            go.Figure([go.Box(name=name, x=[name], q1=[row['q1']], median=[row['median']], q3=[row['q3']],
+                              lowerfence=[row['lowerfence']], upperfence=[row['upperfence']])
+                       for name, row in box.iterrows()]),
+            px.bar(x=bin_centers(summary.hours_edges), y=summary.hours_counts),
+            px.imshow(summary.income_hours().T),
+        ]
+        raw_kb = sum(len(fig.to_json()) for fig in raw) / 1024
+        binned_kb = sum(len(fig.to_json()) for fig in binned) / 1024
+        print(f"{n_rows:>10,} rows: raw rows {raw_kb:9.1f}KB, binned (incl. density) {binned_kb:6.1f}KB, "
+              f"summary build {build_time * 1000:.0f}ms")
+
+
+# Child-process body for bench_exports: time one export and report the growth of peak RSS
+def _measure_export(n_rows, fmt, export_dir):
+    import resource
+    df = apply_schema(synthetic_dataset(n_rows))
+    gc.collect()
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if fmt is None:
+        df.to_csv(index=False).encode('utf-8')
+    else:
+        build_export("dataset", "bench", fmt, lambda: df, export_dir)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.2f} {(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024:.1f}")
+
+
+# Dashboard "Download Full Dataset": to_csv of the whole frame on every rerun vs the chunked
+# export written once per version, with the peak memory each one adds
+def bench_exports(n_rows=2_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in [None] + list(EXPORT_FORMATS):
+            code = f"import benchmarks; benchmarks._measure_export({n_rows}, {fmt!r}, {tmp!r})"
+            out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+            elapsed, peak_mb = out.stdout.split()[-2:]
+            if fmt is None:
+                print(f"{'to_csv per rerun':>16}: {elapsed}s, +{peak_mb}MB peak")
+                continue
+            path = export_path("dataset", "bench", fmt, tmp)
+            reuse, _ = _timed(lambda: build_export("dataset", "bench", fmt, lambda: None, tmp))
+            print(f"{fmt:>16}: first build {elapsed}s, +{peak_mb}MB peak, "
+                  f"{os.path.getsize(path) / 2**20:.1f}MB file, cached {reuse * 1e6:.0f}us")
+
+
+# Dataset refresh under load: a session keeps serving requests while a new version is built in
+# the background and swapped in; reports the slowest request seen during the refresh
+def bench_refresh(n_rows=100_000):
+    from dataset_registry import DatasetRegistry
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic_dataset(n_rows, seed=1).to_csv(os.path.join(tmp, "remote_dataset.csv"), index=False)
+        registry = DatasetRegistry(cache_dir=tmp, check_interval=float("inf"))
+        registry.refresh(check_remote=False).join()
+        registry.current().warm()
+
+        synthetic_dataset(n_rows, seed=2).to_csv(os.path.join(tmp, "remote_dataset.csv"), index=False)
+        old_key = registry.current_key
+        start = time.perf_counter()
+        thread = registry.refresh(check_remote=False)
+        latencies = []
+        while thread.is_alive():
+            request = time.perf_counter()
+            version = registry.current()
+            version.artifact('facet_index').search({'education': 'Masters'})
+            version.artifact('cube').rollup('occupation', 'income')
+            latencies.append(time.perf_counter() - request)
+            time.sleep(0.01)
+        swap_time = time.perf_counter() - start
+        request, _ = _timed(lambda: registry.current().artifact('cube').rollup('occupation', 'income'))
+        print(f"{n_rows:,} rows: new version built and swapped in {swap_time:.1f}s "
+              f"(swapped: {registry.current_key != old_key}); {len(latencies)} requests meanwhile, "
+              f"slowest {max(latencies) * 1000:.1f}ms; first request after swap {request * 1000:.1f}ms")
+
+
+# Appending a batch of postings: derived state updated incrementally vs rebuilt over all rows
+def bench_append(n_rows=4_000_000, batch_rows=10_000):
+    from data_loader import append_frame
+    from dataset_registry import DatasetVersion
+    from result_order import SORT_OPTIONS
+    df = apply_schema(synthetic_dataset(n_rows, seed=1))
+    batch = synthetic_dataset(batch_rows, seed=2)
+    names = [('facet_index', ()), ('skill_matrix', ()), ('cube', ()), ('running_stats', ()), ('skill_income', ()),
+             ('distributions', ())]
+    names += [('result_order', (label,)) for label in SORT_OPTIONS]
+
+    parent = DatasetVersion(None, SharedDataset(df, "parent"))
+    for name, args in names:
+        parent.artifact(name, *args)
+    start = time.perf_counter()
+    version = parent.appended(None, "appended", batch)
+    incremental = time.perf_counter() - start
+
+    rebuilt = DatasetVersion(None, SharedDataset(append_frame(df, batch), "rebuilt"))
+    start = time.perf_counter()
+    for name, args in names:
+        rebuilt.artifact(name, *args)
+    full = time.perf_counter() - start
+
+    same = (version.artifact('facet_index').facet_counts({}) == rebuilt.artifact('facet_index').facet_counts({})
+            and np.array_equal(version.artifact('result_order', 'Income: high to low').order,
+                               rebuilt.artifact('result_order', 'Income: high to low').order)
+            and version.artifact('skill_income').ranking().equals(rebuilt.artifact('skill_income').ranking())
+            and np.array_equal(version.artifact('distributions').income_hours(),
+                               rebuilt.artifact('distributions').income_hours()))
+    a = version.artifact('running_stats').summary('education', 'income')
+    b = rebuilt.artifact('running_stats').summary('education', 'income')
+    print(f"{batch_rows:,} rows onto {n_rows:,}: incremental {incremental:.2f}s, full rebuild {full:.2f}s "
+          f"({full / incremental:.0f}x); indexes match: {same}, "
+          f"max std difference {np.abs(a['std'] - b['std']).max():.2e}")
+
+
+# Quantile sketch accuracy and cost: sketches of 4 partitions are merged, then every quantile
+# is checked against the exact order statistics around its rank, overall and per education
+def bench_sketches(n_rows=4_000_000, partitions=4, quantiles=(0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)):
+    df = apply_schema(synthetic_dataset(n_rows, seed=1))
+    bounds = np.linspace(0, n_rows, partitions + 1).astype(int)
+    start = time.perf_counter()
+    stats = RunningStats(df.iloc[:bounds[1]])
+    for low, high in zip(bounds[1:-1], bounds[2:]):
+        stats = stats.append(df.iloc[low:high])
+    build = time.perf_counter() - start
+    single = RunningStats(df)
+    same = all(np.array_equal(stats.sketches[key][m].counts, single.sketches[key][m].counts)
+               for key in stats.sketches for m in CUBE_MEASURES)
+
+    worst, within = 0.0, True
+    for measure in CUBE_MEASURES:
+        grouped = df[measure].astype(np.float64).groupby(df['education'], observed=True)
+        for q in quantiles:
+            # Exact values at the ranks either side of q, overall and per group
+            lower = pd.concat([pd.Series({'total': df[measure].quantile(q, interpolation='lower')}),
+                               grouped.quantile(q, interpolation='lower')])
+            higher = pd.concat([pd.Series({'total': df[measure].quantile(q, interpolation='higher')}),
+                                grouped.quantile(q, interpolation='higher')])
+            estimate = pd.concat([stats.quantile(None, measure, q), stats.quantile('education', measure, q)])
+            lower, higher = lower[estimate.index].astype(float), higher[estimate.index].astype(float)
+            within &= bool(((estimate >= lower * (1 - SKETCH_ERROR)) & (estimate <= higher * (1 + SKETCH_ERROR))).all())
+            error = np.maximum(lower - estimate, estimate - higher).clip(lower=0) / lower
+            worst = max(worst, float(error.max()))
+
+    exact, _ = _timed(lambda: (df['income'].median(), df.groupby('education', observed=True)['income'].median()))
+    sketched, _ = _timed(lambda: (stats.quantile(None, 'income'), stats.quantile('education', 'income')))
+    print(f"{n_rows:,} rows in {partitions} partitions: sketches built and merged in {build:.2f}s, "
+          f"merged == single pass: {same}")
+    print(f"quantiles {quantiles} of {CUBE_MEASURES}, overall and per education: max relative error "
+          f"{worst:.4%} (bound {SKETCH_ERROR:.2%}), within bound: {within}")
+    print(f"median + median by education: exact {exact * 1000:.1f}ms, sketch {sketched * 1000:.2f}ms")
+    assert same and within
+
+
+# Question bank of per_skill questions for each of the 32 skills: index build (first start),
+# opening the bank (later starts) and drawing a seeded test of TEST_QUESTIONS from one pool
+def bench_question_bank(per_skill=20_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "question_bank.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(per_skill):
+                for skill in SKILLS:
+                    f.write(json.dumps({'skill': skill, 'q': f"{skill} question {i}?",
+                                        'options': ['A', 'B', 'C', 'D'], 'answer': i % 4}) + "\n")
+        start = time.perf_counter()
+        load_index(path, cache_dir=tmp)
+        build = time.perf_counter() - start
+        opened, bank = _timed(lambda: QuestionBank(path, cache_dir=tmp))
+        seeds = iter(range(10**6))
+
+        def draw():
+            rng = np.random.default_rng(next(seeds))
+            return [bank.question('Python', i) for i in sample_positions(per_skill, TEST_QUESTIONS, rng)]
+        sampled, _ = _timed(draw, repeat=100)
+        print(f"{per_skill * len(SKILLS):,} questions ({os.path.getsize(path) / 2**20:.0f}MB): index build {build:.2f}s, "
+              f"open {opened * 1000:.1f}ms, {TEST_QUESTIONS} questions drawn from {per_skill:,} "
+              f"in {sampled * 1e6:.0f}us")
+
+
+# Offline adaptive test simulation: questions to a decision and decision accuracy of the
+# adaptive test vs the fixed 10-question test, over n_examinees synthetic candidates on a
+# calibrated pool of pool_size items and on the bundled (uncalibrated, 30-item) Python pool
+def bench_adaptive(n_examinees=5000, pool_size=200):
+    rng = np.random.default_rng(0)
+    calibrated = np.column_stack([rng.lognormal(0.1, 0.3, pool_size), rng.normal(0, 1, pool_size),
+                                  np.full(pool_size, 0.25)])
+    pools = {f"calibrated pool of {pool_size}": calibrated,
+             "bundled Python pool": QuestionBank().item_parameters('Python')}
+    for label, items in pools.items():
+        start = time.perf_counter()
+        result = simulate(items, n_examinees=n_examinees)
+        elapsed = time.perf_counter() - start
+        questions = result['questions']
+        print(f"{label}: {n_examinees:,} examinees in {elapsed:.1f}s; questions to decision median "
+              f"{np.median(questions):.0f} (mean {questions.mean():.1f}, max {questions.max()}) vs 10 fixed; "
+              f"accuracy adaptive {result['adaptive_correct'].mean():.1%}, fixed {result['fixed_correct'].mean():.1%}")
+
+
+
+# Grading 100k submissions of 50 questions: one check per answer (the page's old loop) vs one
+# GradedBatch, plus a paper results CSV imported and graded end to end
+def bench_grading(n_examinees=100_000, n_questions=50, sample=10_000):
+    rng = np.random.default_rng(0)
+    # Answers of examinees of varying ability to questions of varying difficulty
+    knows = rng.random((n_examinees, n_questions)) < 1 / (1 + np.exp(rng.normal(0, 1, n_questions)
+                                                                  - rng.normal(1, 1, (n_examinees, 1))))
+    key = rng.integers(0, 4, n_questions)
+    responses = np.where(knows, key, rng.integers(0, 4, (n_examinees, n_questions))).astype(np.int8)
+    options = np.array(['A', 'B', 'C', 'D'])
+    answers = options[responses[:sample]].tolist()
+    key_options = options[key].tolist()
+
+    start = time.perf_counter()
+    loop_scores = []
+    for row in answers:
+        correct = 0
+        for i, answer in enumerate(row):
+            if answer == key_options[i]:
+                correct += 1
+        loop_scores.append(correct / n_questions)
+    loop = (time.perf_counter() - start) * n_examinees / sample
+    start = time.perf_counter()
+    graded = GradedBatch(responses, key)
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    statistics = graded.item_statistics()
+    item_stats = time.perf_counter() - start
+    assert np.allclose(loop_scores, graded.scores[:sample])
+    print(f"{n_examinees:,} x {n_questions}: per-answer loop {loop:.2f}s (extrapolated from {sample:,}), "
+          f"GradedBatch {vectorized * 1000:.1f}ms ({loop / vectorized:.0f}x); item statistics "
+          f"{item_stats * 1000:.1f}ms (discrimination {statistics['discrimination'].min():.2f} to "
+          f"{statistics['discrimination'].max():.2f})")
+
+    # The same examinees sitting the bundled Python test on paper, answering with the real key
+    bank = QuestionBank()
+    paper_key = bank.answer_key('Python')
+    paper_responses = np.where(knows[:, :len(paper_key)], paper_key, responses[:, :len(paper_key)])
+    paper = pd.DataFrame(options[paper_responses], columns=[f"q{i + 1}" for i in range(len(paper_key))])
+    paper.insert(0, 'candidate', [f"C{i:06d}" for i in range(n_examinees)])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "paper.csv")
+        paper.to_csv(path, index=False)
+        start = time.perf_counter()
+        per_candidate, per_question = grade_paper_results(*read_paper_results(path, 'Python'), 'Python')
+        print(f"paper results import of {n_examinees:,} candidates x {len(paper_key)} questions: "
+              f"{time.perf_counter() - start:.2f}s, {per_candidate['passed'].mean():.0%} passed")
+
+
+# Concurrent sessions finishing tests: group-committed writes through one CertificationStore vs
+# a connection and commit per attempt, then certification lookups with and without the cache
+def bench_certifications(n_sessions=32, attempts=100, lookups=100_000):
+    users = [new_user_id() for _ in range(n_sessions)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CertificationStore(os.path.join(tmp, "batched.db"))
+
+        def session(user_id):
+            for i in range(attempts):
+                store.record_attempt(user_id, SKILLS[i % len(SKILLS)], 'fixed', 10, 8, i % 2 == 0)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(n_sessions) as pool:
+            list(pool.map(session, users))
+        batched = time.perf_counter() - start
+        expected = len({SKILLS[i % len(SKILLS)] for i in range(0, attempts, 2)})
+        assert all(len(store.certified_skills(user_id)) == expected for user_id in users)
+
+        naive_path = os.path.join(tmp, "naive.db")
+        CertificationStore(naive_path).close()
+
+        def naive_session(user_id):
+            for i in range(attempts):
+                with sqlite3.connect(naive_path, timeout=30) as connection:
+                    connection.execute("INSERT OR IGNORE INTO users (id, created_at) VALUES (?, ?)", (user_id, time.time()))
+                    connection.execute("INSERT INTO attempts (user_id, skill, mode, questions, correct, passed, finished_at) "
+                                       "VALUES (?, ?, 'fixed', 10, 8, ?, ?)", (user_id, SKILLS[i % len(SKILLS)], i % 2 == 0, time.time()))
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(n_sessions) as pool:
+            list(pool.map(naive_session, users))
+        naive = time.perf_counter() - start
+        writes = n_sessions * attempts
+        print(f"{writes:,} attempts from {n_sessions} sessions: group commit {batched:.2f}s "
+              f"({writes / batched:,.0f}/s), commit per attempt {naive:.2f}s ({writes / naive:,.0f}/s)")
+
+        start = time.perf_counter()
+        for i in range(lookups):
+            store.certified_skills(users[i % n_sessions])
+        cached = (time.perf_counter() - start) / lookups
+        uncached_store = CertificationStore(store.path, cache_ttl=0)
+        start = time.perf_counter()
+        for i in range(lookups // 10):
+            uncached_store.certified_skills(users[i % n_sessions])
+        uncached = (time.perf_counter() - start) / (lookups // 10)
+        print(f"certified skills lookup: cached {cached * 1e6:.1f}us, pooled SQLite read {uncached * 1e6:.1f}us")
+        uncached_store.close()
+        store.close()
+
+
+# Candidate CSV with n_rows random profiles over the dataset's vocabulary
+def synthetic_candidates(df, n_rows, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'age': rng.integers(18, 66, n_rows),
+        'gender': rng.choice(['Male', 'Female'], n_rows),
+        'education': rng.choice(df['education'].unique(), n_rows),
+        'workclass': rng.choice(df['workclass'].unique(), n_rows),
+        'skills': ['; '.join(rng.choice(SKILLS, 3, replace=False)) for _ in range(n_rows)],
+        'interests': rng.choice(df['interests'].unique(), n_rows),
+    })
+
+
+# Cohort scoring: one prediction_page-style pass per candidate vs BatchScorer, 100k candidates
+def bench_batch_prediction(n_rows=400_000, n_candidates=100_000, sample=300):
+    df = apply_schema(synthetic_dataset(n_rows))
+    model = CareerModel().fit(df)
+    skill_matrix = SkillMatrix(df)
+    index = FacetIndex(df)
+    candidates = synthetic_candidates(df, n_candidates)
+
+    start = time.perf_counter()
+    for row in candidates.head(sample).to_dict('records'):
+        profile = dict(row, skills=row['skills'].split('; '), interests=[row['interests']])
+        rows = index.search({'occupation': model.predict(profile)}).rows()
+        skill_matrix.scores(profile['skills'], rows)
+    per_candidate = (time.perf_counter() - start) / sample
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "candidates.csv")
+        candidates.to_csv(path, index=False)
+        income_model = IncomeModel().fit(df)
+        build_time, scorer = _timed(lambda: BatchScorer(df, model, skill_matrix, income_model), repeat=1)
+        read_time, loaded = _timed(lambda: read_candidates(path), repeat=1)
+        score_time, results = _timed(lambda: scorer.score(loaded), repeat=1)
+        export_time, _ = _timed(lambda: sum(len(chunk) for chunk in iter_csv(results)), repeat=1)
+    print(f"per-candidate loop: {per_candidate * 1000:.2f}ms each, "
+          f"~{per_candidate * n_candidates:.0f}s for {n_candidates:,}")
+    print(f"batch: build {build_time:.2f}s, read {read_time:.2f}s, score {score_time:.2f}s, "
+          f"export {export_time:.2f}s for {n_candidates:,}")
+
+
+def _private_mb():
+    with open("/proc/self/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if ":" in line)
+    return sum(int(fields[k].split()[0]) for k in ("Private_Clean", "Private_Dirty")) / 1024
+
+
+# Child-process body for bench_model_store: load one artifact and report time / private memory
+def _measure_artifact(path, mmap):
+    import joblib
+    base = _private_mb()
+    start = time.perf_counter()
+    model = joblib.load(path, mmap_mode="r" if mmap else None)
+    elapsed = time.perf_counter() - start
+    model.forest.predict_proba(np.zeros((1, model._width()), dtype=np.float32))
+    print(f"{elapsed * 1000:.1f} {_private_mb() - base:.1f}")
+
+
+# Worker start with the stored occupation model: full unpickle vs memory-mapped arrays
+def bench_model_store(n_rows=400_000, workers=4):
+    from model_store import artifact_path, save_artifact
+    df = apply_schema(synthetic_dataset(n_rows))
+    model = CareerModel().fit(df)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = artifact_path("career_model", "bench", model.params, tmp)
+        save_artifact("career_model", path, model)
+        print(f"artifact {os.path.getsize(path) / 2**20:.1f}MB, {workers} workers")
+        for mmap in (False, True):
+            results = []
+            for _ in range(workers):
+                code = f"import benchmarks; benchmarks._measure_artifact({path!r}, {mmap})"
+                out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                     cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+                results.append([float(v) for v in out.stdout.split()[-2:]])
+            load_ms, private = np.mean(results, axis=0)
+            label = "memory-mapped" if mmap else "unpickled copy"
+            print(f"{label:>15}: load {load_ms:7.1f}ms, private memory per worker {private:6.1f}MB")
+
+
+
+# Cold start of each entry point (import breakdown, home_page first render) against the
+# committed startup_budget.json
+def bench_startup():
+    assert startup_profile.main(), "over the startup budget"
+
+
+BENCHMARKS = {
+    "dataset_cache": bench_dataset_cache,
+    "memory": bench_memory,
+    "shared_sessions": bench_shared_sessions,
+    "facet_index": bench_facet_index,
+    "pagination": bench_pagination,
+    "skill_match": bench_skill_match,
+    "career_model": bench_career_model,
+    "model_store": bench_model_store,
+    "income_model": bench_income_model,
+    "skill_income": bench_skill_income,
+    "cube": bench_cube,
+    "chart_payload": bench_chart_payload,
+    "exports": bench_exports,
+    "refresh": bench_refresh,
+    "append": bench_append,
+    "sketches": bench_sketches,
+    "question_bank": bench_question_bank,
+    "adaptive": bench_adaptive,
+    "grading": bench_grading,
+    "certifications": bench_certifications,
+    "batch_prediction": bench_batch_prediction,
+    "startup": bench_startup,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or list(BENCHMARKS):
+        print(f"== {name}")
+        BENCHMARKS[name]()
@@ -0,0 +1,187 @@
+import numpy as np
+
+from model_store import load_or_build
+from skill_matching import SKILLS, multi_hot, top_k
+
+# Profile fields the occupation model is trained on, as named in the dataset
+CATEGORICAL_FEATURES = ['sex', 'education', 'workclass', 'interests']
+
+MODEL_PARAMS = {
+    'n_estimators': 60,
+    'max_depth': 14,
+    'min_samples_leaf': 2,
+    'random_state': 42,
+}
+
+# Larger datasets are subsampled for training so rebuild time stays bounded
+MAX_TRAINING_ROWS = 200_000
+
+# Ranked alternatives shown on the prediction page
+TOP_OCCUPATIONS = 10
+
+# Batches at least this large sum leaf distributions against a dense leaf matrix
+DENSE_BATCH_ROWS = 256
+
+
+# A fitted random forest flattened into plain arrays. All trees are walked together with
+# vectorised numpy steps (one per tree level) instead of sklearn's per-tree dispatch, which
+# keeps single-profile inference well under a millisecond; leaf class distributions are
+# kept sparse (CSR) because each leaf only holds a handful of occupations.
+class PackedForest:
+    def __init__(self, forest):
+        from scipy import sparse
+        features, thresholds, lefts, rights, leaf_ids, roots = [], [], [], [], [], []
+        leaf_rows = []
+        node_offset = leaf_offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            roots.append(node_offset)
+            features.append(np.where(is_leaf, -1, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + node_offset))
+            rights.append(np.where(is_leaf, -1, tree.children_right + node_offset))
+            ids = np.full(tree.node_count, -1)
+            ids[is_leaf] = np.arange(leaf_offset, leaf_offset + is_leaf.sum())
+            leaf_ids.append(ids)
+            values = tree.value[is_leaf, 0, :]
+            leaf_rows.append(sparse.csr_matrix(values / values.sum(axis=1, keepdims=True)))
+            node_offset += tree.node_count
+            leaf_offset += int(is_leaf.sum())
+
+        self.feature = np.concatenate(features).astype(np.int32)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts).astype(np.int32)
+        self.right = np.concatenate(rights).astype(np.int32)
+        self.leaf_id = np.concatenate(leaf_ids).astype(np.int32)
+        self.roots = np.array(roots, dtype=np.int32)
+        leaf_values = sparse.vstack(leaf_rows).tocsr().astype(np.float32)
+        self.leaf_data = leaf_values.data
+        self.leaf_indices = leaf_values.indices
+        self.leaf_indptr = leaf_values.indptr
+        self.n_classes = leaf_values.shape[1]
+
+    # Leaf reached in every tree for every row of X, shape (n_rows, n_trees)
+    def apply(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.repeat(self.roots[None, :], len(X), axis=0)
+        while True:
+            feature = self.feature[nodes]
+            internal = feature >= 0
+            if not internal.any():
+                return self.leaf_id[nodes]
+            go_left = X[rows, np.maximum(feature, 0)] <= self.threshold[nodes]
+            step = np.where(go_left, self.left[nodes], self.right[nodes])
+            nodes = np.where(internal, step, nodes)
+
+    # Mean of the per-tree leaf class distributions, as RandomForestClassifier.predict_proba
+    def predict_proba(self, X):
+        from scipy import sparse
+        leaves = self.apply(X)
+        n_rows, n_trees = leaves.shape
+        leaf_values = sparse.csr_matrix(
+            (self.leaf_data, self.leaf_indices, self.leaf_indptr),
+            shape=(len(self.leaf_indptr) - 1, self.n_classes)
+        )
+        hits = sparse.csr_matrix(
+            (np.full(leaves.size, 1.0 / n_trees, dtype=np.float32), leaves.ravel(),
+             np.arange(0, leaves.size + 1, n_trees)),
+            shape=(n_rows, leaf_values.shape[0])
+        )
+        # Large batches touch most leaves, where a dense right-hand side is several times faster
+        if n_rows >= DENSE_BATCH_ROWS:
+            return hits @ leaf_values.toarray()
+        return (hits @ leaf_values).toarray()
+
+
+# Occupation classifier over a career profile: age, gender, education, workclass, interests
+# (one-hot, so a profile may carry several) and the 32 skills (multi-hot).
+class CareerModel:
+    def __init__(self, params=None):
+        self.params = dict(MODEL_PARAMS, **(params or {}))
+        self.encoders = {}
+        self.occupations = None
+        self.forest = None
+
+    def _width(self):
+        return 1 + sum(len(self.encoders[c].classes_) for c in CATEGORICAL_FEATURES) + len(SKILLS)
+
+    # Feature rows for a frame in the dataset layout: postings, or uploaded candidates whose
+    # interests / skills cells may list several separated values. Unknown labels are ignored.
+    def dataset_features(self, df):
+        features = np.zeros((len(df), self._width()), dtype=np.float32)
+        features[:, 0] = df['age'].to_numpy()
+        offset = 1
+        for column in CATEGORICAL_FEATURES:
+            classes = self.encoders[column].classes_
+            features[:, offset:offset + len(classes)] = multi_hot(df[column], classes).toarray()
+            offset += len(classes)
+        features[:, offset:] = multi_hot(df['skills'], SKILLS).toarray()
+        return features
+
+    # Feature row for one profile as stored in st.session_state.user_data
+    def profile_features(self, profile):
+        features = np.zeros((1, self._width()), dtype=np.float32)
+        features[0, 0] = profile['age']
+        values = {
+            'sex': [profile['gender']],
+            'education': [profile['education']],
+            'workclass': [profile['workclass']],
+            'interests': profile['interests'],
+        }
+        offset = 1
+        for column in CATEGORICAL_FEATURES:
+            lookup = {label: i for i, label in enumerate(self.encoders[column].classes_)}
+            for value in values[column]:
+                if value in lookup:
+                    features[0, offset + lookup[value]] = 1
+            offset += len(lookup)
+        skill_ids = [SKILLS.index(skill) for skill in profile['skills'] if skill in SKILLS]
+        features[0, offset + np.array(skill_ids, dtype=int)] = 1
+        return features
+
+    def fit(self, df):
+        # sklearn and scipy are imported where they are used, so importing this module (as
+        # the pages do through income_model) stays cheap
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import LabelEncoder
+        if len(df) > MAX_TRAINING_ROWS:
+            rng = np.random.default_rng(self.params['random_state'])
+            df = df.iloc[np.sort(rng.choice(len(df), MAX_TRAINING_ROWS, replace=False))]
+        for column in CATEGORICAL_FEATURES:
+            self.encoders[column] = LabelEncoder().fit(df[column].astype(str))
+        self.occupations = LabelEncoder()
+        target = self.occupations.fit_transform(df['occupation'].astype(str))
+        forest = RandomForestClassifier(n_jobs=-1, **self.params)
+        forest.fit(self.dataset_features(df), target)
+        self.forest = PackedForest(forest)
+        return self
+
+    def predict_proba(self, profile):
+        return self.forest.predict_proba(self.profile_features(profile))[0]
+
+    # Occupation probabilities for every row of a frame in the dataset layout, shape (rows, classes)
+    def predict_frame_proba(self, df):
+        return self.forest.predict_proba(self.dataset_features(df))
+
+    # The n most likely occupations for a profile as (label, probability), best first; one
+    # forest pass scores every occupation, so n only changes the top-k selection
+    def top_occupations(self, profile, n=TOP_OCCUPATIONS):
+        proba = self.predict_proba(profile)
+        return [(self.occupations.classes_[i], float(proba[i])) for i in top_k(proba, n)]
+
+    def predict(self, profile):
+        return self.occupations.classes_[int(np.argmax(self.predict_proba(profile)))]
+
+
+# Model for this dataset version and parameters, from memory, the memory-mapped artifact
+# store, or trained once and stored so other workers and restarts do not retrain
+def load_or_train(shared_dataset, params=None):
+    params = dict(MODEL_PARAMS, **(params or {}))
+    return load_or_build(
+        "career_model",
+        shared_dataset.version,
+        params,
+        lambda: CareerModel(params).fit(shared_dataset.view())
+    )
@@ -0,0 +1,250 @@
+import os
+import queue
+import secrets
+import sqlite3
+import string
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from data_loader import BASE_DIR
+
+# Durable user data (certifications and test attempts). Unlike the cache dir it must survive
+# deploys, so it has its own location.
+STORE_PATH = os.environ.get("CAREER_STORE_PATH", os.path.join(BASE_DIR, ".data", "certifications.db"))
+
+# Read connections kept open per process; the single writer connection is extra
+POOL_SIZE = 4
+
+# Most writes committed in one transaction
+WRITE_BATCH = 500
+
+# Milliseconds a connection waits for another process's write lock before failing
+BUSY_TIMEOUT = 5000
+
+# Users whose certifications are kept in memory per process (least recently used go first),
+# and seconds before a cached entry is re-read to pick up other processes' writes
+CACHED_USERS = 10_000
+CACHE_TTL = 30
+
+# User ids are URL-safe random tokens of this many characters
+USER_ID_LENGTH = 22
+_USER_ID_CHARS = set(string.ascii_letters + string.digits + "-_")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL REFERENCES users (id),
+    skill TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    questions INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_by_user ON attempts (user_id, finished_at);
+CREATE TABLE IF NOT EXISTS certifications (
+    user_id TEXT NOT NULL REFERENCES users (id),
+    skill TEXT NOT NULL,
+    certified_at REAL NOT NULL,
+    PRIMARY KEY (user_id, skill)
+) WITHOUT ROWID;
+"""
+
+
+def new_user_id():
+    return secrets.token_urlsafe(16)
+
+
+def valid_user_id(user_id):
+    return isinstance(user_id, str) and len(user_id) == USER_ID_LENGTH and set(user_id) <= _USER_ID_CHARS
+
+
+# One queued write: its statements, and once committed, the error (if any) for the caller
+class _Write:
+    def __init__(self, statements):
+        self.statements = statements
+        self.error = None
+        self.done = threading.Event()
+
+
+# Users, their certifications and every test attempt in one SQLite database in WAL mode, so
+# readers never block the writer and several worker processes can share the file.
+# Writes go through a queue to one writer thread that commits everything queued since its
+# last commit in a single transaction (group commit); callers wait for their own write to
+# be committed. Reads use a small per-process connection pool behind a read-through cache of
+# each user's certifications, which a commit invalidates for the users it touched.
+class CertificationStore:
+    def __init__(self, path=STORE_PATH, pool_size=POOL_SIZE, cached_users=CACHED_USERS, cache_ttl=CACHE_TTL):
+        self.path = path
+        self.pool_size = pool_size
+        self.cached_users = cached_users
+        self.cache_ttl = cache_ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        writer = self._connect()
+        writer.execute("PRAGMA journal_mode=WAL")
+        writer.executescript(SCHEMA)
+        self._pool = queue.LifoQueue()
+        self._opened = 0
+        self._pool_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._commits = 0
+        self._pending = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, args=(writer,), name="certification-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT / 1000, isolation_level=None,
+                                     check_same_thread=False)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    # A pooled read connection; at most pool_size are opened, later callers wait for one
+    @contextmanager
+    def _reader(self):
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                opened = self._opened < self.pool_size
+                if opened:
+                    self._opened += 1
+            connection = self._connect() if opened else self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def _write_loop(self, connection):
+        while True:
+            batch = [self._pending.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [write for write in batch if write is not None]
+            if batch:
+                self._commit(connection, batch)
+            if stop:
+                connection.close()
+                return
+
+    def _commit(self, connection, batch):
+        try:
+            self._execute(connection, batch)
+        except Exception:
+            # One bad write must not fail the others committed with it
+            for write in batch:
+                try:
+                    self._execute(connection, [write])
+                except Exception as e:
+                    write.error = e
+        users = {params[0] for write in batch for _, params in write.statements}
+        with self._cache_lock:
+            self._commits += 1
+            for user_id in users:
+                self._cache.pop(user_id, None)
+        for write in batch:
+            write.done.set()
+
+    def _execute(self, connection, batch):
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for write in batch:
+                for statement, params in write.statements:
+                    connection.execute(statement, params)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    # Queue statements (each with the user id as first parameter) for the writer; with wait,
+    # block until they are committed and raise the error if they failed
+    def _write(self, statements, wait=True):
+        write = _Write(statements)
+        self._pending.put(write)
+        if wait:
+            write.done.wait()
+            if write.error is not None:
+                raise write.error
+        return write
+
+    # Register a user (a no-op for known ones) without waiting for the commit
+    def add_user(self, user_id):
+        self._write([("INSERT OR IGNORE INTO users (id, created_at) VALUES (?, ?)", (user_id, time.time()))],
+                    wait=False)
+
+    # Store one finished test attempt; a passed one also certifies the skill (kept from the
+    # first pass). Returns once the attempt is committed.
+    def record_attempt(self, user_id, skill, mode, questions, correct, passed):
+        now = time.time()
+        statements = [
+            ("INSERT OR IGNORE INTO users (id, created_at) VALUES (?, ?)", (user_id, now)),
+            ("INSERT INTO attempts (user_id, skill, mode, questions, correct, passed, finished_at) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?)", (user_id, skill, mode, int(questions), int(correct), int(passed), now)),
+        ]
+        if passed:
+            statements.append(("INSERT OR IGNORE INTO certifications (user_id, skill, certified_at) VALUES (?, ?, ?)",
+                               (user_id, skill, now)))
+        self._write(statements)
+
+    # Skills a user has certified, in the order they were certified
+    def certified_skills(self, user_id):
+        with self._cache_lock:
+            entry = self._cache.get(user_id)
+            if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+                self._cache.move_to_end(user_id)
+                return entry[1]
+            commits = self._commits
+        with self._reader() as connection:
+            rows = connection.execute("SELECT skill FROM certifications WHERE user_id = ? ORDER BY certified_at",
+                                      (user_id,)).fetchall()
+        skills = tuple(skill for skill, in rows)
+        with self._cache_lock:
+            # A commit since the read started may have changed this user; leave it uncached
+            if self._commits == commits:
+                self._cache[user_id] = (time.monotonic(), skills)
+                self._cache.move_to_end(user_id)
+                while len(self._cache) > self.cached_users:
+                    self._cache.popitem(last=False)
+        return skills
+
+    # A user's most recent test attempts, newest first
+    def attempts(self, user_id, limit=20):
+        with self._reader() as connection:
+            rows = connection.execute(
+                "SELECT skill, mode, questions, correct, passed, finished_at FROM attempts "
+                "WHERE user_id = ? ORDER BY finished_at DESC LIMIT ?", (user_id, limit)).fetchall()
+        return [{'skill': skill, 'mode': mode, 'questions': questions, 'correct': correct, 'passed': bool(passed),
+                 'finished_at': finished_at} for skill, mode, questions, correct, passed, finished_at in rows]
+
+    # Commit everything queued, stop the writer and close every connection
+    def close(self):
+        self._pending.put(None)
+        self._writer.join()
+        while self._opened:
+            self._pool.get().close()
+            self._opened -= 1
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# The store shared by every page script and session in this process, opened on first use
+def certification_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CertificationStore()
+        return _store
@@ -0,0 +1,408 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from pandas.api.types import union_categoricals
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DATASET_URL = "https://raw.githubusercontent.com/harishkumar-devlops/career-guidence/refs/heads/main/FINAL%20DATASET.csv"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(BASE_DIR, "FINAL DATASET.csv")
+CACHE_DIR = os.environ.get("CAREER_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+
+DATASET_COLUMNS = ['age', 'sex', 'education', 'workclass', 'hours-per-week',
+                   'marital-status', 'occupation', 'skills', 'interests', 'income']
+
+# Explicit dataset schema. The seven string columns have 2-100 distinct values each and are
+# held as categoricals; numerics get the narrowest dtype that holds their documented range.
+CATEGORICAL_COLUMNS = ['sex', 'education', 'workclass', 'marital-status',
+                       'occupation', 'skills', 'interests']
+NUMERIC_DTYPES = {'age': 'uint8', 'hours-per-week': 'uint8', 'income': 'uint32'}
+SCHEMA_VERSION = 1
+
+# Appends remembered in the append log's metadata, so a loaded version can pick up rows
+# added after it
+MAX_APPENDS = 32
+
+REMOTE_TIMEOUT = 10
+REMOTE_CHECK_INTERVAL = 300
+
+_remote_lock = threading.Lock()
+_append_lock = threading.Lock()
+_remote_thread = None
+_remote_checked_at = 0.0
+
+
+# Remote copy and its HTTP validators (ETag / Last-Modified) live in the cache dir
+def _remote_paths(cache_dir):
+    return (os.path.join(cache_dir, "remote_dataset.csv"),
+            os.path.join(cache_dir, "remote_dataset.json"))
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+# A downloaded copy is only swapped in when its header matches the bundled schema and every
+# row parses under it, so a bad download never replaces a working copy
+def _has_dataset_header(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        header = f.readline().strip()
+    return header.split(",") == DATASET_COLUMNS
+
+
+def _fits_schema(path):
+    try:
+        apply_schema(pd.read_csv(path, dtype={c: 'category' for c in CATEGORICAL_COLUMNS}))
+    except (ValueError, pd.errors.ParserError):
+        return False
+    return True
+
+
+# Pick the freshest local copy: the last remote download if present, else the bundled CSV
+def dataset_path(local_path=DATASET_PATH, cache_dir=CACHE_DIR):
+    remote_csv, _ = _remote_paths(cache_dir)
+    if os.path.exists(remote_csv):
+        return remote_csv
+    return local_path
+
+
+# Postings appended at runtime go to an append log in the cache dir, never into the bundled
+# CSV (tracked in git) or the remote copy (replaced by every refresh); loading merges the log
+# on top of whichever dataset file is current. The metadata holds the committed length of
+# the log, the digest chained over its appends and the last MAX_APPENDS (end, digest) pairs.
+def _append_log_paths(cache_dir):
+    return (os.path.join(cache_dir, "appended_rows.csv"),
+            os.path.join(cache_dir, "appended_rows.json"))
+
+
+# Committed state of the append log; bytes past "end" (a write cut short) are not part of it
+def _append_log_state(cache_dir):
+    log_path, meta_path = _append_log_paths(cache_dir)
+    meta = _read_json(meta_path)
+    if not meta.get("end") or not os.path.exists(log_path) or os.path.getsize(log_path) < meta["end"]:
+        return {"end": 0, "digest": "", "appends": []}
+    return meta
+
+
+# Identifies the dataset currently on disk: the dataset file (changes whenever a new remote
+# copy lands) and the committed length and digest of the append log
+def dataset_source(local_path=DATASET_PATH, cache_dir=CACHE_DIR):
+    path = dataset_path(local_path, cache_dir)
+    stat = os.stat(path)
+    log = _append_log_state(cache_dir)
+    return (path, stat.st_mtime_ns, stat.st_size, log["end"], log["digest"])
+
+
+# Version key of a dataset source: the content digest of its file, combined with the append
+# log's digest when rows were appended
+def dataset_version(source, cache_dir=CACHE_DIR):
+    digest = source_digest(source[0], cache_dir)
+    if not source[3]:
+        return digest
+    return hashlib.blake2b(f"{digest}:{source[4]}".encode(), digest_size=16).hexdigest()
+
+
+# Conditional GET of the remote dataset. Returns True only when a new copy was stored;
+# a 304, a network error or running offline all leave the local files untouched.
+def refresh_remote(remote_url=DATASET_URL, cache_dir=CACHE_DIR, timeout=REMOTE_TIMEOUT):
+    global _remote_checked_at
+    remote_csv, meta_path = _remote_paths(cache_dir)
+    meta = _read_json(meta_path) if os.path.exists(remote_csv) else {}
+    # Validators only count for the URL that issued them; a new source is fetched in full
+    if meta.get("url") != remote_url:
+        meta = {}
+
+    request = urllib.request.Request(remote_url)
+    if meta.get("etag"):
+        request.add_header("If-None-Match", meta["etag"])
+    if meta.get("last_modified"):
+        request.add_header("If-Modified-Since", meta["last_modified"])
+
+    _remote_checked_at = time.monotonic()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    shutil.copyfileobj(response, out)
+                if not (_has_dataset_header(tmp_path) and _fits_schema(tmp_path)):
+                    return False
+                os.replace(tmp_path, remote_csv)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            _write_json(meta_path, {
+                "url": remote_url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            })
+            return True
+    except urllib.error.HTTPError:
+        # 304 Not Modified means our copy is current; other statuses keep it as well
+        return False
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+# Kick off a remote check on a daemon thread; at most one runs at a time and
+# checks are throttled to one per REMOTE_CHECK_INTERVAL unless forced
+def start_remote_refresh(remote_url=DATASET_URL, cache_dir=CACHE_DIR, force=False):
+    global _remote_thread
+    with _remote_lock:
+        if _remote_thread is not None and _remote_thread.is_alive():
+            return _remote_thread
+        if not force and _remote_checked_at and time.monotonic() - _remote_checked_at < REMOTE_CHECK_INTERVAL:
+            return None
+        _remote_thread = threading.Thread(
+            target=refresh_remote,
+            args=(remote_url, cache_dir),
+            name="dataset-remote-refresh",
+            daemon=True,
+        )
+        _remote_thread.start()
+        return _remote_thread
+
+
+# Content hash of a file. Digests are memoised per (path, mtime, size) in the cache dir
+# so restarts against an unchanged file do not re-read it.
+def source_digest(path, cache_dir=CACHE_DIR):
+    stat = os.stat(path)
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    memo_path = os.path.join(cache_dir, "digests.json")
+    memo = _read_json(memo_path)
+    entry = memo.get(path)
+    if entry and entry["stamp"] == stamp:
+        return entry["digest"]
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    memo[path] = {"stamp": stamp, "digest": digest}
+    _write_json(memo_path, memo)
+    return digest
+
+
+# Serialise appends across worker processes sharing the cache dir
+class _AppendLock:
+    def __init__(self, cache_dir):
+        self.path = os.path.join(cache_dir, "appended_rows.lock")
+        self.file = None
+
+    def __enter__(self):
+        _append_lock.acquire()
+        self.file = open(self.path, "w")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+        _append_lock.release()
+
+
+# Append new postings to the append log. The batch is cast to the dataset schema first and
+# rejected with ValueError (nothing written) when a column is missing or a numeric value is
+# not a whole number in its schema range. The log's digest is chained from the previous one
+# and the end of each append remembered, so a loaded version of the previous content can
+# read just these rows (see read_appended). Returns the new dataset source.
+def append_rows(batch, local_path=DATASET_PATH, cache_dir=CACHE_DIR):
+    missing = [column for column in DATASET_COLUMNS if column not in batch.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    typed = apply_schema(batch[DATASET_COLUMNS])
+    for column, dtype in NUMERIC_DTYPES.items():
+        if typed[column].dtype != dtype:
+            info = np.iinfo(dtype)
+            raise ValueError(f"Column '{column}' must hold whole numbers from {info.min} to {info.max}")
+    data = typed.to_csv(index=False, header=False).encode("utf-8")
+
+    log_path, meta_path = _append_log_paths(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    with _AppendLock(cache_dir):
+        log = _append_log_state(cache_dir)
+        with open(log_path, "r+b" if log["end"] else "wb") as f:
+            f.seek(log["end"])
+            f.truncate()
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        end = log["end"] + len(data)
+        digest = hashlib.blake2b(log["digest"].encode() + data, digest_size=16).hexdigest()
+        appends = log["appends"] + [{"end": end, "digest": digest}]
+        _write_json(meta_path, {"end": end, "digest": digest, "appends": appends[-MAX_APPENDS:]})
+    return dataset_source(local_path, cache_dir)
+
+
+# Rows of the append log between two committed lengths, in the dataset schema
+def _read_append_log(cache_dir, start, end):
+    log_path, _ = _append_log_paths(cache_dir)
+    with open(log_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    batch = pd.read_csv(io.BytesIO(data), header=None, names=DATASET_COLUMNS,
+                        dtype={c: 'category' for c in CATEGORICAL_COLUMNS})
+    return apply_schema(batch)
+
+
+# Rows appended (through append_rows) between the sources `parent` and `source`, or None when
+# the dataset file changed, the log was reset, or `parent` is too old to be remembered
+def read_appended(source, parent, cache_dir=CACHE_DIR):
+    if source[:3] != parent[:3] or source[3] <= parent[3]:
+        return None
+    appends = _append_log_state(cache_dir)["appends"]
+    for end, digest in ((source[3], source[4]), (parent[3], parent[4])):
+        if end and {"end": end, "digest": digest} not in appends:
+            return None
+    return _read_append_log(cache_dir, parent[3], source[3])
+
+
+def _columnar_path(cache_dir, digest):
+    return os.path.join(cache_dir, f"dataset-{digest}-v{SCHEMA_VERSION}.arrow")
+
+
+# Cast a raw frame to the dataset schema. A numeric column with a non-numeric cell raises
+# ValueError naming the column and the first bad row. A numeric column whose values do not fit
+# its schema dtype (e.g. a future income above 4.2 billion) is downcast as far as it safely goes.
+def apply_schema(df):
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column, dtype in NUMERIC_DTYPES.items():
+        if column not in df.columns:
+            continue
+        values = pd.to_numeric(df[column], errors='coerce')
+        invalid = np.flatnonzero(values.isna().to_numpy() & df[column].notna().to_numpy())
+        if len(invalid):
+            raise ValueError(f"Column '{column}' has {len(invalid):,} non-numeric values "
+                             f"(first: {df[column].iloc[invalid[0]]!r} in data row {invalid[0] + 1})")
+        info = np.iinfo(dtype)
+        if (values.notna().all() and values.min() >= info.min and values.max() <= info.max
+                and (values == values.round()).all()):
+            df[column] = values.astype(dtype)
+        else:
+            df[column] = pd.to_numeric(values, downcast='integer')
+    return df
+
+
+# Codes of `column` against `labels`, extended (as a new list) with the values it adds at the
+# end, so codes handed out for earlier rows stay valid. Missing values get -1.
+def extend_categories(labels, column):
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype('category')
+    lookup = {label: i for i, label in enumerate(labels)}
+    labels = list(labels)
+    for category in column.cat.categories:
+        if str(category) not in lookup:
+            lookup[str(category)] = len(labels)
+            labels.append(str(category))
+    mapping = np.array([lookup[str(category)] for category in column.cat.categories] + [-1], dtype=np.int64)
+    return labels, mapping[column.cat.codes.to_numpy()]
+
+
+# Rows of `batch` (any frame with the dataset columns) following the rows of `df`, in the
+# dataset schema. Categorical columns keep the categories of `df` first.
+def append_frame(df, batch):
+    batch = apply_schema(batch[DATASET_COLUMNS])
+    columns = {}
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            columns[column] = union_categoricals([df[column], batch[column]], ignore_order=True)
+        else:
+            columns[column] = pd.concat([df[column], batch[column]], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+# Uncompressed Arrow IPC (Feather v2) so the file can be memory-mapped on load
+def _write_columnar(df, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    os.close(fd)
+    try:
+        feather.write_feather(df, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_columnar(path):
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+# Parse a dataset CSV through the columnar cache: the first start pays for read_csv and
+# writes dataset-<hash>.arrow, later starts map that file. A changed hash (new content)
+# misses the cache and falls back to the CSV parse, replacing the stale cache file.
+def read_dataset_csv(path, cache_dir=CACHE_DIR):
+    digest = source_digest(path, cache_dir)
+    cached = _columnar_path(cache_dir, digest)
+    if os.path.exists(cached):
+        try:
+            return _read_columnar(cached)
+        except (pa.ArrowInvalid, OSError):
+            os.remove(cached)
+
+    df = apply_schema(pd.read_csv(path, dtype={c: 'category' for c in CATEGORICAL_COLUMNS}))
+    for name in os.listdir(cache_dir):
+        if name.startswith("dataset-") and name.endswith(".arrow"):
+            os.remove(os.path.join(cache_dir, name))
+    _write_columnar(df, cached)
+    return df
+
+
+# Local-first loader: parse whatever is on disk now (plus the appended rows) and check the
+# remote in the background
+def load_dataset(source=None, remote_url=DATASET_URL, cache_dir=CACHE_DIR, check_remote=True):
+    if source is None:
+        source = dataset_source(cache_dir=cache_dir)
+    df = read_dataset_csv(source[0], cache_dir)
+    if source[3]:
+        df = append_frame(df, _read_append_log(cache_dir, 0, source[3]))
+    if check_remote and remote_url:
+        start_remote_refresh(remote_url, cache_dir)
+    return df
+
+
+# `python data_loader.py new_postings.csv` appends the postings of a CSV with the dataset
+# header to the append log; running apps pick them up incrementally on their next dataset check
+if __name__ == "__main__":
+    import sys
+    for csv_path in sys.argv[1:]:
+        rows = pd.read_csv(csv_path)
+        source = append_rows(rows)
+        print(f"appended {len(rows):,} rows ({source[3] / 2**20:.1f}MB appended in total)")
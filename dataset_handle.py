@@ -0,0 +1,32 @@
+import pandas as pd
+
+from data_loader import CACHE_DIR, dataset_source, dataset_version, load_dataset
+
+# Sessions get shallow views of the shared frame. Copy-on-Write (always on from pandas 3)
+# turns any write through a view into a private copy, so one session can never change
+# the data another session sees.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# Process-wide, read-only handle on one version of the dataset. The dataset registry keeps a
+# single instance per version and every rerun of every session reads it through view(),
+# which costs a few microseconds instead of unpickling a full copy.
+class SharedDataset:
+    def __init__(self, df, version):
+        self._df = df
+        self.version = version
+
+    @classmethod
+    def load(cls, source=None, cache_dir=CACHE_DIR, check_remote=True):
+        if source is None:
+            source = dataset_source(cache_dir=cache_dir)
+        df = load_dataset(source, cache_dir=cache_dir, check_remote=check_remote)
+        return cls(df, dataset_version(source, cache_dir))
+
+    # Zero-copy view; column assignment or cell writes on it only affect the caller
+    def view(self):
+        return self._df.copy(deep=False)
+
+    def __len__(self):
+        return len(self._df)
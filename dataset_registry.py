@@ -0,0 +1,229 @@
+import threading
+import time
+
+from data_loader import (CACHE_DIR, REMOTE_CHECK_INTERVAL, append_frame, append_rows, dataset_source,
+                         dataset_version, read_appended, refresh_remote)
+from dataset_handle import SharedDataset
+from model_store import release_version
+
+# Seconds a replaced version stays loaded after the last session using it was seen
+VERSION_GRACE = 600
+
+
+def _result_order(version, sort_label):
+    from result_order import SORT_OPTIONS, ResultOrder
+    spec = SORT_OPTIONS[sort_label]
+    df = version.dataset.view()
+    return ResultOrder(df) if spec is None else ResultOrder(df, *spec)
+
+
+def _batch_scorer(version):
+    from batch_prediction import BatchScorer
+    return BatchScorer(version.dataset.view(), version.artifact('career_model'),
+                       version.artifact('skill_matrix'), version.artifact('income_model'))
+
+
+# Derived artifacts of a dataset version: name -> build(version, *args). Modules are imported
+# on first use so importing the registry stays cheap.
+def _builders():
+    import career_model
+    import income_model
+    from analytics import AggregateCube, DistributionSummary, RunningStats, SkillIncome
+    from facet_index import FacetIndex
+    from skill_matching import SkillMatrix
+    return {
+        'facet_index': lambda version: FacetIndex(version.dataset.view()),
+        'skill_matrix': lambda version: SkillMatrix(version.dataset.view()),
+        'career_model': lambda version: career_model.load_or_train(version.dataset),
+        'income_model': lambda version: income_model.load_or_train(version.dataset),
+        'batch_scorer': _batch_scorer,
+        'result_order': _result_order,
+        'cube': lambda version: AggregateCube(version.dataset.view()),
+        'distributions': lambda version: DistributionSummary(version.dataset.view(), version.artifact('running_stats')),
+        'skill_income': lambda version: SkillIncome(version.dataset.view()),
+        'running_stats': lambda version: RunningStats(version.dataset.view()),
+    }
+
+
+# Artifacts a version with appended rows derives from its parent's instead of rebuilding:
+# name -> update(artifact, appended rows, new version). The models are kept as trained on
+# the parent; a full reload of changed data retrains them. Updates run in this order, so one
+# may use the new version's artifacts listed before it.
+def _appenders():
+    return {
+        'facet_index': lambda index, batch, version: index.append(batch),
+        'skill_matrix': lambda matrix, batch, version: matrix.append(batch),
+        'career_model': lambda model, batch, version: model,
+        'income_model': lambda model, batch, version: model,
+        'result_order': lambda order, batch, version: order.append(version.dataset.view()),
+        'cube': lambda cube, batch, version: cube.append(batch),
+        'running_stats': lambda stats, batch, version: stats.append(batch),
+        'skill_income': lambda skill_income, batch, version: skill_income.append(batch),
+        'distributions': lambda summary, batch, version: summary.append(batch, version.artifact('running_stats')),
+        'batch_scorer': lambda scorer, batch, version: scorer.append(batch, version.artifact('skill_matrix')),
+    }
+
+
+# Artifacts built for a version before it goes live, as (name, args)
+def _warm_artifacts():
+    from result_order import SORT_OPTIONS
+    names = ['facet_index', 'skill_matrix', 'career_model', 'income_model', 'batch_scorer',
+             'cube', 'distributions', 'skill_income', 'running_stats']
+    return [(name, ()) for name in names] + [('result_order', (label,)) for label in SORT_OPTIONS]
+
+
+# One immutable dataset version (keyed by its content digest) and everything derived from it.
+# Each artifact is built once, by whichever caller asks first; the others wait for it.
+class DatasetVersion:
+    def __init__(self, source, dataset):
+        self.source = source
+        self.dataset = dataset
+        self.key = dataset.version
+        self.last_used = time.monotonic()
+        self._artifacts = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def artifact(self, name, *args):
+        key = (name, args)
+        if key in self._artifacts:
+            return self._artifacts[key]
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._artifacts:
+                self._artifacts[key] = _builders()[name](self, *args)
+        return self._artifacts[key]
+
+    # Version `key` of `source`: these rows followed by `batch`. Artifacts already built here
+    # are carried over incrementally where they can be; the rest are built on first use.
+    def appended(self, source, key, batch):
+        version = DatasetVersion(source, SharedDataset(append_frame(self.dataset.view(), batch), key))
+        artifacts = list(self._artifacts.items())
+        for name, append in _appenders().items():
+            for (artifact_name, args), artifact in artifacts:
+                if artifact_name == name:
+                    version._artifacts[(name, args)] = append(artifact, batch, version)
+        return version
+
+    def warm(self):
+        for name, args in _warm_artifacts():
+            self.artifact(name, *args)
+
+
+# Process-wide registry of dataset versions. Sessions pin the version they started with;
+# refresh() loads a new version and builds its artifacts on a background thread, then swaps
+# it in as current in one step. A replaced version is dropped, with all its artifacts, once
+# no session has used it for VERSION_GRACE seconds.
+class DatasetRegistry:
+    def __init__(self, cache_dir=CACHE_DIR, check_interval=REMOTE_CHECK_INTERVAL):
+        self.cache_dir = cache_dir
+        self.check_interval = check_interval
+        self.versions = {}
+        self.current_key = None
+        self.status = "idle"
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._checked_at = None
+
+    def _load(self, source):
+        dataset = SharedDataset.load(source, self.cache_dir, check_remote=False)
+        return DatasetVersion(source, dataset)
+
+    # The first call loads the dataset and warms its artifacts in the background
+    def _ensure_current(self):
+        with self._lock:
+            if self.current_key is None:
+                version = self._load(dataset_source(cache_dir=self.cache_dir))
+                self.versions[version.key] = version
+                self.current_key = version.key
+                threading.Thread(target=version.warm, name="dataset-warm", daemon=True).start()
+            return self.versions[self.current_key]
+
+    # The live version; also starts the periodic background check for new data
+    def current(self):
+        current = self._ensure_current()
+        current.last_used = time.monotonic()
+        if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+        return current
+
+    # A loaded version by key, or None once it has been evicted
+    def get(self, key):
+        version = self.versions.get(key)
+        if version is not None:
+            version.last_used = time.monotonic()
+        return version
+
+    # Make `version` current and drop replaced versions no session has used recently
+    def _swap(self, version):
+        with self._lock:
+            self.versions[version.key] = version
+            self.current_key = version.key
+            now = time.monotonic()
+            for key in [k for k, v in self.versions.items()
+                        if k != self.current_key and now - v.last_used > VERSION_GRACE]:
+                del self.versions[key]
+                release_version(key)
+
+    def _refresh(self, check_remote):
+        try:
+            if check_remote:
+                self.status = "checking for new data"
+                refresh_remote(cache_dir=self.cache_dir)
+            source = dataset_source(cache_dir=self.cache_dir)
+            current = self._ensure_current()
+            appended = None if source == current.source else read_appended(source, current.source, self.cache_dir)
+            if appended is not None:
+                self.status = f"adding {len(appended):,} new rows"
+                version = current.appended(source, dataset_version(source, self.cache_dir), appended)
+                version.warm()
+                self._swap(version)
+            elif source != current.source and dataset_version(source, self.cache_dir) != current.key:
+                self.status = "building new version"
+                version = self._load(source)
+                version.warm()
+                self._swap(version)
+            else:
+                # Same content (or a touched file): keep the live version, drop stale ones
+                current.source = source
+                self._swap(current)
+            self.status = "idle"
+        except Exception as e:
+            self.status = f"refresh failed: {e}"
+
+    # Start a background refresh (remote check, load, warm, swap) unless one is running.
+    # Returns the thread so callers that need the result can join it.
+    def refresh(self, check_remote=True):
+        self._ensure_current()
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh, args=(check_remote,), name="dataset-refresh", daemon=True
+                )
+                self._refresh_thread.start()
+            return self._refresh_thread
+
+    # Append new postings to the append log (a batch that does not fit the schema raises
+    # ValueError and is not written) and fold them into a new version in the background
+    # (derived artifacts are updated incrementally, see DatasetVersion.appended)
+    def append(self, batch):
+        append_rows(batch, cache_dir=self.cache_dir)
+        running = self._refresh_thread
+        if running is not None:
+            running.join()
+        return self.refresh(check_remote=False)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+# The registry shared by every page script and session in this process
+def dataset_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DatasetRegistry()
+        return _registry
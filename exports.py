@@ -0,0 +1,85 @@
+import gzip
+import os
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_loader import CACHE_DIR
+
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+
+# Download formats: label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+# Rows serialised per chunk; bounds the memory a large export needs while it is written
+EXPORT_CHUNK_ROWS = 100_000
+
+# Seconds an export of another dataset version is kept after it was last served. Sessions
+# pinned to a replaced version keep downloading its exports until the registry evicts it
+# (VERSION_GRACE after their last use), so this is well past that.
+EXPORT_MAX_AGE = 3600
+
+
+def export_path(name, version, fmt, export_dir=EXPORT_DIR):
+    return os.path.join(export_dir, f"{name}-{version}.{EXPORT_FORMATS[fmt][0]}")
+
+
+def _write_chunks(df, path, fmt, chunk_rows):
+    if fmt == 'Parquet':
+        writer = None
+        for start in range(0, max(len(df), 1), chunk_rows):
+            table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression='zstd')
+            writer.write_table(table)
+        writer.close()
+        return
+    opener = gzip.open if fmt == 'CSV (gzip)' else open
+    with opener(path, 'wb') as f:
+        f.write(df.iloc[:0].to_csv(index=False).encode('utf-8'))
+        for start in range(0, len(df), chunk_rows):
+            f.write(df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode('utf-8'))
+
+
+# Path of the `name` export of this dataset version in the given format, written on first
+# request (in row chunks, then atomically renamed) and reused afterwards. Exports of other
+# versions under the same name are removed once unused for EXPORT_MAX_AGE.
+def build_export(name, version, fmt, frame, export_dir=EXPORT_DIR, chunk_rows=EXPORT_CHUNK_ROWS):
+    path = export_path(name, version, fmt, export_dir)
+    if os.path.exists(path):
+        return path
+    os.makedirs(export_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=export_dir, suffix=".part")
+    os.close(fd)
+    try:
+        _write_chunks(frame(), tmp_path, fmt, chunk_rows)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    now = time.time()
+    for other in os.listdir(export_dir):
+        other_path = os.path.join(export_dir, other)
+        if (other.startswith(f"{name}-") and not other.startswith(f"{name}-{version}.")
+                and now - os.path.getmtime(other_path) > EXPORT_MAX_AGE):
+            try:
+                os.remove(other_path)
+            except FileNotFoundError:
+                pass
+    return path
+
+
+# Contents of an export for st.download_button(data=...), which keeps the payload in memory
+# either way; `frame` is only called when the export for this version and format has not been
+# written yet. Serving it marks it as in use (see EXPORT_MAX_AGE).
+def read_export(name, version, fmt, frame, export_dir=EXPORT_DIR):
+    path = build_export(name, version, fmt, frame, export_dir)
+    os.utime(path)
+    with open(path, 'rb') as f:
+        return f.read()
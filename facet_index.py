@@ -0,0 +1,247 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from data_loader import extend_categories
+
+# Find Job search facets, in the order the selectboxes are shown
+FACETS = ['occupation', 'education', 'workclass', 'interests']
+
+# Rows per block when locating a slice of a bitmap match (must be a multiple of 8)
+BLOCK_ROWS = 1 << 16
+
+# Largest facet contingency table kept for O(1) counts; the four Find Job facets need 50k cells
+MAX_COUNT_CELLS = 1 << 22
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(values):
+        return _POPCOUNT_TABLE[values]
+
+
+# Positions of the set bits of a little-endian packed bitmap, touching only non-zero bytes
+def _set_bits(packed, offset=0):
+    nonzero = np.flatnonzero(packed)
+    bits = np.unpackbits(packed[nonzero][:, None], axis=1, bitorder='little')
+    byte_index, bit = np.nonzero(bits)
+    return (nonzero[byte_index] + offset) * 8 + bit
+
+
+# Rows matching one search. Depending on the selection it is backed by every row, a single
+# posting list (plus its bitmap), or the AND of several facet bitmaps; rows() only
+# materialises what it returns.
+class FacetMatch:
+    def __init__(self, n_rows, rows=None, mask=None):
+        self.n_rows = n_rows
+        self._rows = rows
+        self.mask = mask
+        if rows is not None:
+            self.count = len(rows)
+        elif mask is not None:
+            self._block_counts = _popcount(mask).reshape(-1, BLOCK_ROWS // 8).sum(axis=1, dtype=np.int64)
+            self.count = int(self._block_counts.sum())
+        else:
+            self.count = n_rows
+
+    def __len__(self):
+        return self.count
+
+    # Ascending row positions [start:stop] of the match
+    def rows(self, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return np.empty(0, dtype=np.int64)
+        if self._rows is not None:
+            return self._rows[start:stop]
+        if self.mask is None:
+            return np.arange(start, stop)
+        if start == 0 and stop == self.count:
+            self._rows = _set_bits(self.mask)
+            return self._rows
+        # Skip whole blocks using their popcounts, then unpack only the blocks in range
+        cumulative = np.cumsum(self._block_counts)
+        first = int(np.searchsorted(cumulative, start, side='right'))
+        last = int(np.searchsorted(cumulative, stop - 1, side='right'))
+        block_bytes = BLOCK_ROWS // 8
+        rows = _set_bits(self.mask[first * block_bytes:(last + 1) * block_bytes], first * block_bytes)
+        skipped = int(cumulative[first - 1]) if first else 0
+        return rows[start - skipped:stop - skipped]
+
+    # Boolean membership of arbitrary row positions, without materialising the match
+    def contains(self, positions):
+        if self.mask is not None:
+            return ((self.mask[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1).astype(bool)
+        if self._rows is not None:
+            return np.isin(positions, self._rows)
+        return np.ones(len(positions), dtype=bool)
+
+
+# Bitmap / posting-list index over the categorical search facets, built once per dataset
+# version. Every facet value keeps its ascending row positions and a packed bitmap, so a
+# filter combination resolves by ANDing bitmaps instead of scanning the frame once per
+# selectbox, and per-option counts are read off a contingency table of all facets.
+class FacetIndex:
+    def __init__(self, df, facets=FACETS):
+        self.n_rows = len(df)
+        self.n_bytes = -(-self.n_rows // BLOCK_ROWS) * (BLOCK_ROWS // 8)
+        self.facets = list(facets)
+        self.labels = {}
+        self.lookup = {}
+        self.codes = {}
+        self.order = {}
+        self.bounds = {}
+        self.totals = {}
+        self.bitmaps = {}
+
+        position_dtype = np.int32 if self.n_rows < 2**31 else np.int64
+        for facet in self.facets:
+            column = df[facet]
+            if not isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype('category')
+            labels = [str(label) for label in column.cat.categories]
+            codes = column.cat.codes.to_numpy()
+            valid = codes >= 0
+            counts = np.bincount(codes[valid], minlength=len(labels))
+
+            self.labels[facet] = labels
+            self.lookup[facet] = {label: i for i, label in enumerate(labels)}
+            self.codes[facet] = codes
+            # Row positions grouped by code; a stable sort keeps each posting list ascending
+            order = np.argsort(np.where(valid, codes, len(labels)), kind='stable').astype(position_dtype)
+            self.order[facet] = order
+            self.bounds[facet] = np.concatenate([[0], np.cumsum(counts)])
+            self.totals[facet] = counts
+
+            bitmaps = np.zeros((len(labels), self.n_bytes), dtype=np.uint8)
+            bits = np.zeros(self.n_bytes * 8, dtype=bool)
+            for code in range(len(labels)):
+                posting = order[self.bounds[facet][code]:self.bounds[facet][code + 1]]
+                bits[posting] = True
+                bitmaps[code] = np.packbits(bits, bitorder='little')
+                bits[posting] = False
+            self.bitmaps[facet] = bitmaps
+
+        # Row counts for every combination of facet values (plus a trailing "missing" slot per
+        # facet), so counts under any selection are a slice and a sum independent of row count
+        shape = tuple(len(self.labels[facet]) + 1 for facet in self.facets)
+        self.table = None
+        if np.prod(shape, dtype=np.int64) <= MAX_COUNT_CELLS:
+            cells = np.ravel_multi_index(
+                [np.where(self.codes[f] >= 0, self.codes[f], len(self.labels[f])) for f in self.facets],
+                shape
+            )
+            self.table = np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape)
+
+    # Index over these rows followed by the rows of `df`. Existing posting lists are moved into
+    # place and bitmaps copied; only the appended rows are coded, grouped and set.
+    def append(self, df):
+        index = copy.copy(self)
+        for attribute in ('labels', 'lookup', 'codes', 'order', 'bounds', 'totals', 'bitmaps'):
+            setattr(index, attribute, dict(getattr(self, attribute)))
+        n_old = self.n_rows
+        index.n_rows = n_old + len(df)
+        index.n_bytes = -(-index.n_rows // BLOCK_ROWS) * (BLOCK_ROWS // 8)
+        position_dtype = np.int32 if index.n_rows < 2**31 else np.int64
+
+        slot_maps, batch_slots = [], []
+        for facet in self.facets:
+            labels, codes = extend_categories(self.labels[facet], df[facet])
+            # Slots are the label codes plus a trailing one for missing values
+            slot_map = np.append(np.arange(len(self.labels[facet])), len(labels))
+            slots = np.where(codes >= 0, codes, len(labels))
+            old_counts = np.append(self.totals[facet], n_old - self.bounds[facet][-1])
+            before = np.zeros(len(labels) + 1, dtype=np.int64)
+            before[slot_map] = old_counts
+            added = np.bincount(slots, minlength=len(labels) + 1)
+            starts = np.concatenate([[0], np.cumsum(before + added)])
+
+            # Old rows move up by the rows added to earlier slots; appended rows follow them
+            order = np.empty(index.n_rows, dtype=position_dtype)
+            old_starts = np.concatenate([[0], np.cumsum(old_counts)[:-1]])
+            order[np.repeat(starts[slot_map] - old_starts, old_counts) + np.arange(n_old)] = self.order[facet]
+            added_starts = np.concatenate([[0], np.cumsum(added)[:-1]])
+            order[np.repeat(starts[:-1] + before - added_starts, added) + np.arange(len(df))] = (
+                np.argsort(slots, kind='stable') + n_old
+            )
+
+            bitmaps = np.zeros((len(labels), index.n_bytes), dtype=np.uint8)
+            bitmaps[:len(self.labels[facet]), :self.n_bytes] = self.bitmaps[facet]
+            valid = np.flatnonzero(codes >= 0)
+            rows = valid + n_old
+            np.bitwise_or.at(bitmaps, (codes[valid], rows >> 3), (1 << (rows & 7)).astype(np.uint8))
+
+            counts = (before + added)[:-1]
+            code_dtype = np.promote_types(self.codes[facet].dtype, np.min_scalar_type(-len(labels)))
+            index.labels[facet] = labels
+            index.lookup[facet] = {label: i for i, label in enumerate(labels)}
+            index.codes[facet] = np.concatenate([self.codes[facet], codes]).astype(code_dtype, copy=False)
+            index.order[facet] = order
+            index.bounds[facet] = np.concatenate([[0], np.cumsum(counts)])
+            index.totals[facet] = counts
+            index.bitmaps[facet] = bitmaps
+            slot_maps.append(slot_map)
+            batch_slots.append(slots)
+
+        shape = tuple(len(index.labels[facet]) + 1 for facet in self.facets)
+        index.table = None
+        if self.table is not None and np.prod(shape, dtype=np.int64) <= MAX_COUNT_CELLS:
+            index.table = np.zeros(shape, dtype=self.table.dtype)
+            index.table[np.ix_(*slot_maps)] = self.table
+            cells = np.ravel_multi_index(batch_slots, shape)
+            index.table += np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape)
+        return index
+
+    # Selected (facet, code) pairs; 'All' / None mean the facet is not filtered
+    def _active(self, selection, exclude=None):
+        active = []
+        for facet in self.facets:
+            label = selection.get(facet)
+            if facet == exclude or label is None or label == 'All':
+                continue
+            active.append((facet, self.lookup[facet].get(label, -1)))
+        return active
+
+    def _resolve(self, active):
+        if not active:
+            return FacetMatch(self.n_rows)
+        if any(code < 0 for _, code in active):
+            return FacetMatch(self.n_rows, rows=np.empty(0, dtype=np.int64))
+        if len(active) == 1:
+            facet, code = active[0]
+            rows = self.order[facet][self.bounds[facet][code]:self.bounds[facet][code + 1]]
+            return FacetMatch(self.n_rows, rows=rows, mask=self.bitmaps[facet][code])
+        return FacetMatch(self.n_rows, mask=self._mask(active))
+
+    def _mask(self, active):
+        facet, code = active[0]
+        mask = self.bitmaps[facet][code].copy()
+        for facet, code in active[1:]:
+            np.bitwise_and(mask, self.bitmaps[facet][code], out=mask)
+        return mask
+
+    # Rows matching every selected facet value
+    def search(self, selection):
+        return self._resolve(self._active(selection))
+
+    # Number of rows each value of each facet would return, given the other facets' selections
+    def facet_counts(self, selection):
+        counts = {}
+        for facet in self.facets:
+            others = self._active(selection, exclude=facet)
+            if not others:
+                values = self.totals[facet]
+            elif any(code < 0 for _, code in others):
+                values = np.zeros(len(self.labels[facet]), dtype=np.int64)
+            elif self.table is not None:
+                selected = dict(others)
+                sub = self.table[tuple(selected.get(f, slice(None)) for f in self.facets)]
+                keep = [f for f in self.facets if f not in selected].index(facet)
+                values = sub.sum(axis=tuple(i for i in range(sub.ndim) if i != keep))[:-1]
+            else:
+                values = _popcount(self.bitmaps[facet] & self._mask(others)).sum(axis=1, dtype=np.int64)
+            counts[facet] = dict(zip(self.labels[facet], values.tolist()))
+        return counts
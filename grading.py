@@ -0,0 +1,114 @@
+import string
+
+import numpy as np
+import pandas as pd
+
+from adaptive_test import PASS_SCORE
+from question_bank import pool_name, pool_question, question_bank
+
+# Response code of an unanswered question
+UNANSWERED = -1
+
+# Column naming the examinee in a paper results file
+CANDIDATE_COLUMN = 'candidate'
+
+# Largest paper results upload accepted in one batch
+MAX_EXAMINEES = 1_000_000
+
+
+# Grades a batch of submissions in one pass. responses is an (examinees x questions) integer
+# array of chosen option indices (UNANSWERED for blanks) and key the correct option of each
+# question; every result is an array over examinees or questions.
+class GradedBatch:
+    def __init__(self, responses, key, pass_score=PASS_SCORE):
+        responses = np.asarray(responses)
+        self.key = np.asarray(key)
+        self.correct = responses == self.key
+        self.totals = self.correct.sum(axis=1)
+        self.scores = self.totals / max(len(self.key), 1)
+        self.passed = self.scores >= pass_score
+
+    # Classical item statistics per question: difficulty is the share of examinees answering
+    # correctly, discrimination the correlation between answering correctly and the score on
+    # the other questions (corrected point-biserial; NaN when either does not vary)
+    def item_statistics(self):
+        # Built from column sums and the integer sum of totals over each question's correct
+        # answers (a masked reduction over the broadcast totals), so no (examinees x questions)
+        # temporaries: cov(item, rest) = cov(item, total) - var(item) and
+        # var(rest) = var(total) - 2 cov(item, total) + var(item)
+        n = max(len(self.totals), 1)
+        difficulty = self.correct.sum(axis=0) / n
+        totals = self.totals.astype(np.float64)
+        item_var = difficulty * (1 - difficulty)
+        correct_totals = np.add.reduce(np.broadcast_to(self.totals[:, None], self.correct.shape), axis=0,
+                                       where=self.correct)
+        item_total = correct_totals.astype(np.float64) / n - difficulty * totals.mean()
+        rest_var = totals.var() - 2 * item_total + item_var
+        with np.errstate(invalid='ignore', divide='ignore'):
+            spread = np.sqrt(item_var * rest_var)
+            discrimination = np.where(spread > 1e-12, (item_total - item_var) / spread, np.nan)
+        return pd.DataFrame({'difficulty': difficulty, 'discrimination': discrimination})
+
+
+# Integer answer key of the given pool positions of a skill's questions
+def answer_key(skill_name, positions):
+    return question_bank().answer_key(pool_name(skill_name))[np.asarray(positions, dtype=np.int64)]
+
+
+# Paper test results of one skill from an uploaded CSV (or path): a 'candidate' column and one
+# column per question, named by its number in the skill's question bank (q1, q2, ...), holding
+# the chosen option as a letter (A, B, ...) or number (1, 2, ...); blanks are unanswered.
+# Returns (candidates, pool positions, responses array). Raises ValueError with a message fit
+# for the page when the file cannot be graded.
+def read_paper_results(file, skill_name):
+    try:
+        results = pd.read_csv(file, dtype=str, keep_default_na=False)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not read the CSV file: {e}")
+    results.columns = [str(c).strip().lower() for c in results.columns]
+    if CANDIDATE_COLUMN not in results.columns:
+        raise ValueError(f"Missing column: {CANDIDATE_COLUMN}")
+    if len(results) > MAX_EXAMINEES:
+        raise ValueError(f"At most {MAX_EXAMINEES:,} examinees can be graded at once")
+
+    columns = [c for c in results.columns if c != CANDIDATE_COLUMN]
+    pool_size = question_bank().count(pool_name(skill_name))
+    invalid = [c for c in columns if not (c[:1] == 'q' and c[1:].isdigit() and 1 <= int(c[1:]) <= pool_size)]
+    if invalid:
+        raise ValueError(f"Unknown question columns: {', '.join(invalid)} "
+                         f"(expected q1 to q{pool_size} for {skill_name})")
+    if not columns:
+        raise ValueError("No question columns (q1, q2, ...)")
+
+    # Letters and 1-based numbers both map to 0-based option codes through one lookup table
+    codes = {'': UNANSWERED}
+    codes.update({letter: i for i, letter in enumerate(string.ascii_uppercase)})
+    codes.update({str(i + 1): i for i in range(len(string.ascii_uppercase))})
+    positions = [int(c[1:]) - 1 for c in columns]
+    cells = results[columns].apply(lambda column: column.str.strip().str.upper())
+    responses = np.empty(cells.shape, dtype=np.int8)
+    for j, column in enumerate(columns):
+        values = cells[column].astype('category')
+        n_options = len(pool_question(skill_name, positions[j])['options'])
+        lookup = np.array([codes.get(value, n_options) for value in values.cat.categories] + [UNANSWERED],
+                          dtype=np.int8)
+        responses[:, j] = lookup[values.cat.codes.to_numpy()]
+        bad = np.flatnonzero(responses[:, j] >= n_options)
+        if len(bad):
+            raise ValueError(f"Invalid answer '{cells[column].iloc[bad[0]]}' for {column} on row {bad[0] + 2}")
+    return results[CANDIDATE_COLUMN].to_numpy(), positions, responses
+
+
+# Graded paper results as (per-candidate frame, per-question frame with item statistics)
+def grade_paper_results(candidates, positions, responses, skill_name):
+    graded = GradedBatch(responses, answer_key(skill_name, positions))
+    per_candidate = pd.DataFrame({
+        CANDIDATE_COLUMN: candidates,
+        'correct': graded.totals,
+        'score': (graded.scores * 100).round(1),
+        'passed': graded.passed,
+    })
+    per_question = graded.item_statistics().round(3)
+    per_question.insert(0, 'question', [f"q{p + 1}" for p in positions])
+    per_question.insert(1, 'text', [pool_question(skill_name, p)['q'] for p in positions])
+    return per_candidate, per_question
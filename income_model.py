@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from career_model import MAX_TRAINING_ROWS
+from model_store import load_or_build
+from skill_matching import SKILLS, multi_hot
+
+# Income percentiles shown as the expected income range (low, typical, high)
+QUANTILES = (0.1, 0.5, 0.9)
+
+# Categorical inputs of the income model, as named in the dataset
+CATEGORICAL_FEATURES = ['occupation', 'education', 'workclass']
+
+INCOME_PARAMS = {
+    'max_iter': 100,
+    'learning_rate': 0.1,
+    'max_leaf_nodes': 31,
+    'random_state': 42,
+}
+
+# Hours per week assumed for profiles that do not state them
+DEFAULT_HOURS = 40
+
+
+# One gradient-boosted quantile regressor per entry of QUANTILES over occupation, education,
+# workclass (native categorical splits), hours per week and the 32 skills (multi-hot).
+class IncomeModel:
+    def __init__(self, params=None):
+        self.params = dict(INCOME_PARAMS, **(params or {}))
+        self.categories = {}
+        self.regressors = []
+
+    # Feature rows for a frame in the dataset layout; unknown labels become missing values
+    def dataset_features(self, df):
+        features = np.empty((len(df), len(CATEGORICAL_FEATURES) + 1 + len(SKILLS)), dtype=np.float32)
+        for i, column in enumerate(CATEGORICAL_FEATURES):
+            lookup = {label: code for code, label in enumerate(self.categories[column])}
+            values = df[column].astype('category')
+            codes = np.array([lookup.get(str(label), np.nan) for label in values.cat.categories] + [np.nan])
+            features[:, i] = codes[values.cat.codes.to_numpy()]
+        offset = len(CATEGORICAL_FEATURES)
+        features[:, offset] = df['hours-per-week'].to_numpy()
+        features[:, offset + 1:] = multi_hot(df['skills'], SKILLS).toarray()
+        return features
+
+    def fit(self, df):
+        # Imported here: the pages import this module for DEFAULT_HOURS and only training needs sklearn
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        if len(df) > MAX_TRAINING_ROWS:
+            rng = np.random.default_rng(self.params['random_state'])
+            df = df.iloc[np.sort(rng.choice(len(df), MAX_TRAINING_ROWS, replace=False))]
+        for column in CATEGORICAL_FEATURES:
+            self.categories[column] = sorted(df[column].dropna().astype(str).unique())
+        features = self.dataset_features(df)
+        income = df['income'].to_numpy().astype(np.float64)
+        self.regressors = [
+            HistGradientBoostingRegressor(
+                loss='quantile', quantile=quantile, early_stopping=False,
+                categorical_features=list(range(len(CATEGORICAL_FEATURES))), **self.params
+            ).fit(features, income)
+            for quantile in QUANTILES
+        ]
+        return self
+
+    # Income at each of QUANTILES for every row, shape (rows, len(QUANTILES)); sorted per row
+    # because independently fitted quantiles can cross
+    def predict_range(self, df):
+        features = self.dataset_features(df)
+        predictions = np.column_stack([regressor.predict(features) for regressor in self.regressors])
+        return np.sort(np.maximum(predictions, 0), axis=1).round().astype(np.int64)
+
+    # (low, typical, high) income for one profile in a given occupation
+    def profile_range(self, occupation, education, workclass, skills, hours=DEFAULT_HOURS):
+        profile = pd.DataFrame({
+            'occupation': [occupation],
+            'education': [education],
+            'workclass': [workclass],
+            'hours-per-week': [hours],
+            'skills': [', '.join(skills)],
+        })
+        return tuple(int(value) for value in self.predict_range(profile)[0])
+
+
+# Income model for this dataset version and parameters, trained once and stored memory-mapped
+def load_or_train(shared_dataset, params=None):
+    params = dict(INCOME_PARAMS, **(params or {}))
+    return load_or_build(
+        "income_model",
+        shared_dataset.version,
+        params,
+        lambda: IncomeModel(params).fit(shared_dataset.view())
+    )
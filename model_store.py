@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from data_loader import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MODEL_DIR = os.path.join(CACHE_DIR, "models")
+
+# Bumped whenever the pickled layout of a stored model class changes
+ARTIFACT_FORMAT = 1
+
+# Seconds an artifact of another dataset version or parameter set stays on disk after it was
+# last loaded. Workers may still serve an older dataset version (the registry keeps replaced
+# versions while sessions use them), so its models must outlive the build of a newer one.
+ARTIFACT_MAX_AGE = 24 * 3600
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def artifact_key(dataset_version, params):
+    payload = json.dumps({"format": ARTIFACT_FORMAT, "params": params}, sort_keys=True, default=str)
+    return f"{dataset_version}-{hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()}"
+
+
+def artifact_path(name, dataset_version, params, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"{name}-{artifact_key(dataset_version, params)}.joblib")
+
+
+# Artifacts are stored uncompressed so joblib can memory-map every numpy array on load:
+# worker processes then share those pages through the OS page cache instead of each
+# holding a private copy.
+def save_artifact(name, path, obj):
+    import joblib
+    model_dir = os.path.dirname(path)
+    os.makedirs(model_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=model_dir, suffix=".part")
+    os.close(fd)
+    try:
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    # Other artifacts of the same model (other dataset versions or parameters) are dropped, with
+    # their build locks, once no worker has loaded them for ARTIFACT_MAX_AGE; processes that
+    # still map them keep their pages until they let go
+    now = time.time()
+    with _loaded_lock:
+        in_use = set(_loaded)
+    for other in os.listdir(model_dir):
+        other_path = os.path.join(model_dir, other)
+        artifact = other_path[:-len(".lock")] if other.endswith(".joblib.lock") else other_path
+        if not (other.startswith(f"{name}-") and artifact.endswith(".joblib")) or artifact in (path, *in_use):
+            continue
+        try:
+            if now - os.path.getmtime(artifact if os.path.exists(artifact) else other_path) > ARTIFACT_MAX_AGE:
+                os.remove(other_path)
+        except FileNotFoundError:
+            pass
+
+
+def load_artifact(path):
+    import joblib
+    try:
+        return joblib.load(path, mmap_mode="r")
+    except (OSError, EOFError, ValueError):
+        return None
+
+
+# Serialise builds of one artifact across worker processes so only the first one trains
+class _BuildLock:
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self.file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.path, "w")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+# Process-wide get-or-build: in-memory first, then the on-disk artifact (memory-mapped),
+# and only then `build()`, whose result is persisted for every other worker and restart
+def load_or_build(name, dataset_version, params, build, model_dir=MODEL_DIR):
+    path = artifact_path(name, dataset_version, params, model_dir)
+    with _loaded_lock:
+        if path in _loaded:
+            return _loaded[path]
+
+    obj = load_artifact(path) if os.path.exists(path) else None
+    if obj is not None:
+        # Loading counts as use, see ARTIFACT_MAX_AGE
+        os.utime(path)
+    else:
+        with _BuildLock(path):
+            obj = load_artifact(path) if os.path.exists(path) else None
+            if obj is None:
+                save_artifact(name, path, build())
+                obj = load_artifact(path)
+
+    with _loaded_lock:
+        return _loaded.setdefault(path, obj)
+
+
+# Drop this process's loaded artifacts of a dataset version; the registry calls it when it
+# evicts the version
+def release_version(dataset_version):
+    with _loaded_lock:
+        for path in [p for p in _loaded if f"-{dataset_version}-" in os.path.basename(p)]:
+            del _loaded[path]
+
+
+# Models every page may need, as (name, loader) pairs; the loader takes a SharedDataset
+def _warm_targets():
+    import career_model
+    import income_model
+    return [("career_model", career_model.load_or_train), ("income_model", income_model.load_or_train)]
+
+
+# Load (or build) every model for the dataset as it is on disk. The remote copy is not
+# checked: its refresh would run on a daemon thread that dies with the process.
+def warm_start():
+    from dataset_handle import SharedDataset
+    dataset = SharedDataset.load(check_remote=False)
+    for _, loader in _warm_targets():
+        loader(dataset)
+
+
+# `python model_store.py` builds and stores every model artifact ahead of a deploy
+if __name__ == "__main__":
+    warm_start()
+    for name in sorted(os.listdir(MODEL_DIR)):
+        if name.endswith(".joblib"):
+            print(name, f"{os.path.getsize(os.path.join(MODEL_DIR, name)) / 2**20:.1f}MB")
@@ -0,0 +1,72 @@
+import numpy as np
+import streamlit as st
+
+# Re-exported: the sort options and orders live in result_order so the dataset registry can
+# build them without importing streamlit
+from result_order import SORT_OPTIONS, ResultOrder
+
+# Matches sparser than 1/SPARSE_FRACTION of the dataset are ranked directly instead of scanned
+SPARSE_FRACTION = 64
+
+
+# One page of a match in the given order, starting at cursor (a rank). Only the rows on the
+# page are located: dense matches walk the order testing membership, sparse ones rank their
+# own rows. Returns (row positions, next cursor or None when the result is exhausted).
+def fetch_page(match, result_order, cursor=0, page_size=20):
+    if len(match) == 0:
+        return np.empty(0, dtype=np.int64), None
+
+    if len(match) * SPARSE_FRACTION < result_order.n_rows:
+        rows = match.rows()
+        ranks = result_order.rank_of(rows)
+        keep = ranks >= cursor
+        rows, ranks = rows[keep], ranks[keep]
+        if len(rows) > page_size:
+            nearest = np.argpartition(ranks, page_size - 1)[:page_size]
+            rows, ranks = rows[nearest], ranks[nearest]
+        ordered = np.argsort(ranks, kind='stable')
+        rows, ranks = rows[ordered], ranks[ordered]
+        more = int(np.count_nonzero(keep)) > page_size
+        return rows, (int(ranks[-1]) + 1 if more and len(rows) else None)
+
+    found = []
+    needed = page_size
+    rank = cursor
+    chunk = max(page_size * 8, 1024)
+    while needed and rank < result_order.n_rows:
+        candidates = result_order.positions(rank, rank + chunk)
+        hits = np.flatnonzero(match.contains(candidates))[:needed]
+        found.append(candidates[hits])
+        needed -= len(hits)
+        rank = rank + int(hits[-1]) + 1 if not needed else rank + len(candidates)
+        chunk *= 2
+    rows = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+    if needed or rank >= result_order.n_rows:
+        return rows, None
+    return rows, rank
+
+
+# Prev / Next controls for a cursor-paged result. The stack of page-start cursors lives in
+# session state under `key` and resets whenever `signature` (filters, sort) changes.
+def paginated(key, match, result_order, page_size=20, signature=None):
+    state = st.session_state.get(key)
+    if state is None or state['signature'] != signature:
+        state = {'signature': signature, 'cursors': [0]}
+        st.session_state[key] = state
+
+    rows, next_cursor = fetch_page(match, result_order, state['cursors'][-1], page_size)
+    page_number = len(state['cursors'])
+    total_pages = max(1, -(-len(match) // page_size))
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("← Previous", key=f"{key}_prev", disabled=page_number == 1):
+            state['cursors'].pop()
+            st.rerun()
+    with col2:
+        st.markdown(f"<p style='text-align: center;'>Page {page_number} of {total_pages}</p>", unsafe_allow_html=True)
+    with col3:
+        if st.button("Next →", key=f"{key}_next", disabled=next_cursor is None or page_number >= total_pages):
+            state['cursors'].append(next_cursor)
+            st.rerun()
+    return rows
@@ -0,0 +1,200 @@
+import functools
+import json
+import mmap
+import os
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+
+from adaptive_test import AdaptiveTest
+from data_loader import BASE_DIR, CACHE_DIR, source_digest
+
+# Skill test questions, one JSON object per line: {"skill", "q", "options", "answer"}
+BANK_PATH = os.path.join(BASE_DIR, "question_bank.jsonl")
+
+# Pool of the questions for skills without their own; "{skill}" in them is replaced by the name
+GENERIC_SKILL = "*"
+
+# Questions per skill test attempt
+TEST_QUESTIONS = 10
+
+# Decoded questions kept in memory per process (least recently used go first)
+CACHED_QUESTIONS = 4096
+
+
+# Bumped whenever the layout of the stored offset index changes
+INDEX_FORMAT = 3
+
+# Item parameters assumed for questions the bank gives none for
+DEFAULT_DISCRIMINATION = 1.0
+DEFAULT_DIFFICULTY = 0.0
+
+
+def _index_path(cache_dir, digest):
+    return os.path.join(cache_dir, f"question_bank-{digest}-v{INDEX_FORMAT}.npz")
+
+
+# Byte range, answer key and item parameters of every question line, grouped by skill (file
+# order within a skill): skills, bounds[k]:bounds[k + 1] the questions of skills[k], starts /
+# ends their byte offsets, answers the correct option of each, and the optional
+# "discrimination" / "difficulty" of each line plus its chance of a blind guess
+# (1 / number of options) for the adaptive test
+def _build_index(path):
+    skills, lines, parameters = {}, [], []
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                lines.append((skills.setdefault(record["skill"], len(skills)), offset, offset + len(line),
+                              record["answer"]))
+                parameters.append((record.get("discrimination", DEFAULT_DISCRIMINATION),
+                                   record.get("difficulty", DEFAULT_DIFFICULTY), 1 / len(record["options"])))
+            offset += len(line)
+    lines = np.array(lines, dtype=np.int64).reshape(-1, 4)
+    order = np.argsort(lines[:, 0], kind='stable')
+    lines = lines[order]
+    parameters = np.array(parameters, dtype=np.float64).reshape(-1, 3)[order]
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(lines[:, 0], minlength=len(skills)))])
+    return {"skills": np.array(list(skills), dtype=str), "bounds": bounds,
+            "starts": lines[:, 1], "ends": lines[:, 2], "answers": lines[:, 3].astype(np.int8),
+            "discrimination": parameters[:, 0],
+            "difficulty": parameters[:, 1], "guessing": parameters[:, 2]}
+
+
+# Offset index of a bank file, built by one scan of the file and stored in the cache dir per
+# content digest, so later starts only load a few small arrays
+def load_index(path=BANK_PATH, cache_dir=CACHE_DIR):
+    digest = source_digest(path, cache_dir)
+    index_path = _index_path(cache_dir, digest)
+    if os.path.exists(index_path):
+        try:
+            with np.load(index_path) as stored:
+                return {name: stored[name] for name in stored.files}
+        except (OSError, ValueError):
+            os.remove(index_path)
+
+    index = _build_index(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **index)
+        os.replace(tmp_path, index_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    for name in os.listdir(cache_dir):
+        if name.startswith("question_bank-") and name.endswith(".npz") and name != os.path.basename(index_path):
+            os.remove(os.path.join(cache_dir, name))
+    return index
+
+
+# Read-only question bank over a memory-mapped JSON Lines file. Nothing is parsed until a
+# skill's questions are asked for; each question is decoded from its own byte range, so the
+# cost of a lookup does not depend on the size of the bank.
+class QuestionBank:
+    def __init__(self, path=BANK_PATH, cache_dir=CACHE_DIR, cached_questions=CACHED_QUESTIONS):
+        index = load_index(path, cache_dir)
+        self.skills = [str(skill) for skill in index["skills"]]
+        self.lookup = {skill: i for i, skill in enumerate(self.skills)}
+        self.bounds = index["bounds"]
+        self.starts = index["starts"]
+        self.ends = index["ends"]
+        self.answers = index["answers"]
+        self.parameters = np.column_stack([index["discrimination"], index["difficulty"], index["guessing"]])
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.ends.size else b""
+        self.question = functools.lru_cache(maxsize=cached_questions)(self._question)
+
+    def __contains__(self, skill):
+        return skill in self.lookup
+
+    # Number of questions for a skill (0 if it has none)
+    def count(self, skill):
+        k = self.lookup.get(skill)
+        return 0 if k is None else int(self.bounds[k + 1] - self.bounds[k])
+
+    # Correct option of every question of a skill, as an integer array
+    def answer_key(self, skill):
+        k = self.lookup[skill]
+        return self.answers[self.bounds[k]:self.bounds[k + 1]]
+
+    # Item parameters (discrimination, difficulty, guessing) of every question of a skill,
+    # shape (count, 3)
+    def item_parameters(self, skill):
+        k = self.lookup[skill]
+        return self.parameters[self.bounds[k]:self.bounds[k + 1]]
+
+    # Question i of a skill as {'q', 'options', 'answer'}; recently used ones are cached, so
+    # the returned dict is shared and must not be modified
+    def _question(self, skill, i):
+        j = int(self.bounds[self.lookup[skill]]) + i
+        record = json.loads(self._map[self.starts[j]:self.ends[j]])
+        return {'q': record['q'], 'options': record['options'], 'answer': record['answer']}
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+# The question bank shared by every session in this process, opened on first use
+def question_bank():
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank()
+        return _bank
+
+
+# Random sample of k distinct positions in range(n), in random order, drawn in O(k) time and
+# memory (Floyd's algorithm, then a shuffle of the k picks)
+def sample_positions(n, k, rng):
+    chosen = {}
+    for j in range(n - k, n):
+        t = int(rng.integers(0, j + 1))
+        chosen[j if t in chosen else t] = None
+    positions = list(chosen)
+    rng.shuffle(positions)
+    return positions
+
+
+# Pool a skill's questions come from: its own, or the generic one
+def pool_name(skill_name):
+    return skill_name if skill_name in question_bank() else GENERIC_SKILL
+
+
+# Question i of a skill's pool, with generic questions filled in for the skill
+def pool_question(skill_name, i):
+    pool = pool_name(skill_name)
+    question = question_bank().question(pool, i)
+    if pool == GENERIC_SKILL:
+        question = {'q': question['q'].replace('{skill}', skill_name),
+                    'options': [option.replace('{skill}', skill_name) for option in question['options']],
+                    'answer': question['answer']}
+    return question
+
+
+# Number of questions in a skill's pool
+def pool_size(skill_name):
+    return question_bank().count(pool_name(skill_name))
+
+
+def _rng(skill_name, seed):
+    return np.random.default_rng([*seed, zlib.crc32(skill_name.encode())])
+
+
+# The questions of one attempt at a skill test: k questions drawn from the skill's pool, or
+# from the generic pool for skills without one. The draw depends only on the skill and
+# `seed`, so reruns with the same seed show the same questions in the same order.
+def skill_test(skill_name, seed, k=TEST_QUESTIONS):
+    n = pool_size(skill_name)
+    return [pool_question(skill_name, i) for i in sample_positions(n, min(k, n), _rng(skill_name, seed))]
+
+
+# A new adaptive attempt at a skill test over the item parameters of the skill's pool; its
+# next_item() positions are read with pool_question
+def adaptive_skill_test(skill_name, seed):
+    return AdaptiveTest(question_bank().item_parameters(pool_name(skill_name)), _rng(skill_name, seed))
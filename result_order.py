@@ -0,0 +1,55 @@
+import copy
+
+import numpy as np
+
+# Sort options for job listings: label -> (column, descending); None keeps dataset order
+SORT_OPTIONS = {
+    'Default order': None,
+    'Income: high to low': ('income', True),
+    'Income: low to high': ('income', False),
+    'Hours/week: low to high': ('hours-per-week', False),
+}
+
+
+# Stable total order over dataset rows for one sort key (ties keep dataset order), built once
+# per dataset version. ranks[position] is where that row sits in the order, which makes the
+# rank of the last row shown a stable cursor for the next page.
+class ResultOrder:
+    def __init__(self, df, column=None, descending=False):
+        self.column = column
+        self.descending = descending
+        if column is None:
+            self.order = None
+            self.ranks = None
+            self.n_rows = len(df)
+            return
+        keys = df[column].to_numpy().astype(np.int64)
+        self.order = np.argsort(-keys if descending else keys, kind='stable')
+        self.ranks = np.empty(len(keys), dtype=np.int64)
+        self.ranks[self.order] = np.arange(len(keys))
+        self.n_rows = len(keys)
+
+    # Order over `df`, whose first n_rows rows are the ones this order was built for. The
+    # appended rows are sorted among themselves and merged in after any equal keys.
+    def append(self, df):
+        result_order = copy.copy(self)
+        result_order.n_rows = len(df)
+        if self.column is None:
+            return result_order
+        keys = df[self.column].to_numpy().astype(np.int64)
+        if self.descending:
+            keys = -keys
+        added = self.n_rows + np.argsort(keys[self.n_rows:], kind='stable')
+        at = np.searchsorted(keys[self.order], keys[added], side='right')
+        result_order.order = np.insert(self.order, at, added)
+        result_order.ranks = np.empty(len(keys), dtype=np.int64)
+        result_order.ranks[result_order.order] = np.arange(len(keys))
+        return result_order
+
+    def rank_of(self, positions):
+        return positions if self.ranks is None else self.ranks[positions]
+
+    def positions(self, start, stop):
+        if self.order is None:
+            return np.arange(start, min(stop, self.n_rows))
+        return self.order[start:stop]
@@ -1,10 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
-import plotly.express as px
-import plotly.graph_objects as go
+import secrets
+from adaptive_test import MAX_QUESTIONS
+from analytics import CUBE_MEASURES, bin_centers
+from batch_prediction import CANDIDATE_COLUMNS, read_candidates, spool_csv
+from certification_store import certification_store, new_user_id, valid_user_id
+from dataset_registry import dataset_registry
+from exports import EXPORT_FORMATS, read_export
+from facet_index import FACETS
+from grading import CANDIDATE_COLUMN, GradedBatch, grade_paper_results, read_paper_results
+from income_model import DEFAULT_HOURS
+from pagination import SORT_OPTIONS, paginated
+from question_bank import adaptive_skill_test, pool_question, pool_size, skill_test
+from skill_matching import SKILLS, top_k
 from collections import Counter
 
 # Page configuration
@@ -330,219 +339,91 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Skill Test Questions Database
-SKILL_TESTS = {
-    'Python': [
-        {'q': 'What is the output of: print(type([]))?', 'options': ['<class "list">', '<class "dict">', '<class "tuple">', '<class "set">'], 'answer': 0},
-        {'q': 'Which keyword is used to define a function in Python?', 'options': ['function', 'def', 'func', 'define'], 'answer': 1},
-        {'q': 'What does "len([1,2,3])" return?', 'options': ['2', '3', '4', 'Error'], 'answer': 1},
-        {'q': 'Which of these is a mutable data type?', 'options': ['tuple', 'string', 'list', 'int'], 'answer': 2},
-        {'q': 'What is the correct syntax for a for loop?', 'options': ['for i in range(10)', 'for (i=0; i<10; i++)', 'for i to 10', 'loop i in 10'], 'answer': 0},
-        {'q': 'Which operator is used for exponentiation?', 'options': ['^', '**', 'exp', 'pow'], 'answer': 1},
-        {'q': 'What is used to handle exceptions?', 'options': ['catch-throw', 'try-except', 'error-handle', 'exception-catch'], 'answer': 1},
-        {'q': 'How do you create a dictionary?', 'options': ['[]', '()', '{}', '<>'], 'answer': 2},
-        {'q': 'What does "import" keyword do?', 'options': ['Export module', 'Load external module', 'Delete module', 'Create module'], 'answer': 1},
-        {'q': 'Which method adds an element to a list?', 'options': ['add()', 'append()', 'insert()', 'push()'], 'answer': 1}
-    ],
-    'Java': [
-        {'q': 'Which keyword is used to create a class?', 'options': ['class', 'Class', 'struct', 'object'], 'answer': 0},
-        {'q': 'What is the main method signature?', 'options': ['void main()', 'public static void main(String[] args)', 'static main()', 'main()'], 'answer': 1},
-        {'q': 'Which is not a primitive data type?', 'options': ['int', 'String', 'boolean', 'char'], 'answer': 1},
-        {'q': 'What does JVM stand for?', 'options': ['Java Virtual Machine', 'Java Variable Method', 'Just Virtual Machine', 'Java Version Manager'], 'answer': 0},
-        {'q': 'Which keyword is used for inheritance?', 'options': ['inherits', 'extends', 'implements', 'derive'], 'answer': 1},
-        {'q': 'What is encapsulation?', 'options': ['Data hiding', 'Multiple inheritance', 'Method overloading', 'Polymorphism'], 'answer': 0},
-        {'q': 'Which collection allows duplicate elements?', 'options': ['Set', 'Map', 'List', 'Queue'], 'answer': 2},
-        {'q': 'What is the default value of boolean?', 'options': ['true', 'false', 'null', '0'], 'answer': 1},
-        {'q': 'Which access modifier is most restrictive?', 'options': ['public', 'protected', 'private', 'default'], 'answer': 2},
-        {'q': 'What is used to handle exceptions?', 'options': ['try-catch', 'if-else', 'switch', 'loop'], 'answer': 0}
-    ],
-    'Data Analysis': [
-        {'q': 'Which measure represents the middle value?', 'options': ['Mean', 'Median', 'Mode', 'Range'], 'answer': 1},
-        {'q': 'What does SQL stand for?', 'options': ['Structured Query Language', 'Simple Query Language', 'Standard Query Language', 'System Query Language'], 'answer': 0},
-        {'q': 'Which chart is best for showing trends over time?', 'options': ['Pie chart', 'Bar chart', 'Line chart', 'Scatter plot'], 'answer': 2},
-        {'q': 'What is the purpose of data cleaning?', 'options': ['Delete data', 'Remove errors and inconsistencies', 'Encrypt data', 'Backup data'], 'answer': 1},
-        {'q': 'Which correlation coefficient indicates strong positive correlation?', 'options': ['-0.9', '0.1', '0.95', '0'], 'answer': 2},
-        {'q': 'What does ETL stand for?', 'options': ['Extract, Transform, Load', 'Execute, Test, Launch', 'Evaluate, Test, Log', 'Export, Transfer, Link'], 'answer': 0},
-        {'q': 'Which is a measure of data dispersion?', 'options': ['Mean', 'Standard Deviation', 'Median', 'Mode'], 'answer': 1},
-        {'q': 'What is a pivot table used for?', 'options': ['Data entry', 'Data summarization', 'Data deletion', 'Data encryption'], 'answer': 1},
-        {'q': 'Which type of data has categories?', 'options': ['Numerical', 'Categorical', 'Continuous', 'Interval'], 'answer': 1},
-        {'q': 'What is the first step in data analysis?', 'options': ['Visualization', 'Data collection', 'Modeling', 'Reporting'], 'answer': 1}
-    ],
-    'Machine Learning': [
-        {'q': 'What type of learning uses labeled data?', 'options': ['Unsupervised', 'Supervised', 'Reinforcement', 'Transfer'], 'answer': 1},
-        {'q': 'Which algorithm is used for classification?', 'options': ['Linear Regression', 'Decision Tree', 'K-means', 'PCA'], 'answer': 1},
-        {'q': 'What is overfitting?', 'options': ['Model too simple', 'Model too complex', 'Perfect model', 'No training'], 'answer': 1},
-        {'q': 'Which metric evaluates classification?', 'options': ['MSE', 'R-squared', 'Accuracy', 'MAE'], 'answer': 2},
-        {'q': 'What does CNN stand for?', 'options': ['Convolutional Neural Network', 'Continuous Neural Network', 'Complex Neural Network', 'Circular Neural Network'], 'answer': 0},
-        {'q': 'Which is an unsupervised learning task?', 'options': ['Classification', 'Regression', 'Clustering', 'Prediction'], 'answer': 2},
-        {'q': 'What is feature engineering?', 'options': ['Creating new features', 'Deleting features', 'Visualizing features', 'Testing features'], 'answer': 0},
-        {'q': 'Which activation function is commonly used?', 'options': ['Linear', 'ReLU', 'Square', 'Cubic'], 'answer': 1},
-        {'q': 'What is cross-validation used for?', 'options': ['Data cleaning', 'Model evaluation', 'Feature selection', 'Data collection'], 'answer': 1},
-        {'q': 'What does SGD stand for?', 'options': ['Simple Gradient Descent', 'Stochastic Gradient Descent', 'Standard Gradient Descent', 'Smooth Gradient Descent'], 'answer': 1}
-    ],
-    'Communication': [
-        {'q': 'What is active listening?', 'options': ['Talking loudly', 'Fully concentrating on speaker', 'Interrupting frequently', 'Multitasking'], 'answer': 1},
-        {'q': 'What percentage of communication is non-verbal?', 'options': ['20%', '50%', '70%', '90%'], 'answer': 2},
-        {'q': 'What is the best way to handle conflict?', 'options': ['Avoid it', 'Escalate it', 'Address it constructively', 'Ignore it'], 'answer': 2},
-        {'q': 'What is empathy in communication?', 'options': ['Sympathy', 'Understanding others feelings', 'Agreeing always', 'Judging others'], 'answer': 1},
-        {'q': 'What is feedback?', 'options': ['Criticism only', 'Response to communication', 'Ignoring message', 'Delaying response'], 'answer': 1},
-        {'q': 'What is assertive communication?', 'options': ['Aggressive', 'Passive', 'Clear and respectful', 'Silent'], 'answer': 2},
-        {'q': 'What is the purpose of body language?', 'options': ['Confuse others', 'Convey non-verbal messages', 'Replace words', 'Hide feelings'], 'answer': 1},
-        {'q': 'What is paraphrasing?', 'options': ['Copying exactly', 'Restating in own words', 'Ignoring', 'Changing meaning'], 'answer': 1},
-        {'q': 'What is the best meeting practice?', 'options': ['No agenda', 'Clear objectives', 'Long duration', 'No preparation'], 'answer': 1},
-        {'q': 'What is professional email etiquette?', 'options': ['All caps', 'Clear subject line', 'No greeting', 'Informal language'], 'answer': 1}
-    ],
-    'Leadership': [
-        {'q': 'What defines a good leader?', 'options': ['Authority', 'Inspiring others', 'Being bossy', 'Working alone'], 'answer': 1},
-        {'q': 'What is delegation?', 'options': ['Doing everything yourself', 'Assigning tasks to others', 'Avoiding responsibility', 'Ignoring team'], 'answer': 1},
-        {'q': 'What is emotional intelligence?', 'options': ['IQ level', 'Understanding and managing emotions', 'Being emotional', 'Hiding feelings'], 'answer': 1},
-        {'q': 'What is transformational leadership?', 'options': ['Maintaining status quo', 'Inspiring change and innovation', 'Micromanaging', 'Authoritarian'], 'answer': 1},
-        {'q': 'What is team motivation?', 'options': ['Threats', 'Inspiration and encouragement', 'Pressure', 'Competition only'], 'answer': 1},
-        {'q': 'What is strategic thinking?', 'options': ['Short-term focus', 'Long-term planning', 'Random decisions', 'Following blindly'], 'answer': 1},
-        {'q': 'What is conflict resolution?', 'options': ['Avoiding conflicts', 'Addressing and solving disputes', 'Escalating issues', 'Ignoring problems'], 'answer': 1},
-        {'q': 'What is mentorship?', 'options': ['Bossing around', 'Guiding and developing others', 'Criticizing only', 'Competing'], 'answer': 1},
-        {'q': 'What is accountability?', 'options': ['Blaming others', 'Taking responsibility', 'Avoiding tasks', 'Delegation only'], 'answer': 1},
-        {'q': 'What is vision in leadership?', 'options': ['Eyesight', 'Clear future direction', 'Past focus', 'Confusion'], 'answer': 1}
-    ],
-    'Excel': [
-        {'q': 'What function adds numbers?', 'options': ['ADD()', 'SUM()', 'TOTAL()', 'PLUS()'], 'answer': 1},
-        {'q': 'What is a cell reference?', 'options': ['Cell color', 'Cell address (A1)', 'Cell size', 'Cell content'], 'answer': 1},
-        {'q': 'What does VLOOKUP do?', 'options': ['Delete data', 'Search vertically', 'Sort data', 'Format cells'], 'answer': 1},
-        {'q': 'What is a pivot table?', 'options': ['Data summary tool', 'Chart type', 'Formula', 'Cell format'], 'answer': 0},
-        {'q': 'What symbol starts a formula?', 'options': ['#', '@', '=', '+'], 'answer': 2},
-        {'q': 'What is conditional formatting?', 'options': ['Cell borders', 'Format based on conditions', 'Font style', 'Cell merge'], 'answer': 1},
-        {'q': 'What does IF function do?', 'options': ['Add numbers', 'Logical test', 'Format text', 'Delete cells'], 'answer': 1},
-        {'q': 'What is a macro?', 'options': ['Large cell', 'Automated task', 'Formula error', 'Chart type'], 'answer': 1},
-        {'q': 'What does CONCATENATE do?', 'options': ['Divide', 'Join text', 'Sum', 'Average'], 'answer': 1},
-        {'q': 'What is data validation?', 'options': ['Data backup', 'Control input values', 'Delete data', 'Format cells'], 'answer': 1}
-    ],
-    'SQL': [
-        {'q': 'What does SELECT do?', 'options': ['Delete data', 'Retrieve data', 'Update data', 'Create table'], 'answer': 1},
-        {'q': 'Which clause filters rows?', 'options': ['SELECT', 'FROM', 'WHERE', 'ORDER BY'], 'answer': 2},
-        {'q': 'What is a primary key?', 'options': ['First column', 'Unique identifier', 'Last column', 'Any column'], 'answer': 1},
-        {'q': 'What does JOIN do?', 'options': ['Combine tables', 'Delete rows', 'Create table', 'Update data'], 'answer': 0},
-        {'q': 'What is GROUP BY used for?', 'options': ['Sorting', 'Aggregating data', 'Filtering', 'Joining'], 'answer': 1},
-        {'q': 'What does COUNT() return?', 'options': ['Sum', 'Number of rows', 'Average', 'Maximum'], 'answer': 1},
-        {'q': 'What is an index?', 'options': ['Table name', 'Performance optimizer', 'Data type', 'Column name'], 'answer': 1},
-        {'q': 'What does UPDATE do?', 'options': ['Retrieve data', 'Modify existing data', 'Delete data', 'Create table'], 'answer': 1},
-        {'q': 'What is a foreign key?', 'options': ['Primary key', 'Reference to another table', 'First column', 'Last column'], 'answer': 1},
-        {'q': 'What does DISTINCT do?', 'options': ['Show all rows', 'Remove duplicates', 'Sort data', 'Join tables'], 'answer': 1}
-    ],
-    'Project Management': [
-        {'q': 'What is a project?', 'options': ['Ongoing operation', 'Temporary endeavor', 'Daily routine', 'Permanent activity'], 'answer': 1},
-        {'q': 'What is a stakeholder?', 'options': ['Project member only', 'Anyone affected by project', 'Manager only', 'Customer only'], 'answer': 1},
-        {'q': 'What is scope creep?', 'options': ['Planned changes', 'Uncontrolled expansion', 'Budget increase', 'Time extension'], 'answer': 1},
-        {'q': 'What is a Gantt chart?', 'options': ['Budget tool', 'Timeline visualization', 'Risk matrix', 'Org chart'], 'answer': 1},
-        {'q': 'What is critical path?', 'options': ['Longest task sequence', 'Shortest path', 'Most expensive tasks', 'Easiest tasks'], 'answer': 0},
-        {'q': 'What is agile methodology?', 'options': ['Rigid planning', 'Iterative approach', 'No planning', 'Sequential'], 'answer': 1},
-        {'q': 'What is a sprint?', 'options': ['Long project', 'Short iteration', 'Full project', 'Annual review'], 'answer': 1},
-        {'q': 'What is risk management?', 'options': ['Ignoring risks', 'Identifying and mitigating risks', 'Taking all risks', 'Avoiding projects'], 'answer': 1},
-        {'q': 'What is a milestone?', 'options': ['Daily task', 'Significant point', 'Small task', 'Budget item'], 'answer': 1},
-        {'q': 'What is resource allocation?', 'options': ['Spending money', 'Assigning resources', 'Firing people', 'Buying equipment'], 'answer': 1}
-    ],
-    'Public Speaking': [
-        {'q': 'What is the fear of public speaking called?', 'options': ['Agoraphobia', 'Glossophobia', 'Claustrophobia', 'Acrophobia'], 'answer': 1},
-        {'q': 'What is the ideal speech structure?', 'options': ['Random points', 'Introduction, Body, Conclusion', 'Only facts', 'Only stories'], 'answer': 1},
-        {'q': 'What is eye contact important for?', 'options': ['Intimidation', 'Building connection', 'Showing superiority', 'Avoiding audience'], 'answer': 1},
-        {'q': 'What is vocal variety?', 'options': ['Monotone speech', 'Changing pitch and pace', 'Loud voice only', 'Whispering'], 'answer': 1},
-        {'q': 'What is body language in speaking?', 'options': ['Standing still', 'Non-verbal communication', 'Sitting down', 'Hiding'], 'answer': 1},
-        {'q': 'What is audience analysis?', 'options': ['Ignoring audience', 'Understanding audience needs', 'Counting people', 'Criticizing audience'], 'answer': 1},
-        {'q': 'What is a good opening?', 'options': ['Apology', 'Attention grabber', 'Long story', 'Complex jargon'], 'answer': 1},
-        {'q': 'What should you do with nervousness?', 'options': ['Cancel speech', 'Channel into energy', 'Show panic', 'Run away'], 'answer': 1},
-        {'q': 'What is visual aid purpose?', 'options': ['Distract audience', 'Enhance message', 'Replace speech', 'Fill time'], 'answer': 1},
-        {'q': 'What is the 3-second rule?', 'options': ['Speak for 3 seconds', 'Pause for 3 seconds', 'Look at person for 3 seconds', 'Breathe for 3 seconds'], 'answer': 2}
-    ],
-    'HTML/CSS': [
-        {'q': 'What does HTML stand for?', 'options': ['Hyper Text Markup Language', 'High Tech Modern Language', 'Home Tool Markup Language', 'Hyperlinks Text Mark Language'], 'answer': 0},
-        {'q': 'Which tag creates a hyperlink?', 'options': ['<link>', '<a>', '<href>', '<url>'], 'answer': 1},
-        {'q': 'What does CSS stand for?', 'options': ['Computer Style Sheets', 'Cascading Style Sheets', 'Creative Style System', 'Colorful Style Sheets'], 'answer': 1},
-        {'q': 'How to select an element by ID in CSS?', 'options': ['.id', '#id', '@id', '*id'], 'answer': 1},
-        {'q': 'Which property changes text color?', 'options': ['text-color', 'color', 'font-color', 'text-style'], 'answer': 1},
-        {'q': 'What is the box model?', 'options': ['Container design', 'Content, Padding, Border, Margin', 'Square shape', 'Layout grid'], 'answer': 1},
-        {'q': 'Which tag is for largest heading?', 'options': ['<h6>', '<heading>', '<h1>', '<head>'], 'answer': 2},
-        {'q': 'What is flexbox used for?', 'options': ['Flexible layouts', 'Animations', 'Colors', 'Fonts'], 'answer': 0},
-        {'q': 'How to make text bold?', 'options': ['<bold>', '<b> or <strong>', '<fat>', '<heavy>'], 'answer': 1},
-        {'q': 'What is responsive design?', 'options': ['Fast loading', 'Adapts to screen sizes', 'Interactive', 'Modern look'], 'answer': 1}
-    ],
-    'React': [
-        {'q': 'What is React?', 'options': ['Database', 'JavaScript library for UI', 'CSS framework', 'Backend language'], 'answer': 1},
-        {'q': 'What are components in React?', 'options': ['Databases', 'Reusable UI pieces', 'Stylesheets', 'Server files'], 'answer': 1},
-        {'q': 'What is JSX?', 'options': ['Java Extension', 'JavaScript XML', 'JSON Export', 'jQuery Syntax'], 'answer': 1},
-        {'q': 'What is state in React?', 'options': ['Location', 'Component data', 'CSS style', 'HTML tag'], 'answer': 1},
-        {'q': 'What hook manages state?', 'options': ['useEffect', 'useState', 'useContext', 'useRef'], 'answer': 1},
-        {'q': 'What is props?', 'options': ['Properties passed to components', 'CSS properties', 'HTML attributes', 'Functions'], 'answer': 0},
-        {'q': 'What does useEffect do?', 'options': ['Styling', 'Side effects and lifecycle', 'State management', 'Routing'], 'answer': 1},
-        {'q': 'What is virtual DOM?', 'options': ['Real DOM', 'Lightweight DOM copy', 'Server DOM', 'Database'], 'answer': 1},
-        {'q': 'How to handle events?', 'options': ['onClick={handler}', 'click="handler"', 'onclick=handler', 'on-click={handler}'], 'answer': 0},
-        {'q': 'What is React Router?', 'options': ['Internet router', 'Navigation library', 'Database tool', 'CSS framework'], 'answer': 1}
-    ],
-    'Node.js': [
-        {'q': 'What is Node.js?', 'options': ['Frontend framework', 'JavaScript runtime', 'Database', 'CSS preprocessor'], 'answer': 1},
-        {'q': 'What is npm?', 'options': ['Node package manager', 'New programming method', 'Network protocol', 'Database'], 'answer': 0},
-        {'q': 'What is Express.js?', 'options': ['Database', 'Web framework', 'Testing tool', 'CSS library'], 'answer': 1},
-        {'q': 'What is callback?', 'options': ['Loop', 'Function passed as argument', 'Variable', 'Object'], 'answer': 1},
-        {'q': 'What is middleware?', 'options': ['Database', 'Function in request-response cycle', 'Frontend code', 'HTML tag'], 'answer': 1},
-        {'q': 'What is async/await?', 'options': ['Loop', 'Handling asynchronous code', 'CSS property', 'HTML attribute'], 'answer': 1},
-        {'q': 'What is package.json?', 'options': ['Image file', 'Project configuration', 'CSS file', 'HTML template'], 'answer': 1},
-        {'q': 'What is REST API?', 'options': ['Database', 'Web service architecture', 'CSS framework', 'HTML standard'], 'answer': 1},
-        {'q': 'What is MongoDB commonly used with?', 'options': ['Only PHP', 'Node.js applications', 'Only Java', 'Only C++'], 'answer': 1},
-        {'q': 'What port does HTTP use by default?', 'options': ['443', '80', '8080', '3000'], 'answer': 1}
-    ],
-    'Cloud Computing': [
-        {'q': 'What is cloud computing?', 'options': ['Weather prediction', 'Internet-based computing', 'Desktop software', 'Mobile apps'], 'answer': 1},
-        {'q': 'What is IaaS?', 'options': ['Internet as a Service', 'Infrastructure as a Service', 'Information as a Service', 'Interface as a Service'], 'answer': 1},
-        {'q': 'What is AWS?', 'options': ['Amazon Web Services', 'Advanced Web System', 'Automated Work Service', 'American Web Standard'], 'answer': 0},
-        {'q': 'What is virtualization?', 'options': ['Gaming', 'Creating virtual versions of resources', 'Internet browsing', 'Email service'], 'answer': 1},
-        {'q': 'What is SaaS?', 'options': ['Server as a Service', 'Software as a Service', 'Storage as a Service', 'Security as a Service'], 'answer': 1},
-        {'q': 'What is scalability?', 'options': ['Size measurement', 'Ability to handle growth', 'Speed test', 'Security feature'], 'answer': 1},
-        {'q': 'What is a load balancer?', 'options': ['Weight scale', 'Distributes traffic', 'Power supply', 'Network cable'], 'answer': 1},
-        {'q': 'What is Docker?', 'options': ['Ship worker', 'Containerization platform', 'Database', 'Programming language'], 'answer': 1},
-        {'q': 'What is Kubernetes?', 'options': ['Database', 'Container orchestration', 'Programming language', 'Web browser'], 'answer': 1},
-        {'q': 'What is object storage?', 'options': ['Furniture storage', 'Data storage as objects', 'File cabinet', 'Memory card'], 'answer': 1}
-    ],
-    'Cybersecurity': [
-        {'q': 'What is a firewall?', 'options': ['Fire extinguisher', 'Network security system', 'Antivirus', 'Password'], 'answer': 1},
-        {'q': 'What is encryption?', 'options': ['Deleting data', 'Converting data to code', 'Copying data', 'Moving data'], 'answer': 1},
-        {'q': 'What is phishing?', 'options': ['Fishing hobby', 'Fraudulent attempt to obtain info', 'Programming', 'Testing'], 'answer': 1},
-        {'q': 'What is malware?', 'options': ['Male software', 'Malicious software', 'Mail software', 'Main software'], 'answer': 1},
-        {'q': 'What is two-factor authentication?', 'options': ['Two passwords', 'Two verification methods', 'Two users', 'Two devices'], 'answer': 1},
-        {'q': 'What is a VPN?', 'options': ['Very Private Network', 'Virtual Private Network', 'Verified Public Network', 'Visual Private Network'], 'answer': 1},
-        {'q': 'What is SQL injection?', 'options': ['Medical procedure', 'Code injection attack', 'Database creation', 'File upload'], 'answer': 1},
-        {'q': 'What is a vulnerability?', 'options': ['Feature', 'Security weakness', 'Upgrade', 'Protocol'], 'answer': 1},
-        {'q': 'What is penetration testing?', 'options': ['Breaking hardware', 'Authorized security testing', 'Software installation', 'Data backup'], 'answer': 1},
-        {'q': 'What is ransomware?', 'options': ['Free software', 'Malware demanding payment', 'Antivirus', 'Operating system'], 'answer': 1}
-    ]
-}
+# Process-wide dataset registry: one live version at a time. New data is loaded and its
+# indexes, models and aggregates are built in the background before it is swapped in.
+registry = dataset_registry()
 
-# Add generic tests for skills not in database
-def generate_generic_test(skill_name):
-    return [
-        {'q': f'What is the primary purpose of {skill_name} in professional settings?', 'options': ['Entertainment', 'Problem solving and value creation', 'Time wasting', 'Random activity'], 'answer': 1},
-        {'q': f'Which industry commonly uses {skill_name}?', 'options': ['Agriculture only', 'Technology and Business', 'None', 'Entertainment only'], 'answer': 1},
-        {'q': f'What level of expertise is typically required for {skill_name}?', 'options': ['No training needed', 'Formal education and practice', 'Natural talent only', 'Random guessing'], 'answer': 1},
-        {'q': f'How would you start learning {skill_name}?', 'options': ['Ignore it', 'Study fundamentals and practice', 'Just wing it', 'Ask others to do it'], 'answer': 1},
-        {'q': f'What is a key benefit of mastering {skill_name}?', 'options': ['Nothing', 'Career advancement and problem solving', 'Social media followers', 'Free time'], 'answer': 1},
-        {'q': f'How often should professionals update their {skill_name} knowledge?', 'options': ['Never', 'Regularly to stay current', 'Once in lifetime', 'When forced'], 'answer': 1},
-        {'q': f'What best describes {skill_name}?', 'options': ['Irrelevant skill', 'Valuable professional competency', 'Hobby only', 'Waste of time'], 'answer': 1},
-        {'q': f'How can {skill_name} be applied in work?', 'options': ['Cannot be applied', 'Solving real business problems', 'Only for show', 'No practical use'], 'answer': 1},
-        {'q': f'What is needed to become proficient in {skill_name}?', 'options': ['Nothing', 'Dedication and continuous practice', 'Luck only', 'Connections only'], 'answer': 1},
-        {'q': f'Why is {skill_name} important in modern workplace?', 'options': ['Not important', 'Drives innovation and efficiency', 'Just a trend', 'Only for managers'], 'answer': 1}
-    ]
+# Users, certifications and test attempts, stored on disk so they outlive sessions and restarts
+store = certification_store()
+
+# User this browser session acts for: a random id kept in the page URL, so a refresh or a
+# bookmarked link finds the same certifications
+def session_user():
+    user_id = st.query_params.get('user')
+    if not valid_user_id(user_id):
+        user_id = new_user_id()
+        st.query_params['user'] = user_id
+        store.add_user(user_id)
+    return user_id
+
+# Dataset version this session works on. It is pinned on first use and only moves to the
+# live version when the user changes page, so a page never mixes rows of two versions.
+def session_version():
+    live = registry.current()
+    key = st.session_state.get('dataset_version')
+    if key is None or registry.get(key) is None:
+        key = live.key
+        st.session_state.dataset_version = key
+    return key
+
+# Shared read-only frame of a version; sessions get a zero-copy view per call
+def load_shared_data(version):
+    return registry.get(version).dataset
 
-# Load and cache data
-@st.cache_data
 def load_data():
-    url = "https://raw.githubusercontent.com/harishkumar-devlops/career-guidence/refs/heads/main/FINAL%20DATASET.csv"
-    df = pd.read_csv(url)
-    return df
+    return load_shared_data(session_version()).view()
+
+# Derived artifacts below are built once per dataset version by the registry and dropped with it
+
+# Search index over the Find Job facets
+def load_facet_index(version):
+    return registry.get(version).artifact('facet_index')
+
+# Postings x skills matrix for skill matching
+def load_skill_matrix(version):
+    return registry.get(version).artifact('skill_matrix')
+
+# Occupation model, trained once per dataset version and persisted under .cache
+def load_career_model(version):
+    return registry.get(version).artifact('career_model')
+
+# Quantile income model (P10 / P50 / P90), trained once per dataset version and persisted under .cache
+def load_income_model(version):
+    return registry.get(version).artifact('income_model')
+
+# Expected income range for one profile; repeated views of the same profile are a cache lookup
+@st.cache_data(max_entries=4096)
+def income_range(version, occupation, education, workclass, skills, hours):
+    return load_income_model(version).profile_range(occupation, education, workclass, list(skills), hours)
+
+# Batch scorer for uploaded candidate files
+def load_batch_scorer(version):
+    return registry.get(version).artifact('batch_scorer')
+
+# Stable listing order for each sort option
+def load_result_order(version, sort_label):
+    return registry.get(version).artifact('result_order', sort_label)
+
+# Aggregate cube behind the analytics charts
+def load_cube(version):
+    return registry.get(version).artifact('cube')
+
+# Binned histograms, box-plot quartiles and income x hours density
+def load_distributions(version):
+    return registry.get(version).artifact('distributions')
+
+# Average income and posting count per skill for the analytics dashboard
+def load_skill_income(version):
+    return registry.get(version).artifact('skill_income').ranking()
+
+# Running mean / std / min / max overall and per education level, updated as rows are appended
+def load_running_stats(version):
+    return registry.get(version).artifact('running_stats')
 
 # Initialize session state
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
 
-if 'certified_skills' not in st.session_state:
-    st.session_state.certified_skills = []
-
 if 'test_in_progress' not in st.session_state:
     st.session_state.test_in_progress = False
 
@@ -552,12 +433,23 @@ if 'current_test_skill' not in st.session_state:
 if 'test_answers' not in st.session_state:
     st.session_state.test_answers = {}
 
+# Seeds the question draw of every skill test attempt in this session
+if 'session_seed' not in st.session_state:
+    st.session_state.session_seed = secrets.randbits(63)
+    st.session_state.test_attempt = 0
+
+# Attempt state of an adaptive skill test (None for the fixed-length test)
+if 'adaptive_test' not in st.session_state:
+    st.session_state.adaptive_test = None
+
 if 'user_data' not in st.session_state:
     st.session_state.user_data = {}
 
 # Navigation function
 def navigate_to(page):
     st.session_state.page = page
+    # A new page picks up the live dataset version
+    st.session_state.pop('dataset_version', None)
     st.rerun()
 
 # Home Page
@@ -639,8 +531,9 @@ def career_path_page():
     df = load_data()
     
     # Show certified skills
-    if st.session_state.certified_skills:
-        st.success(f"✅ You have {len(st.session_state.certified_skills)} certified skills: {', '.join(st.session_state.certified_skills)}")
+    certified_skills = store.certified_skills(session_user())
+    if certified_skills:
+        st.success(f"✅ You have {len(certified_skills)} certified skills: {', '.join(certified_skills)}")
     else:
         st.warning("⚠️ You haven't certified any skills yet. Take skill tests first!")
     
@@ -657,15 +550,16 @@ def career_path_page():
                                 ['High School', 'Bachelors', 'Masters', 'PhD', 'Diploma'])
         workclass = st.selectbox("Work Class", 
                                 ['Private', 'Self-employed', 'Government', 'Unemployed', 'Freelancer'])
+        hours_per_week = st.slider("Hours per Week", 10, 80, DEFAULT_HOURS)
     
     with col2:
         st.markdown("### 🛠️ Skills")
         
         # Only show certified skills for selection
-        if st.session_state.certified_skills:
+        if certified_skills:
             selected_skills = st.multiselect(
                 "Select Your Certified Skills", 
-                st.session_state.certified_skills,
+                certified_skills,
                 help="These are your certified skills from skill tests"
             )
         else:
@@ -699,10 +593,43 @@ def career_path_page():
                 'gender': gender,
                 'education': education,
                 'workclass': workclass,
+                'hours_per_week': hours_per_week,
                 'skills': selected_skills,
                 'interests': selected_interests
             }
             navigate_to('prediction')
+    
+    # Batch mode: score a whole cohort of candidates from one CSV file
+    st.markdown("---")
+    st.markdown("### 👥 Batch Prediction")
+    st.caption(f"Upload a CSV with the columns: {', '.join(CANDIDATE_COLUMNS)}. "
+               f"Optional: hours-per-week (default {DEFAULT_HOURS}). Separate several skills or interests with ';'.")
+    uploaded = st.file_uploader("Candidate Profiles (CSV)", type="csv", key="batch_upload")
+    if uploaded is not None:
+        version = session_version()
+        batch = st.session_state.get('batch_results')
+        # Scored once per uploaded file and dataset version; reruns reuse the results
+        if batch is None or batch['key'] != (uploaded.file_id, version):
+            try:
+                candidates = read_candidates(uploaded)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                return
+            progress = st.progress(0.0, text=f"Scoring {len(candidates):,} candidates...")
+            results = load_batch_scorer(version).score(candidates, progress=progress.progress)
+            progress.empty()
+            batch = {'key': (uploaded.file_id, version), 'results': results}
+            st.session_state.batch_results = batch
+        
+        results = batch['results']
+        st.success(f"✅ Scored {len(results):,} candidates")
+        st.dataframe(results.head(100), hide_index=True)
+        st.download_button(
+            "📥 Download Predictions (CSV)",
+            data=lambda: spool_csv(results),
+            file_name="career_predictions.csv",
+            mime="text/csv"
+        )
 
 # Skill Test Page
 def test_skills_page():
@@ -715,54 +642,117 @@ def test_skills_page():
     st.markdown("---")
     
     # Show certified skills
-    if st.session_state.certified_skills:
-        st.success(f"✅ **Your Certified Skills ({len(st.session_state.certified_skills)}):** {', '.join(st.session_state.certified_skills)}")
+    user_id = session_user()
+    certified_skills = store.certified_skills(user_id)
+    if certified_skills:
+        st.success(f"✅ **Your Certified Skills ({len(certified_skills)}):** {', '.join(certified_skills)}")
         st.markdown("---")
     
     # If test is in progress
     if st.session_state.test_in_progress and st.session_state.current_test_skill:
-        conduct_skill_test(st.session_state.current_test_skill)
+        if st.session_state.adaptive_test is not None:
+            conduct_adaptive_test(st.session_state.current_test_skill)
+        else:
+            conduct_skill_test(st.session_state.current_test_skill)
     else:
         st.markdown("### 🎯 Select a Skill to Test")
         st.info("💡 Pass the test with 70% or higher to certify your skill!")
         
         # Available skills
-        all_skills = ['Artificial Intelligence', 'Blockchain', 'Business Analysis', 'C++', 
-                      'Cloud Computing', 'Communication', 'Content Writing', 'Customer Support', 
-                      'Cybersecurity', 'Data Analysis', 'Data Visualization', 'Database Management', 
-                      'DevOps', 'Excel', 'Finance', 'Graphic Design', 'HTML/CSS', 'Java', 
-                      'Leadership', 'Machine Learning', 'Marketing', 'Networking', 'Node.js', 
-                      'Project Management', 'Public Speaking', 'Python', 'React', 'SQL',
-                      'Software Engineering', 'Statistics', 'Testing', 'UI/UX Design']
+        all_skills = SKILLS
         
         # Filter out already certified skills
-        available_skills = [s for s in all_skills if s not in st.session_state.certified_skills]
+        available_skills = [s for s in all_skills if s not in certified_skills]
         
         if available_skills:
             selected_test_skill = st.selectbox("Choose a skill to test", available_skills)
+            # Fixed stays the default until the bundled pools ship calibrated item parameters; with the
+            # defaults (a=1, b=0) the adaptive test needs a median of 7 questions (bench_adaptive)
+            test_mode = st.radio("Test Mode", ["Fixed", "Adaptive"], horizontal=True)
             
             col1, col2 = st.columns([3, 1])
             with col1:
                 st.write(f"**Test Details:**")
-                st.write("- 10 questions")
-                st.write("- Pass score: 70%")
-                st.write("- Duration: ~10 minutes")
+                if test_mode == "Adaptive":
+                    st.write("- One question at a time, chosen from your previous answers")
+                    st.write(f"- Ends as soon as your result is clear (at most {min(MAX_QUESTIONS, pool_size(selected_test_skill))} questions)")
+                    st.write("- Pass level: 70% of the skill's questions")
+                else:
+                    st.write("- 10 questions")
+                    st.write("- Pass score: 70%")
+                    st.write("- Duration: ~10 minutes")
             with col2:
                 if st.button("🚀 Start Test", type="primary"):
                     st.session_state.test_in_progress = True
                     st.session_state.current_test_skill = selected_test_skill
                     st.session_state.test_answers = {}
+                    st.session_state.test_attempt += 1
+                    st.session_state.adaptive_test = None
+                    if test_mode == "Adaptive":
+                        st.session_state.adaptive_test = adaptive_skill_test(
+                            selected_test_skill, (st.session_state.session_seed, st.session_state.test_attempt)
+                        )
+                        st.session_state.adaptive_item = None
                     st.rerun()
         else:
             st.success("🎉 Congratulations! You have certified all available skills!")
+        
+        attempts = store.attempts(user_id)
+        if attempts:
+            with st.expander(f"📜 Recent Attempts ({len(attempts)})"):
+                st.dataframe(pd.DataFrame([{
+                    'Skill': a['skill'],
+                    'Mode': a['mode'].title(),
+                    'Correct': f"{a['correct']}/{a['questions']}",
+                    'Result': "✅ Passed" if a['passed'] else "❌ Failed",
+                    'Finished': pd.Timestamp(a['finished_at'], unit='s').strftime('%Y-%m-%d %H:%M'),
+                } for a in attempts]), hide_index=True)
+        
+        paper_results_section()
+
+# Bulk grading of paper-based tests taken at training centres
+def paper_results_section():
+    st.markdown("---")
+    st.markdown("### 📄 Import Paper Test Results")
+    paper_skill = st.selectbox("Skill tested on paper", SKILLS, key="paper_skill")
+    st.caption(f"Upload a CSV with a '{CANDIDATE_COLUMN}' column and one column per question, named by its "
+               f"number in the {paper_skill} question bank (q1, q2, ...), holding the chosen option (A, B, C, D).")
+    uploaded = st.file_uploader("Paper Results (CSV)", type="csv", key="paper_upload")
+    if uploaded is None:
+        return
+    graded = st.session_state.get('paper_results')
+    # Graded once per uploaded file and skill; reruns reuse the results
+    if graded is None or graded['key'] != (uploaded.file_id, paper_skill):
+        try:
+            candidates, positions, responses = read_paper_results(uploaded, paper_skill)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        per_candidate, per_question = grade_paper_results(candidates, positions, responses, paper_skill)
+        graded = {'key': (uploaded.file_id, paper_skill), 'candidates': per_candidate, 'questions': per_question}
+        st.session_state.paper_results = graded
+    
+    per_candidate = graded['candidates']
+    st.success(f"✅ Graded {len(per_candidate):,} candidates: {per_candidate['passed'].mean():.0%} passed, "
+               f"average score {per_candidate['score'].mean():.0f}%")
+    st.dataframe(per_candidate.head(100), hide_index=True)
+    st.download_button(
+        "📥 Download Graded Results (CSV)",
+        data=lambda: per_candidate.to_csv(index=False).encode('utf-8'),
+        file_name=f"paper_results_{paper_skill}.csv",
+        mime="text/csv"
+    )
+    st.markdown("**Question Statistics** (difficulty: share answering correctly; discrimination: "
+                "correlation with the score on the other questions)")
+    st.dataframe(graded['questions'], hide_index=True)
 
 # Conduct skill test function
 def conduct_skill_test(skill_name):
     st.markdown(f"### 📝 Testing: {skill_name}")
     st.progress(0.5)
     
-    # Get questions for the skill
-    questions = SKILL_TESTS.get(skill_name, generate_generic_test(skill_name))
+    # Get questions for the skill: drawn from its pool per attempt, the same on every rerun
+    questions = skill_test(skill_name, (st.session_state.session_seed, st.session_state.test_attempt))
     
     # Display questions
     with st.form(f"test_form_{skill_name}"):
@@ -777,7 +767,8 @@ def conduct_skill_test(skill_name):
             st.write(q_data['q'])
             answer = st.radio(
                 f"Select your answer for Q{i+1}:",
-                options=q_data['options'],
+                options=range(len(q_data['options'])),
+                format_func=q_data['options'].__getitem__,
                 key=f"q_{i}",
                 label_visibility="collapsed"
             )
@@ -796,13 +787,11 @@ def conduct_skill_test(skill_name):
         st.rerun()
     
     if submit:
-        # Calculate score
-        correct = 0
-        for i, q_data in enumerate(questions):
-            if user_answers[i] == q_data['options'][q_data['answer']]:
-                correct += 1
-        
-        score = (correct / len(questions)) * 100
+        # Calculate score (answers are option indices, graded against the integer answer key)
+        graded = GradedBatch([user_answers], [q_data['answer'] for q_data in questions])
+        correct = int(graded.totals[0])
+        score = graded.scores[0] * 100
+        passed = bool(graded.passed[0])
         
         st.markdown("---")
         st.markdown("## 📊 Test Results")
@@ -824,7 +813,7 @@ def conduct_skill_test(skill_name):
             </div>
             """, unsafe_allow_html=True)
         with col3:
-            status = "✅ PASSED" if score >= 70 else "❌ FAILED"
+            status = "✅ PASSED" if passed else "❌ FAILED"
             st.markdown(f"""
             <div class='stats-card'>
                 <div class='stats-label'>Status</div>
@@ -832,10 +821,9 @@ def conduct_skill_test(skill_name):
             </div>
             """, unsafe_allow_html=True)
         
-        if score >= 70:
+        store.record_attempt(session_user(), skill_name, 'fixed', len(questions), correct, passed)
+        if passed:
             st.success(f"🎉 Congratulations! You have successfully certified your {skill_name} skill!")
-            if skill_name not in st.session_state.certified_skills:
-                st.session_state.certified_skills.append(skill_name)
             st.balloons()
         else:
             st.error(f"Sorry, you need 70% to pass. You scored {score:.0f}%. Please try again!")
@@ -846,8 +834,99 @@ def conduct_skill_test(skill_name):
         
         st.info("👆 Click 'Back to Home' button at the top to continue")
 
+# Adaptive skill test: one question per rerun, chosen for the most information about the
+# candidate's ability, until the pass / fail decision is clear (see adaptive_test.py)
+def conduct_adaptive_test(skill_name):
+    test = st.session_state.adaptive_test
+    decision = test.decision()
+    st.markdown(f"### 📝 Testing: {skill_name}")
+    
+    if decision is None:
+        st.progress(len(test.answers) / test.max_questions)
+        # The next question is picked once, so reruns before answering show the same one
+        if st.session_state.adaptive_item is None:
+            st.session_state.adaptive_item = test.next_item()
+        item = st.session_state.adaptive_item
+        q_data = pool_question(skill_name, item)
+        
+        with st.form(f"adaptive_form_{skill_name}"):
+            st.markdown(f"""
+            <div class='quiz-question'>
+                <h4>Question {len(test.answers) + 1}</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            st.write(q_data['q'])
+            answer = st.radio(
+                "Select your answer:",
+                options=range(len(q_data['options'])),
+                format_func=q_data['options'].__getitem__,
+                key=f"adaptive_q_{st.session_state.test_attempt}_{len(test.answers)}",
+                label_visibility="collapsed"
+            )
+            
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                submit = st.form_submit_button("➡️ Submit Answer", type="primary", use_container_width=True)
+            with col2:
+                cancel = st.form_submit_button("❌ Cancel Test", use_container_width=True)
+        
+        if cancel:
+            st.session_state.test_in_progress = False
+            st.session_state.current_test_skill = None
+            st.session_state.adaptive_test = None
+            st.rerun()
+        
+        if submit:
+            test.record(item, answer == q_data['answer'])
+            st.session_state.adaptive_item = None
+            st.rerun()
+        return
+    
+    st.markdown("---")
+    st.markdown("## 📊 Test Results")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f"""
+        <div class='stats-card'>
+            <div class='stats-label'>Questions Answered</div>
+            <div class='stats-number'>{len(test.answers)}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"""
+        <div class='stats-card'>
+            <div class='stats-label'>Correct Answers</div>
+            <div class='stats-number'>{sum(test.answers)}/{len(test.answers)}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with col3:
+        status = "✅ PASSED" if decision == 'pass' else "❌ FAILED"
+        st.markdown(f"""
+        <div class='stats-card'>
+            <div class='stats-label'>Status</div>
+            <div class='stats-number' style='font-size: 32px;'>{status}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    store.record_attempt(session_user(), skill_name, 'adaptive', len(test.answers), sum(test.answers),
+                         decision == 'pass')
+    if decision == 'pass':
+        st.success(f"🎉 Congratulations! You have successfully certified your {skill_name} skill!")
+        st.balloons()
+    else:
+        st.error("Sorry, your answers did not reach the 70% level. Please try again!")
+    
+    # Reset test state
+    st.session_state.test_in_progress = False
+    st.session_state.current_test_skill = None
+    st.session_state.adaptive_test = None
+    
+    st.info("👆 Click 'Back to Home' button at the top to continue")
+
 # Prediction Results Page
 def prediction_page():
+    import plotly.express as px
     st.markdown("<h1>🎯 Your Career Prediction</h1>", unsafe_allow_html=True)
     
     if st.button("← Back to Form"):
@@ -861,21 +940,19 @@ def prediction_page():
         return
     
     # Load data
-    df = load_data()
+    version = session_version()
+    df = load_shared_data(version).view()
     user_data = st.session_state.user_data
     
     # Convert user's skills and interests to match dataset format
     user_skills_str = ', '.join(user_data['skills'])
     user_interests_str = user_data['interests'][0] if user_data['interests'] else 'Technology'
     
-    # Filter data based on user profile
-    matching_jobs = df.copy()
-    
-    # Filter by education
-    matching_jobs = matching_jobs[matching_jobs['education'] == user_data['education']]
+    # Filter data based on user profile (df is a shared view, filters never copy it)
+    matching_jobs = df[df['education'] == user_data['education']]
     
     if len(matching_jobs) == 0:
-        matching_jobs = df.copy()
+        matching_jobs = df
     
     # Filter by workclass
     if user_data['workclass'] != 'Unemployed':
@@ -888,29 +965,34 @@ def prediction_page():
     if len(interest_matches) > 0:
         matching_jobs = interest_matches
     
-    # Calculate skill match score
-    def calculate_skill_match(job_skills):
-        if pd.isna(job_skills):
-            return 0
-        job_skills_list = [s.strip() for s in str(job_skills).split(',')]
-        matches = sum(1 for skill in user_data['skills'] if skill in job_skills_list)
-        return matches
-    
-    matching_jobs['skill_match'] = matching_jobs['skills'].apply(calculate_skill_match)
-    matching_jobs = matching_jobs.sort_values('skill_match', ascending=False)
-    
-    if len(matching_jobs) > 0:
-        top_match = matching_jobs.iloc[0]
-        predicted_job = top_match['occupation']
-        predicted_income = top_match['income']
+    # Predict the occupation with the trained model
+    top_occupations = load_career_model(version).top_occupations(user_data)
+    predicted_job = top_occupations[0][0]
+    job_matches = load_facet_index(version).search({'occupation': predicted_job})
+    
+    # Representative posting: best skill match (one sparse product) among the profile-filtered
+    # postings of that occupation, or among all of its postings. df has a RangeIndex, so
+    # index labels are row positions in the skill matrix.
+    job_rows = job_matches.rows()
+    candidates = np.intersect1d(matching_jobs.index.to_numpy(), job_rows, assume_unique=True)
+    if len(candidates) == 0:
+        candidates = job_rows
+    
+    if len(candidates) > 0:
+        skill_match = load_skill_matrix(version).scores(user_data['skills'], candidates)
+        top_match = df.iloc[candidates[top_k(skill_match, 1)[0]]]
         required_skills = top_match['skills']
         job_interest = top_match['interests']
     else:
-        predicted_job = df['occupation'].mode()[0]
-        predicted_income = df['income'].median()
         required_skills = user_skills_str
         job_interest = user_interests_str
     
+    # P10 / P50 / P90 income for this profile in the predicted occupation
+    income_low, income_typical, income_high = income_range(
+        version, predicted_job, user_data['education'], user_data['workclass'],
+        tuple(user_data['skills']), user_data.get('hours_per_week', DEFAULT_HOURS)
+    )
+    
     # Display predictions
     col1, col2 = st.columns(2)
     
@@ -926,7 +1008,8 @@ def prediction_page():
         st.markdown(f"""
         <div class='prediction-card'>
             <h2>💰 Expected Income Range</h2>
-            <h1>${predicted_income:,}</h1>
+            <h1>${income_low:,} - ${income_high:,}</h1>
+            <p>Typical: ${income_typical:,}/year</p>
         </div>
         """, unsafe_allow_html=True)
     
@@ -949,14 +1032,35 @@ def prediction_page():
     with col3:
         st.warning(f"**Job Category:** {job_interest}")
     
+    # Ranked alternatives from the same model pass
+    st.markdown("---")
+    st.markdown("### 🔀 Other Careers That Fit You")
+    
+    fig = px.bar(
+        x=[100 * probability for _, probability in top_occupations],
+        y=[occupation for occupation, _ in top_occupations],
+        orientation='h',
+        labels={'x': 'Match Probability (%)', 'y': 'Job Title'},
+        title=f'Top {len(top_occupations)} Predicted Careers',
+        color=[probability for _, probability in top_occupations],
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(showlegend=False, height=400, yaxis={'autorange': 'reversed'}, coloraxis_showscale=False)
+    st.plotly_chart(fig, use_container_width=True)
+    
     # Available Jobs
     st.markdown("---")
     st.markdown("### 💼 Available Job Opportunities")
     
-    job_opportunities = df[df['occupation'] == predicted_job].head(10)
-    
-    if len(job_opportunities) > 0:
-        for idx, job in job_opportunities.iterrows():
+    if len(job_matches) > 0:
+        page_rows = paginated(
+            "prediction_page",
+            job_matches,
+            load_result_order(version, 'Default order'),
+            page_size=10,
+            signature=predicted_job
+        )
+        for job in df.iloc[page_rows].to_dict('records'):
             with st.expander(f"📍 {job['occupation']} - ${job['income']:,}/year | {job['workclass']}"):
                 col1, col2 = st.columns(2)
                 with col1:
@@ -972,7 +1076,7 @@ def prediction_page():
     st.markdown("---")
     st.markdown("### 💰 Income Comparison by Job")
     
-    income_by_job = df.groupby('occupation')['income'].mean().sort_values(ascending=False).head(10)
+    income_by_job = df.groupby('occupation', observed=True)['income'].mean().sort_values(ascending=False).head(10)
     
     fig = px.bar(
         x=income_by_job.values,
@@ -995,35 +1099,61 @@ def find_job_page():
     if st.button("← Back to Home"):
         navigate_to('home')
     
-    df = load_data()
+    version = session_version()
+    df = load_shared_data(version).view()
+    index = load_facet_index(version)
     
     st.markdown("### 🔍 Search Jobs")
     
+    # Live counts for every option, given what the other selectboxes currently hold
+    selection = {facet: st.session_state.get(f"search_{facet}", 'All') for facet in FACETS}
+    counts = index.facet_counts(selection)
+    
+    def facet_selectbox(label, facet):
+        options = ['All'] + sorted(index.labels[facet])
+        facet_counts = counts[facet]
+        return st.selectbox(
+            label,
+            options,
+            key=f"search_{facet}",
+            format_func=lambda option: option if option == 'All' else f"{option} ({facet_counts[option]:,})"
+        )
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        search_occupation = st.selectbox("Select Job Title", ['All'] + sorted(df['occupation'].unique().tolist()))
-        search_education = st.selectbox("Education Level", ['All'] + sorted(df['education'].unique().tolist()))
+        search_occupation = facet_selectbox("Select Job Title", 'occupation')
+        search_education = facet_selectbox("Education Level", 'education')
     
     with col2:
-        search_workclass = st.selectbox("Work Class", ['All'] + sorted(df['workclass'].unique().tolist()))
-        search_interest = st.selectbox("Industry/Interest", ['All'] + sorted(df['interests'].unique().tolist()))
-    
-    # Filter data
-    filtered_df = df.copy()
-    
-    if search_occupation != 'All':
-        filtered_df = filtered_df[filtered_df['occupation'] == search_occupation]
-    if search_education != 'All':
-        filtered_df = filtered_df[filtered_df['education'] == search_education]
-    if search_workclass != 'All':
-        filtered_df = filtered_df[filtered_df['workclass'] == search_workclass]
-    if search_interest != 'All':
-        filtered_df = filtered_df[filtered_df['interests'] == search_interest]
+        search_workclass = facet_selectbox("Work Class", 'workclass')
+        search_interest = facet_selectbox("Industry/Interest", 'interests')
+    
+    # Filter data through the facet index
+    selection = {
+        'occupation': search_occupation,
+        'education': search_education,
+        'workclass': search_workclass,
+        'interests': search_interest
+    }
+    matches = index.search(selection)
     
-    st.markdown(f"### Found {len(filtered_df)} Jobs")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.markdown(f"### Found {len(matches)} Jobs")
+    with col2:
+        sort_label = st.selectbox("Sort by", list(SORT_OPTIONS), key="search_sort")
+    
+    # Only the visible page is located and sliced out of the shared frame
+    page_rows = paginated(
+        "find_job_page",
+        matches,
+        load_result_order(version, sort_label),
+        page_size=20,
+        signature=(tuple(selection.values()), sort_label)
+    )
     
-    for idx, job in filtered_df.head(20).iterrows():
+    for job in df.iloc[page_rows].to_dict('records'):
         with st.expander(f"💼 {job['occupation']} - ${job['income']:,}"):
             col1, col2 = st.columns(2)
             with col1:
@@ -1040,7 +1170,8 @@ def view_skills_page():
     if st.button("← Back to Home"):
         navigate_to('home')
     
-    df = load_data()
+    version = session_version()
+    df = load_shared_data(version).view()
     
     job_titles = sorted(df['occupation'].unique())
     selected_job = st.selectbox("Select a Job Title", job_titles)
@@ -1079,19 +1210,37 @@ def view_skills_page():
         st.markdown("---")
         st.markdown("### 💼 Sample Job Listings")
         
-        for idx, job in job_data.head(5).iterrows():
-            with st.expander(f"Position {idx + 1}: ${job['income']:,}"):
+        page_rows = paginated(
+            "view_skills_page",
+            load_facet_index(version).search({'occupation': selected_job}),
+            load_result_order(version, 'Default order'),
+            page_size=5,
+            signature=selected_job
+        )
+        for position, job in zip(page_rows, df.iloc[page_rows].to_dict('records')):
+            with st.expander(f"Position {position + 1}: ${job['income']:,}"):
                 st.write(f"**Skills Required:** {job['skills']}")
                 st.write(f"**Education:** {job['education']}")
                 st.write(f"**Industry:** {job['interests']}")
 
 # Data Analytics Page
 def data_analytics_page():
+    import plotly.express as px
+    import plotly.graph_objects as go
     st.markdown("<h1>📈 Data Analytics Dashboard</h1>", unsafe_allow_html=True)
     if st.button("← Back to Home"):
         navigate_to('home')
     
-    df = load_data()
+    version = session_version()
+    df = load_shared_data(version).view()
+    cube = load_cube(version)
+    distributions = load_distributions(version)
+    stats = load_running_stats(version)
+    # Grand totals (count, mean, std, min, max) of every measure
+    totals = {measure: stats.summary(None, measure).iloc[0] for measure in CUBE_MEASURES}
+    # Medians, percentiles and modes below come from the quantile sketches (within SKETCH_ERROR)
+    medians = {measure: stats.quantile(None, measure, 0.5).iloc[0] for measure in CUBE_MEASURES}
+    numeric_columns = [column for column in df.columns if column in CUBE_MEASURES]
     
     # Display dataset info first to understand columns
     st.sidebar.markdown("## ℹ️ Dataset Info")
@@ -1126,21 +1275,21 @@ def data_analytics_page():
             st.markdown(f"""
             <div class='stats-card'>
                 <div class='stats-label'>Unique Jobs</div>
-                <div class='stats-number'>{df['occupation'].nunique():,}</div>
+                <div class='stats-number'>{len(cube.counts('occupation')):,}</div>
             </div>
             """, unsafe_allow_html=True)
         with col3:
             st.markdown(f"""
             <div class='stats-card'>
                 <div class='stats-label'>Avg Income</div>
-                <div class='stats-number'>${df['income'].mean():,.0f}</div>
+                <div class='stats-number'>${totals['income']['mean']:,.0f}</div>
             </div>
             """, unsafe_allow_html=True)
         with col4:
             st.markdown(f"""
             <div class='stats-card'>
                 <div class='stats-label'>Avg Age</div>
-                <div class='stats-number'>{df['age'].mean():.1f}</div>
+                <div class='stats-number'>{totals['age']['mean']:.1f}</div>
             </div>
             """, unsafe_allow_html=True)
         
@@ -1152,7 +1301,7 @@ def data_analytics_page():
         
         # Dataset Statistics
         st.markdown("### 📈 Statistical Summary")
-        st.dataframe(df.describe(), use_container_width=True)
+        st.dataframe(stats.describe(numeric_columns), use_container_width=True)
         
         # Missing Values Analysis
         st.markdown("### 🔍 Data Quality Check")
@@ -1180,21 +1329,21 @@ def data_analytics_page():
         with col1:
             # Income Distribution
             st.markdown("### 📊 Income Distribution")
-            fig = px.histogram(
-                df,
-                x='income',
-                nbins=50,
+            fig = px.bar(
+                x=bin_centers(distributions.income_edges),
+                y=distributions.income_counts,
                 title='Income Distribution',
-                labels={'income': 'Income ($)', 'count': 'Frequency'},
+                labels={'x': 'Income ($)', 'y': 'Frequency'},
                 color_discrete_sequence=['#667eea']
             )
-            fig.update_layout(showlegend=False)
+            fig.update_traces(width=np.diff(distributions.income_edges))
+            fig.update_layout(showlegend=False, bargap=0)
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             # Income by Occupation (Top 15)
             st.markdown("### 💼 Top 15 Highest Paying Jobs")
-            top_jobs = df.groupby('occupation')['income'].mean().sort_values(ascending=False).head(15)
+            top_jobs = cube.means('occupation', 'income').head(15)
             fig = px.bar(
                 x=top_jobs.values,
                 y=top_jobs.index,
@@ -1208,7 +1357,7 @@ def data_analytics_page():
         
         # Income by Education
         st.markdown("### 🎓 Income by Education Level")
-        income_education = df.groupby('education')['income'].mean().sort_values(ascending=False)
+        income_education = cube.means('education', 'income')
         fig = px.bar(
             x=income_education.index,
             y=income_education.values,
@@ -1224,7 +1373,7 @@ def data_analytics_page():
         col1, col2 = st.columns(2)
         
         with col1:
-            income_workclass = df.groupby('workclass')['income'].mean().sort_values(ascending=False)
+            income_workclass = cube.means('workclass', 'income')
             fig = px.pie(
                 values=income_workclass.values,
                 names=income_workclass.index,
@@ -1234,29 +1383,36 @@ def data_analytics_page():
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
-            # Box plot for income by work class
-            fig = px.box(
-                df,
-                x='workclass',
-                y='income',
+            # Box plot for income by work class, from precomputed quartiles and whiskers
+            box = distributions.box
+            fig = go.Figure([
+                go.Box(
+                    name=workclass, x=[workclass], q1=[row['q1']], median=[row['median']], q3=[row['q3']],
+                    lowerfence=[row['lowerfence']], upperfence=[row['upperfence']],
+                    marker_color=color
+                )
+                for (workclass, row), color in zip(box.iterrows(), px.colors.qualitative.Plotly)
+            ])
+            fig.update_layout(
                 title='Income Range by Work Class',
-                labels={'workclass': 'Work Class', 'income': 'Income ($)'},
-                color='workclass'
+                xaxis_title='Work Class',
+                yaxis_title='Income ($)'
             )
             st.plotly_chart(fig, use_container_width=True)
         
-        # Income vs Hours worked
+        # Income vs Hours worked: density of every row, binned on the server
         st.markdown("### ⏰ Income vs Hours Worked Per Week")
-        # Use a smaller sample for better performance
-        sample_df = df.sample(n=min(500, len(df)), random_state=42)
-        fig = px.scatter(
-            sample_df,
-            x='hours-per-week',
-            y='income',
-            color='workclass',
-            title='Income vs Hours Worked (Sample)',
-            labels={'hours-per-week': 'Hours Per Week', 'income': 'Income ($)'},
-            opacity=0.6
+        density_workclass = st.selectbox("Work Class", ['All'] + distributions.groups, key="density_workclass")
+        density = distributions.income_hours(None if density_workclass == 'All' else density_workclass)
+        fig = px.imshow(
+            density.T,
+            x=bin_centers(distributions.hours_edges),
+            y=bin_centers(distributions.income_edges),
+            origin='lower',
+            aspect='auto',
+            title='Income vs Hours Worked (Density)',
+            labels={'x': 'Hours Per Week', 'y': 'Income ($)', 'color': 'People'},
+            color_continuous_scale='Viridis'
         )
         st.plotly_chart(fig, use_container_width=True)
     
@@ -1269,7 +1425,7 @@ def data_analytics_page():
         
         with col1:
             st.markdown("### 📚 Education Level Distribution")
-            education_counts = df['education'].value_counts()
+            education_counts = cube.counts('education')
             fig = px.pie(
                 values=education_counts.values,
                 names=education_counts.index,
@@ -1344,7 +1500,7 @@ def data_analytics_page():
         with col1:
             # Work Class Distribution
             st.markdown("### 🏢 Work Class Distribution")
-            workclass_counts = df['workclass'].value_counts()
+            workclass_counts = cube.counts('workclass')
             fig = px.pie(
                 values=workclass_counts.values,
                 names=workclass_counts.index,
@@ -1357,19 +1513,20 @@ def data_analytics_page():
         with col2:
             # Hours per week distribution
             st.markdown("### ⏰ Work Hours Distribution")
-            fig = px.histogram(
-                df,
-                x='hours-per-week',
-                nbins=30,
+            fig = px.bar(
+                x=bin_centers(distributions.hours_edges),
+                y=distributions.hours_counts,
                 title='Hours Worked Per Week',
-                labels={'hours-per-week': 'Hours Per Week', 'count': 'Frequency'},
+                labels={'x': 'Hours Per Week', 'y': 'Frequency'},
                 color_discrete_sequence=['#764ba2']
             )
+            fig.update_traces(width=np.diff(distributions.hours_edges))
+            fig.update_layout(bargap=0)
             st.plotly_chart(fig, use_container_width=True)
         
         # Interests/Industry Distribution
         st.markdown("### 🎯 Industry/Interest Distribution")
-        interests_counts = df['interests'].value_counts().head(15)
+        interests_counts = cube.counts('interests').head(15)
         fig = px.bar(
             x=interests_counts.values,
             y=interests_counts.index,
@@ -1384,7 +1541,7 @@ def data_analytics_page():
         
         # Occupation Distribution
         st.markdown("### 👔 Top Occupations")
-        occupation_counts = df['occupation'].value_counts().head(20)
+        occupation_counts = cube.counts('occupation').head(20)
         fig = px.treemap(
             names=occupation_counts.index,
             parents=[''] * len(occupation_counts),
@@ -1395,7 +1552,7 @@ def data_analytics_page():
         
         # Average hours by work class
         st.markdown("### 📊 Average Hours by Work Class")
-        avg_hours = df.groupby('workclass')['hours-per-week'].mean().sort_values(ascending=False)
+        avg_hours = cube.means('workclass', 'hours-per-week')
         fig = px.bar(
             x=avg_hours.index,
             y=avg_hours.values,
@@ -1440,7 +1597,7 @@ def data_analytics_page():
         if len(available_group_cols) >= 2:
             st.write("Income by Education and Work Class")
             
-            pivot_data = df.groupby(available_group_cols)['income'].mean().reset_index()
+            pivot_data = cube.rollup(available_group_cols, 'income')['mean'].rename('income').reset_index()
             
             fig = px.sunburst(
                 pivot_data,
@@ -1457,27 +1614,18 @@ def data_analytics_page():
         # Skills vs Income Analysis
         st.markdown("### 💼 Skills Impact on Income")
         
-        # Calculate average income for each skill
-        skill_income = {}
-        for idx, row in df.iterrows():
-            if pd.notna(row['skills']):
-                skills = [s.strip() for s in str(row['skills']).split(',')]
-                for skill in skills:
-                    if skill not in skill_income:
-                        skill_income[skill] = []
-                    skill_income[skill].append(row['income'])
-        
-        avg_skill_income = {skill: np.mean(incomes) for skill, incomes in skill_income.items() if len(incomes) > 10}
-        if avg_skill_income:
-            top_income_skills = dict(sorted(avg_skill_income.items(), key=lambda x: x[1], reverse=True)[:15])
+        # Average income per skill, aggregated once per dataset version
+        avg_skill_income = load_skill_income(version)
+        if len(avg_skill_income) > 0:
+            top_income_skills = avg_skill_income['mean'].head(15)
             
             fig = px.bar(
-                x=list(top_income_skills.values()),
-                y=list(top_income_skills.keys()),
+                x=top_income_skills.values,
+                y=top_income_skills.index,
                 orientation='h',
                 title='Top 15 Highest Paying Skills',
                 labels={'x': 'Average Income ($)', 'y': 'Skill'},
-                color=list(top_income_skills.values()),
+                color=top_income_skills.values,
                 color_continuous_scale='Plasma'
             )
             fig.update_layout(height=600)
@@ -1487,10 +1635,13 @@ def data_analytics_page():
         
         # Education ROI Analysis
         st.markdown("### 🎓 Education Return on Investment")
-        edu_stats = df.groupby('education').agg({
-            'income': ['mean', 'median', 'std'],
-            'age': 'mean'
-        }).round(2)
+        income_by_education = stats.summary('education', 'income')
+        edu_stats = pd.DataFrame({
+            ('income', 'mean'): income_by_education['mean'],
+            ('income', 'median'): stats.quantile('education', 'income', 0.5),
+            ('income', 'std'): income_by_education['std'],
+            ('age', 'mean'): stats.summary('education', 'age')['mean'],
+        }, index=income_by_education.index).round(2)
         
         st.dataframe(edu_stats, use_container_width=True)
         
@@ -1502,57 +1653,65 @@ def data_analytics_page():
         with col1:
             st.info(f"""
             **Income Statistics**
-            - Mean: ${df['income'].mean():,.0f}
-            - Median: ${df['income'].median():,.0f}
-            - Std Dev: ${df['income'].std():,.0f}
-            - Range: ${df['income'].min():,.0f} - ${df['income'].max():,.0f}
+            - Mean: ${totals['income']['mean']:,.0f}
+            - Median: ${medians['income']:,.0f}
+            - Std Dev: ${totals['income']['std']:,.0f}
+            - Range: ${totals['income']['min']:,.0f} - ${totals['income']['max']:,.0f}
             """)
         
         with col2:
             st.info(f"""
             **Age Statistics**
-            - Mean Age: {df['age'].mean():.1f}
-            - Median Age: {df['age'].median():.1f}
-            - Std Dev: {df['age'].std():.1f}
-            - Range: {df['age'].min()} - {df['age'].max()}
+            - Mean Age: {totals['age']['mean']:.1f}
+            - Median Age: {medians['age']:.1f}
+            - Std Dev: {totals['age']['std']:.1f}
+            - Range: {totals['age']['min']:.0f} - {totals['age']['max']:.0f}
             """)
         
         with col3:
             st.info(f"""
             **Work Statistics**
-            - Avg Hours/Week: {df['hours-per-week'].mean():.1f}
-            - Median Hours/Week: {df['hours-per-week'].median():.1f}
-            - Most Common: {df['hours-per-week'].mode()[0]:.0f} hrs
+            - Avg Hours/Week: {totals['hours-per-week']['mean']:.1f}
+            - Median Hours/Week: {medians['hours-per-week']:.1f}
+            - Most Common: {stats.mode(None, 'hours-per-week').iloc[0]:.0f} hrs
             """)
     
     # Download option
     st.markdown("---")
     st.markdown("### 💾 Download Analysis Data")
     
+    # Files are only written when a button is clicked, once per dataset version and format
+    export_format = st.selectbox("Download Format", list(EXPORT_FORMATS), key="export_format")
+    extension, mime = EXPORT_FORMATS[export_format]
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        csv = df.to_csv(index=False).encode('utf-8')
         st.download_button(
-            label="📥 Download Full Dataset (CSV)",
-            data=csv,
-            file_name="career_guidance_data.csv",
-            mime="text/csv"
+            label=f"📥 Download Full Dataset ({export_format})",
+            data=lambda: read_export("dataset", version, export_format, lambda: df),
+            file_name=f"career_guidance_data.{extension}",
+            mime=mime
         )
     
     with col2:
-        summary_stats = df.describe().to_csv().encode('utf-8')
         st.download_button(
-            label="📊 Download Statistics (CSV)",
-            data=summary_stats,
-            file_name="dataset_statistics.csv",
-            mime="text/csv"
+            label=f"📊 Download Statistics ({export_format})",
+            data=lambda: read_export("statistics", version, export_format, lambda: stats.describe(numeric_columns).rename_axis('statistic').reset_index()),
+            file_name=f"dataset_statistics.{extension}",
+            mime=mime
         )
     
     with col3:
         if st.button("🔄 Refresh Data"):
-            st.cache_data.clear()
-            st.rerun()
+            # Conditional request in the background; a new copy is built into a new version and
+            # swapped in without evicting anything sessions on this version are still using
+            registry.refresh()
+            st.info("Checking for new data. Pages you open next will use it once it is ready.")
+        if registry.status != "idle":
+            st.caption(f"Data refresh: {registry.status}")
+        elif registry.current_key != version:
+            st.caption("A newer dataset version is live; open another page to switch to it.")
 
 # Main app routing
 def main():
@@ -0,0 +1,136 @@
+import copy
+import re
+
+import numpy as np
+import pandas as pd
+
+from data_loader import extend_categories
+
+# scipy is imported by the functions that build sparse matrices, so pages that only need
+# SKILLS do not pay for it at startup
+
+# Skills offered in test_skills_page; the columns of the skill matrix
+SKILLS = ['Artificial Intelligence', 'Blockchain', 'Business Analysis', 'C++',
+          'Cloud Computing', 'Communication', 'Content Writing', 'Customer Support',
+          'Cybersecurity', 'Data Analysis', 'Data Visualization', 'Database Management',
+          'DevOps', 'Excel', 'Finance', 'Graphic Design', 'HTML/CSS', 'Java',
+          'Leadership', 'Machine Learning', 'Marketing', 'Networking', 'Node.js',
+          'Project Management', 'Public Speaking', 'Python', 'React', 'SQL',
+          'Software Engineering', 'Statistics', 'Testing', 'UI/UX Design']
+
+
+# Multi-hot encoding of a list of skill names over `skills` (unknown names are ignored)
+def skill_vector(names, skills=SKILLS):
+    lookup = {skill: i for i, skill in enumerate(skills)}
+    vector = np.zeros(len(skills), dtype=np.float32)
+    for name in names:
+        if name in lookup:
+            vector[lookup[name]] = 1
+    return vector
+
+
+# Separators accepted between the values of a multi-valued cell ("Python, SQL")
+SEPARATORS = re.compile(r'[,;|]')
+
+
+# Sparse multi-hot matrix (rows x vocabulary) of a column of separated values. Each distinct
+# string is split once (the column is treated as categorical); unknown values are ignored.
+def multi_hot(column, vocabulary):
+    from scipy import sparse
+    lookup = {value: i for i, value in enumerate(vocabulary)}
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype('category')
+    # One row per distinct string, plus an empty row for missing values
+    indptr, indices = [0], []
+    for value in column.cat.categories:
+        ids = sorted({lookup[v.strip()] for v in SEPARATORS.split(str(value)) if v.strip() in lookup})
+        indices.extend(ids)
+        indptr.append(len(indices))
+    indptr.append(len(indices))
+    by_value = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices, indptr),
+        shape=(len(column.cat.categories) + 1, len(vocabulary))
+    )
+    codes = column.cat.codes.to_numpy()
+    return by_value[np.where(codes >= 0, codes, len(column.cat.categories))]
+
+
+# Sparse multi-hot matrix of postings x skills, built once per dataset version, so scoring a
+# profile is a single sparse matrix-vector product.
+class SkillMatrix:
+    def __init__(self, df, skills=SKILLS):
+        self.skills = list(skills)
+        self.matrix = multi_hot(df['skills'], self.skills)
+
+    # Matrix over these postings followed by those of `df`; only the new rows are encoded
+    def append(self, df):
+        from scipy import sparse
+        matrix = copy.copy(self)
+        matrix.matrix = sparse.vstack([self.matrix, multi_hot(df['skills'], self.skills)], format='csr')
+        return matrix
+
+    # Skill overlap between a profile and each posting (all postings, or the given positions)
+    def scores(self, user_skills, positions=None):
+        matrix = self.matrix if positions is None else self.matrix[positions]
+        return matrix @ skill_vector(user_skills, self.skills)
+
+
+# Indices of the k highest scores, best first; ties keep their original order
+def top_k(scores, k):
+    if k >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    threshold = scores[candidates].min()
+    # argpartition picks arbitrary members of a tie at the threshold; take the earliest ones
+    above = np.flatnonzero(scores > threshold)
+    tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+    chosen = np.concatenate([above, tied])
+    return chosen[np.argsort(-scores[chosen], kind='stable')]
+
+
+# Skill profile of every occupation: skill_share[o, s] is the share of a typical posting's
+# required skills that skill s makes up among occupation o's postings. A profile's coverage of
+# an occupation is then the expected fraction of a posting's required skills it already has.
+# The per-occupation sums of those shares and the posting counts are kept, so appended
+# postings are added from their own rows of the skill matrix.
+class OccupationProfiles:
+    def __init__(self, df, skill_matrix):
+        self.labels = []
+        self.skill_sums = np.zeros((0, len(skill_matrix.skills)))
+        self.postings = np.zeros(0, dtype=np.int64)
+        self._add(df, skill_matrix.matrix)
+
+    # Profiles over these postings followed by those of `df`, which are the last rows of
+    # skill_matrix
+    def append(self, df, skill_matrix):
+        profiles = copy.copy(self)
+        profiles._add(df, skill_matrix.matrix[skill_matrix.matrix.shape[0] - len(df):])
+        return profiles
+
+    def _add(self, df, matrix):
+        from scipy import sparse
+        labels, codes = extend_categories(self.labels, df['occupation'])
+        valid = np.flatnonzero(codes >= 0)
+        matrix = matrix[valid]
+        per_posting = np.asarray(matrix.sum(axis=1)).ravel()
+        weighted = sparse.diags(1 / np.maximum(per_posting, 1)) @ matrix
+        by_occupation = sparse.csr_matrix(
+            (np.ones(len(valid)), (codes[valid], np.arange(len(valid)))),
+            shape=(len(labels), len(valid))
+        )
+        added = len(labels) - len(self.labels)
+        self.skill_sums = np.pad(self.skill_sums, ((0, added), (0, 0))) + (by_occupation @ weighted).toarray()
+        self.postings = np.pad(self.postings, (0, added)) + np.bincount(codes[valid], minlength=len(labels))
+        self.labels = labels
+        self.lookup = {label: i for i, label in enumerate(labels)}
+        self.skill_share = (self.skill_sums / np.maximum(self.postings, 1)[:, None]).astype(np.float32)
+
+    # Codes of occupation labels (-1 for labels missing from the dataset)
+    def codes(self, labels):
+        return np.array([self.lookup.get(str(label), -1) for label in labels], dtype=np.int64)
+
+    # Coverage of occupation_codes[i] by row i of a sparse profiles x skills matrix, in [0, 1]
+    def coverage(self, skill_rows, occupation_codes):
+        shares = self.skill_share[np.maximum(occupation_codes, 0)]
+        covered = np.asarray(skill_rows.multiply(shares).sum(axis=1)).ravel()
+        return np.where(occupation_codes >= 0, covered, 0.0)
@@ -0,0 +1,133 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from data_loader import BASE_DIR
+
+# Streamlit entry points profiled by default
+ENTRY_POINTS = ['app.py', 'alter.py', 'show.py']
+
+# Committed limits: per entry point, milliseconds for its module-level imports and for a cold
+# process to render home_page; plus modules no entry point may load before a page needs them
+BUDGET_PATH = os.path.join(BASE_DIR, "startup_budget.json")
+
+# Cold starts per entry point; timings are the fastest run, to keep noise out of the budget
+REPEATS = 3
+
+# Runs an entry point's module-level import statements (and nothing else) under -X importtime
+IMPORT_PROBE = r"""
+import ast, sys
+tree = ast.parse(open(sys.argv[1], encoding='utf-8').read())
+imports = ast.Module(body=[n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))], type_ignores=[])
+sys.stderr.write('-- imports\n')
+sys.stderr.flush()
+exec(compile(imports, sys.argv[1], 'exec'), {})
+"""
+
+# Cold start of an entry point up to home_page's first render: import streamlit, run the page
+# script once through AppTest, and report which deferred modules were loaded by then
+RENDER_PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+ready = time.perf_counter()
+at.run()
+end = time.perf_counter()
+deferred = json.loads(sys.argv[2])
+print(json.dumps({
+    'streamlit_ms': (ready - start) * 1000,
+    'script_ms': (end - ready) * 1000,
+    'first_render_ms': (end - start) * 1000,
+    'exception': [e.message for e in at.exception],
+    'deferred_loaded': [m for m in deferred if m in sys.modules],
+}))
+"""
+
+
+def load_budget(path=BUDGET_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Milliseconds per top-level package imported by the entry's own import statements (what
+# those packages pull in is counted under them), from -X importtime output
+def _import_breakdown(stderr):
+    breakdown = {}
+    lines = stderr.splitlines()
+    for line in lines[lines.index('-- imports') + 1:]:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith(" ") or name.startswith("  "):
+            continue
+        package = name.strip().split(".")[0]
+        breakdown[package] = breakdown.get(package, 0) + int(cumulative) / 1000
+    return breakdown
+
+
+def _run(args, env):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=BASE_DIR, env=env,
+                          check=True)
+
+
+# Profile each entry point in fresh interpreters, with an empty dataset cache and a scratch
+# certification store so every run is a cold start
+def profile(entries=ENTRY_POINTS, deferred=(), repeats=REPEATS):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, CAREER_CACHE_DIR=os.path.join(tmp, "cache"),
+                   CAREER_STORE_PATH=os.path.join(tmp, "certifications.db"))
+        for entry in entries:
+            imports = [_import_breakdown(_run(["-X", "importtime", "-c", IMPORT_PROBE, entry], env).stderr)
+                       for _ in range(repeats)]
+            imports = min(imports, key=lambda breakdown: sum(breakdown.values()))
+            renders = [json.loads(_run(["-c", RENDER_PROBE, entry, json.dumps(list(deferred))], env).stdout)
+                       for _ in range(repeats)]
+            render = min(renders, key=lambda run: run['first_render_ms'])
+            results[entry] = dict(render, imports=imports, import_ms=sum(imports.values()))
+    return results
+
+
+# Budget violations of profile() results, as messages (empty when everything is within budget)
+def over_budget(results, budget):
+    failures = []
+    for entry, result in results.items():
+        if result['exception']:
+            failures.append(f"{entry}: home_page raised {result['exception'][0]}")
+        for key in ('import_ms', 'first_render_ms'):
+            limit = budget[key].get(entry)
+            if limit is not None and result[key] > limit:
+                failures.append(f"{entry}: {key} {result[key]:.0f} > budget {limit}")
+        if result['deferred_loaded']:
+            failures.append(f"{entry}: loads {', '.join(result['deferred_loaded'])} at startup")
+    return failures
+
+
+def report(results, top=5):
+    for entry, result in results.items():
+        heaviest = sorted(result['imports'].items(), key=lambda item: -item[1])[:top]
+        print(f"{entry}: imports {result['import_ms']:.0f}ms "
+              f"({', '.join(f'{name} {ms:.0f}' for name, ms in heaviest)}); "
+              f"home_page first render {result['first_render_ms']:.0f}ms "
+              f"(streamlit {result['streamlit_ms']:.0f}, script {result['script_ms']:.0f})")
+
+
+# `python startup_profile.py [entry ...]` profiles the entry points and exits non-zero when
+# one is over the committed budget
+def main(entries=None):
+    budget = load_budget()
+    results = profile(entries or ENTRY_POINTS, budget['deferred_modules'])
+    report(results)
+    failures = over_budget(results, budget)
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    if not failures:
+        print("within budget")
+    return not failures
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv[1:]) else 1)
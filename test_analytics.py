@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import SKETCH_ERROR, DistributionSummary, QuantileSketch, RunningStats, SkillIncome
+from data_loader import DATASET_PATH, append_frame, apply_schema
+from skill_matching import OccupationProfiles, SkillMatrix
+
+QUANTILES = (0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0)
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.lognormal(11, 0.6, 3000), rng.integers(1, 100, 1000).astype(float)])
+    codes = rng.integers(0, 3, len(values))
+    return values, codes
+
+
+def test_quantiles_are_within_the_relative_error_bound(sample):
+    values, codes = sample
+    sketch = QuantileSketch.of(values, codes, 3)
+    for q in QUANTILES:
+        estimate = sketch.quantile(q)
+        for group in range(3):
+            group_values = values[codes == group]
+            lower = np.quantile(group_values, q, method='lower')
+            higher = np.quantile(group_values, q, method='higher')
+            assert lower * (1 - SKETCH_ERROR) <= estimate[group] <= higher * (1 + SKETCH_ERROR), (q, group)
+
+
+def test_merge_equals_a_single_pass(sample):
+    values, codes = sample
+    single = QuantileSketch.of(values, codes, 3)
+    parts = [QuantileSketch.of(values[i:i + 1000], codes[i:i + 1000], 3) for i in range(0, len(values), 1000)]
+    merged = QuantileSketch(3)
+    for part in reversed(parts):
+        merged = merged.merge(part)
+    assert merged.offset == single.offset
+    np.testing.assert_array_equal(merged.counts, single.counts)
+    np.testing.assert_array_equal(merged.quantile(0.5), single.quantile(0.5))
+
+
+def test_groups_without_values_read_as_nan():
+    sketch = QuantileSketch.of(np.array([5.0, 7.0]), np.array([0, 0]), 2)
+    assert np.isnan(sketch.quantile(0.5)[1]) and np.isnan(sketch.mode()[1])
+
+
+# The bundled dataset split into rows and an appended batch that brings a new work class and
+# occupation and incomes and hours beyond the range of the first rows
+@pytest.fixture
+def appended():
+    df = apply_schema(pd.read_csv(DATASET_PATH))
+    rows, batch = df.iloc[:3500].reset_index(drop=True), pd.read_csv(DATASET_PATH).iloc[3500:].reset_index(drop=True)
+    batch.loc[:49, 'workclass'] = 'Volunteer'
+    batch.loc[:19, 'occupation'] = 'Astronaut'
+    batch.loc[50:59, 'income'] = int(df['income'].max()) * 3
+    batch.loc[60:69, 'hours-per-week'] = int(df['hours-per-week'].max()) + 15
+    batch = apply_schema(batch)
+    return rows, batch, append_frame(rows, batch)
+
+
+def test_appended_skill_income_equals_a_single_pass(appended):
+    rows, batch, combined = appended
+    pd.testing.assert_frame_equal(SkillIncome(rows).append(batch).ranking(), SkillIncome(combined).ranking())
+
+
+def test_appended_distributions_count_every_row(appended):
+    rows, batch, combined = appended
+    stats = RunningStats(rows).append(batch)
+    summary = DistributionSummary(rows, RunningStats(rows)).append(batch, stats)
+    income = combined['income'].to_numpy().astype(np.float64)
+    hours = combined['hours-per-week'].to_numpy().astype(np.float64)
+    np.testing.assert_array_equal(summary.income_counts, np.histogram(income, bins=summary.income_edges)[0])
+    np.testing.assert_array_equal(summary.hours_counts, np.histogram(hours, bins=summary.hours_edges)[0])
+    assert summary.income_hours('Volunteer').sum() == 50
+    assert summary.income_hours().sum() == combined['workclass'].notna().sum()
+    pd.testing.assert_frame_equal(summary.box, DistributionSummary(combined, RunningStats(combined)).box)
+
+
+def test_appended_occupation_profiles_equal_a_single_pass(appended):
+    rows, batch, combined = appended
+    profiles = OccupationProfiles(rows, SkillMatrix(rows)).append(batch, SkillMatrix(rows).append(batch))
+    single = OccupationProfiles(combined, SkillMatrix(combined))
+    assert profiles.labels == single.labels and 'Astronaut' in profiles.labels
+    np.testing.assert_allclose(profiles.skill_share, single.skill_share, rtol=1e-6)
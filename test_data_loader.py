@@ -0,0 +1,147 @@
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from data_loader import (DATASET_PATH, append_rows, dataset_source, dataset_version, load_dataset, read_appended,
+                         refresh_remote)
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+# Local stand-in for the remote dataset: /dataset.csv honours If-None-Match, /bad.csv has a
+# valid header but a non-numeric age, anything else is a 404. Request headers are recorded.
+class _DatasetHandler(BaseHTTPRequestHandler):
+    body = b""
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        path = self.path.split("?")[0]
+        if path == "/dataset.csv" and self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        if path == "/dataset.csv":
+            body = self.body
+        elif path == "/bad.csv":
+            body = self.body.replace(b"\n2", b"\nunknown", 1)
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    with open(DATASET_PATH, "rb") as f:
+        _DatasetHandler.body = b"".join(f.readlines()[:50])
+    _DatasetHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _DatasetHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _remote_csv(cache_dir):
+    return os.path.join(cache_dir, "remote_dataset.csv")
+
+
+def test_refresh_stores_copy_then_revalidates(server, tmp_path):
+    assert refresh_remote(f"{server}/dataset.csv", cache_dir=str(tmp_path))
+    assert len(pd.read_csv(_remote_csv(tmp_path))) == 49
+    assert "If-None-Match" not in _DatasetHandler.requests[0][1]
+
+    stamp = os.stat(_remote_csv(tmp_path)).st_mtime_ns
+    assert not refresh_remote(f"{server}/dataset.csv", cache_dir=str(tmp_path))
+    headers = _DatasetHandler.requests[1][1]
+    assert headers["If-None-Match"] == ETAG
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+    assert os.stat(_remote_csv(tmp_path)).st_mtime_ns == stamp
+
+
+def test_refresh_keeps_copy_on_404_offline_and_bad_schema(server, tmp_path):
+    assert refresh_remote(f"{server}/dataset.csv", cache_dir=str(tmp_path))
+    with open(_remote_csv(tmp_path), "rb") as f:
+        stored = f.read()
+
+    assert not refresh_remote(f"{server}/missing.csv", cache_dir=str(tmp_path))
+    assert not refresh_remote(f"{server}/bad.csv", cache_dir=str(tmp_path))
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        closed_port = s.getsockname()[1]
+    assert not refresh_remote(f"http://127.0.0.1:{closed_port}/dataset.csv", cache_dir=str(tmp_path), timeout=2)
+
+    with open(_remote_csv(tmp_path), "rb") as f:
+        assert f.read() == stored
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_validators_are_dropped_when_the_url_changes(server, tmp_path):
+    assert refresh_remote(f"{server}/dataset.csv", cache_dir=str(tmp_path))
+    assert refresh_remote(f"{server}/dataset.csv?mirror=1", cache_dir=str(tmp_path))
+    headers = _DatasetHandler.requests[1][1]
+    assert "If-None-Match" not in headers and "If-Modified-Since" not in headers
+
+
+@pytest.fixture
+def local_dataset(tmp_path):
+    path = tmp_path / "dataset.csv"
+    pd.read_csv(DATASET_PATH, nrows=200).to_csv(path, index=False)
+    return str(path)
+
+
+def test_appends_go_to_the_log_and_merge_on_load(local_dataset, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    with open(local_dataset, "rb") as f:
+        original = f.read()
+    parent = dataset_source(local_dataset, cache_dir)
+    batch = pd.read_csv(DATASET_PATH, skiprows=range(1, 201), nrows=30)
+    source = append_rows(batch, local_dataset, cache_dir)
+
+    with open(local_dataset, "rb") as f:
+        assert f.read() == original
+    assert dataset_version(source, cache_dir) != dataset_version(parent, cache_dir)
+    merged = load_dataset(source, cache_dir=cache_dir, check_remote=False)
+    assert len(merged) == 230
+    assert merged['income'].tolist()[200:] == batch['income'].tolist()
+    assert read_appended(source, parent, cache_dir)['age'].tolist() == batch['age'].tolist()
+
+    newer = append_rows(batch.head(5), local_dataset, cache_dir)
+    assert len(read_appended(newer, source, cache_dir)) == 5
+    assert len(load_dataset(newer, cache_dir=cache_dir, check_remote=False)) == 235
+
+
+def test_bad_batches_are_rejected_before_writing(local_dataset, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    batch = pd.read_csv(DATASET_PATH, nrows=3)
+    for bad in (batch.assign(age=['25', 'unknown', '30']), batch.assign(age=[25, 300, 30]), batch.drop(columns='income')):
+        with pytest.raises(ValueError):
+            append_rows(bad, local_dataset, cache_dir)
+    source = dataset_source(local_dataset, cache_dir)
+    assert source[3] == 0
+    assert len(load_dataset(source, cache_dir=cache_dir, check_remote=False)) == 200
+
+
+def test_appended_rows_survive_a_new_remote_copy(server, tmp_path):
+    cache_dir = str(tmp_path)
+    assert refresh_remote(f"{server}/dataset.csv", cache_dir=cache_dir)
+    append_rows(pd.read_csv(DATASET_PATH, nrows=10), cache_dir=cache_dir)
+    with open(DATASET_PATH, "rb") as f:
+        _DatasetHandler.body += b"".join(f.readlines()[50:60])
+    assert refresh_remote(f"{server}/dataset.csv?v=2", cache_dir=cache_dir)
+    assert len(load_dataset(dataset_source(cache_dir=cache_dir), cache_dir=cache_dir, check_remote=False)) == 69